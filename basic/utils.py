@@ -1,74 +1,257 @@
 import csv
 import sys
 import os
+import time
 import datetime
+import traceback
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue, Empty
+from threading import Thread
 
 
-fileName = datetime.datetime.now().strftime('day'+'%Y_%m_%d')
+def get_day_name():
+    '''当日文件名(不含扩展名)'''
+    return datetime.datetime.now().strftime('day'+'%Y_%m_%d')
 
 
-def make_print_to_file(path='log/txt/'):
+class DailyFileHandler(logging.FileHandler):
     '''
-    path,  it is a path for save your log about fuction print
-    example:
-    use  make_print_to_file() and the all the information of funtion print , will be write in to a log file
-    :return:
+    按日切换的日志文件
+    文件名与成交记录一致(dayYYYY_MM_DD.log), 跨日后的第一条日志写入新文件
     '''
-    if not os.path.exists(path):
-        os.makedirs(path)
- 
-    class Logger(object):
-        def __init__(self, filename="Default.log", path="./"):
-            self.terminal = sys.stdout
-            self.log = open(os.path.join(path, filename), "a", encoding='utf8',)
- 
-        def write(self, message):
-            self.terminal.write(message)
-            self.log.write(message)
- 
-        def flush(self):
-            pass
- 
-    try:
-        sys.stdout = Logger(fileName + '.log', path=path)
-    except:
-        sys.stdout = Logger(fileName + '/.log', path=path)
-
-    
- 
-    #############################################################
-    # 这里输出之后的所有的输出的print 内容即将写入日志
-    #############################################################
-    print(fileName.center(60,'*'))
-
-
-def save_csv(data: dict, path='log/trade/'):
-    if not os.path.exists(path):
-        os.makedirs(path)
-
-    csv_name = path+fileName+'.csv'
-    if not os.path.exists(csv_name):
-        exist = False
-    else:
-        exist = True
-
-    exist_file = []
-    if exist:
-        with open(csv_name, "r") as f:
-            reader = csv.reader(f, lineterminator="\n")
-            for row in reader:
-                exist_file.append(row)
-            f.close()
-
-    with open(csv_name, "w") as f:
-        writer = csv.writer(f, lineterminator="\n")
-
-        exist_file.append([v for v in data.values()])
-
-        if not exist:
-            writer.writerow([k for k in data.keys()])
-        writer.writerows(exist_file)
-        print(os.path.abspath(csv_name))
-        print(exist_file)
-        print('\n')
-        f.close()
\ No newline at end of file
+    def __init__(self, path, encoding='utf8'):
+        self.path = path
+        self.day = get_day_name()
+        super().__init__(os.path.join(path, self.day + '.log'), encoding=encoding, delay=True)
+
+    def emit(self, record):
+        day = get_day_name()
+        if day != self.day:
+            self.day = day
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = os.path.abspath(os.path.join(self.path, day + '.log'))
+
+        super().emit(record)
+
+
+class LogSink(object):
+    '''
+    日志输出
+    日志先放入队列, 由后台线程写入当日日志文件(以及终端), 调用方不直接接触磁盘;
+    日志文件在第一条日志写入时才打开, 跨日自动切换.
+    队列处理器在start时挂到logger上、stop时移除, 同一进程内多个实例不会重复输出
+    '''
+    def __init__(self, name='rebalance', path='log/txt/', level=logging.INFO, console=True):
+        self.path = path
+
+        self.queue = Queue()
+        self.handler = QueueHandler(self.queue)
+
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(level)
+        self.logger.propagate = False
+        # 未启动时丢弃日志, 不由logging默认处理器输出到stderr
+        if not any(isinstance(h, logging.NullHandler) for h in self.logger.handlers):
+            self.logger.addHandler(logging.NullHandler())
+
+        formatter = logging.Formatter('[%(asctime)s] %(message)s')
+        handlers = []
+
+        file_handler = DailyFileHandler(path)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.active = False
+
+    def start(self):
+        if self.active:
+            return
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+        self.listener.start()
+        self.logger.addHandler(self.handler)
+        self.active = True
+
+    def stop(self):
+        if not self.active:
+            return
+        self.logger.removeHandler(self.handler)
+        self.listener.stop()
+        self.active = False
+
+    def set_level(self, level: int):
+        self.logger.setLevel(level)
+
+    def log(self, level: int, msg: str):
+        self.logger.log(level, msg)
+
+
+class LogThrottle(object):
+    '''
+    重复日志限流
+    同一条消息在window秒内只放行一次, 窗口过后再次放行时返回期间被抑制的次数
+    '''
+    def __init__(self, window=60.0, max_size=10_000):
+        self.window = window
+        self.max_size = max_size
+        self.records = {}           # msg: [上次放行时间, 抑制次数]
+
+    def check(self, msg: str):
+        '''放行时返回被抑制的次数, 需抑制时返回None'''
+        now = time.monotonic()
+
+        record = self.records.get(msg, None)
+        if record:
+            if now - record[0] < self.window:
+                record[1] += 1
+                return None
+
+            suppressed = record[1]
+            record[0] = now
+            record[1] = 0
+            return suppressed
+
+        # 控制缓存大小, 清理已过窗口的消息
+        if len(self.records) >= self.max_size:
+            self.records = {
+                k: v for k, v in self.records.items()
+                if now - v[0] < self.window
+            }
+
+        self.records[msg] = [now, 0]
+        return 0
+
+
+class TradeRecorder(object):
+    '''
+    成交记录器
+    成交数据放入队列后立即返回, 由后台线程批量写入当日csv文件:
+    文件句柄保持打开, 表头只在新文件中写入一次, 达到条数阈值或时间间隔后统一flush;
+    写入出错时通过日志输出错误并在下一条记录时重新打开文件, 后台线程不会退出
+    '''
+    def __init__(self, path='log/trade/', flush_interval=1.0, flush_size=100, log_sink=None):
+        self.path = path
+        self.flush_interval = flush_interval        # 最长落盘间隔(秒)
+        self.flush_size = flush_size                # 缓冲条数达到该值即落盘
+        self.log_sink = log_sink
+
+        self.queue = Queue()
+        self.thread = None
+        self.active = False
+
+        self.file = None
+        self.writer = None
+        self.file_name = ''
+        self.buffered = 0
+
+        # 统计数据
+        self.record_count = 0
+        self.flush_count = 0
+        self.error_count = 0
+
+    def start(self):
+        if self.active:
+            return
+        self.active = True
+        self.thread = Thread(target=self.run, name='TradeRecorder', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        self.thread.join()
+        self.thread = None
+        self.close_file()
+
+    def record(self, data: dict):
+        '''写入一条成交记录(不阻塞)'''
+        self.queue.put(data)
+
+    def flush(self):
+        '''等待队列中的记录全部落盘'''
+        if self.active and self.thread.is_alive():
+            self.queue.join()
+
+    def run(self):
+        last_flush = time.monotonic()
+        while self.active or not self.queue.empty():
+            try:
+                data = self.queue.get(timeout=self.flush_interval)
+            except Empty:
+                data = None
+
+            try:
+                if data is not None:
+                    self.write(data)
+
+                now = time.monotonic()
+                if self.buffered and (
+                    self.buffered >= self.flush_size
+                    or now - last_flush >= self.flush_interval
+                    or self.queue.empty()
+                ):
+                    self.file.flush()
+                    self.buffered = 0
+                    self.flush_count += 1
+                    last_flush = now
+            except Exception:
+                self.on_error()
+            finally:
+                if data is not None:
+                    self.queue.task_done()
+
+    def on_error(self):
+        '''写入出错: 输出错误, 关闭文件以便下一条记录重新打开'''
+        self.error_count += 1
+
+        msg = f'成交记录写入失败:\n{traceback.format_exc()}'
+        if self.log_sink:
+            self.log_sink.log(logging.ERROR, msg)
+        else:
+            print(msg)
+
+        self.buffered = 0
+        try:
+            self.close_file()
+        except OSError:
+            self.file = None
+            self.writer = None
+            self.file_name = ''
+
+    def write(self, data: dict):
+        file_name = os.path.join(self.path, get_day_name() + '.csv')
+        # 跨日切换文件
+        if file_name != self.file_name:
+            self.open_file(file_name)
+
+        if self.file.tell() == 0:
+            self.writer.writerow([k for k in data.keys()])
+        self.writer.writerow([v for v in data.values()])
+
+        self.buffered += 1
+        self.record_count += 1
+
+    def open_file(self, file_name: str):
+        self.close_file()
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+        self.file = open(file_name, 'a')
+        self.writer = csv.writer(self.file, lineterminator='\n')
+        self.file_name = file_name
+
+    def close_file(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+            self.writer = None
+            self.file_name = ''
@@ -0,0 +1,427 @@
+"""
+引擎热点路径测试
+
+使用轻量的主引擎、事件引擎替身（不连接接口、不启动事件线程），在不同篮子规模和成交比例下
+直接调用引擎的事件处理函数，统计以下路径的单次耗时分位数、吞吐量和内存分配：
+    timer       process_timer_event（到期算法下单、批量推送、快照）
+    order       process_order_event（委托状态推送）
+    trade       process_trade_event（持仓、敞口、状态日志、成交记录）
+    send_order  DfRebalanceEngine.send_order（委托模板 + 开平转换 + 下单）
+    save_data   save_data（检查点写入）
+    value       update_immediate_value（组合市值计算）
+
+每个模拟秒推送一次定时事件，新发出的委托先推送未成交状态，然后按成交比例随机
+全部成交或撤单。结果保存为JSON，可与之前版本的结果对比。
+
+运行方式（项目根目录下）：
+    python -m benchmark.bench_engine
+    python -m benchmark.bench_engine --sizes 10 1000 --compare benchmark/results/xxx.json
+"""
+import json
+import os
+import platform
+import subprocess
+import tracemalloc
+from argparse import ArgumentParser
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from random import Random
+from time import perf_counter_ns
+from typing import Callable
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.constant import Direction, Exchange, Product, Status
+from vnpy.trader.event import EVENT_TICK, EVENT_ORDER, EVENT_TRADE
+from vnpy.trader.object import (
+    CancelRequest,
+    ContractData,
+    OrderData,
+    OrderRequest,
+    SubscribeRequest,
+    TickData,
+    TradeData
+)
+from vnpy.trader.utility import TRADER_DIR
+
+from vnpy_rebalancetrader.algo import DfTwapAlgo
+from vnpy_rebalancetrader.simulation import SimRebalanceEngine
+
+
+BASKET_SIZES: list[int] = [10, 100, 1_000, 10_000]
+FILL_RATES: list[float] = [0.2, 1.0]
+ROUNDS: int = 120                   # 模拟秒数
+ALLOC_ROUNDS: int = 10              # 统计内存分配的模拟秒数
+SEND_COUNT: int = 2_000             # send_order测试次数
+SAVE_ROUNDS: int = 10               # save_data测试次数
+VALUE_ROUNDS: int = 200             # update_immediate_value测试次数
+
+RESULT_DIR: Path = Path(__file__).parent.joinpath("results")
+GATEWAY_NAME: str = "BENCH"
+
+
+class FakeEventEngine(EventEngine):
+    """事件引擎替身：只保存处理函数，推送的事件直接丢弃"""
+
+    def __init__(self) -> None:
+        """"""
+        super().__init__()
+        self.put_count: int = 0
+
+    def start(self) -> None:
+        """"""
+        pass
+
+    def stop(self) -> None:
+        """"""
+        pass
+
+    def put(self, event: Event) -> None:
+        """"""
+        self.put_count += 1
+
+
+class FakeMainEngine:
+    """主引擎替身：提供合约、行情查询，下单只记录委托"""
+
+    def __init__(self) -> None:
+        """"""
+        self.contracts: dict[str, ContractData] = {}
+        self.ticks: dict[str, TickData] = {}
+        self.orders: dict[str, OrderData] = {}
+        self.new_orders: list[OrderData] = []
+        self.order_count: int = 0
+
+    def get_contract(self, vt_symbol: str) -> ContractData:
+        """"""
+        return self.contracts.get(vt_symbol, None)
+
+    def get_tick(self, vt_symbol: str) -> TickData:
+        """"""
+        return self.ticks.get(vt_symbol, None)
+
+    def get_order(self, vt_orderid: str) -> OrderData:
+        """"""
+        return self.orders.get(vt_orderid, None)
+
+    def send_order(self, req: OrderRequest, gateway_name: str) -> str:
+        """"""
+        self.order_count += 1
+        order: OrderData = req.create_order_data(str(self.order_count), gateway_name)
+        self.orders[order.vt_orderid] = order
+        self.new_orders.append(order)
+        return order.vt_orderid
+
+    def cancel_order(self, req: CancelRequest, gateway_name: str) -> None:
+        """"""
+        pass
+
+    def subscribe(self, req: SubscribeRequest, gateway_name: str) -> None:
+        """"""
+        pass
+
+    def pop_new_orders(self) -> list[OrderData]:
+        """取出上次调用后新发出的委托"""
+        orders: list[OrderData] = self.new_orders
+        self.new_orders = []
+        return orders
+
+
+class BenchEngine(SimRebalanceEngine):
+    """测试用执行引擎（独立数据文件）"""
+
+    data_filename = "rebalance_trader_bench_data.json"
+    backup_filename = "rebalance_trader_bench_data_backup.json"
+    journal_filename = "rebalance_trader_bench_journal.jsonl"
+    history_filename = "rebalance_trader_bench_history.json"
+
+
+class BenchClock:
+    """模拟时钟"""
+
+    def __init__(self) -> None:
+        """"""
+        self.now: float = 1_000_000
+
+    def __call__(self) -> float:
+        """"""
+        return self.now
+
+
+class Recorder:
+    """按路径记录单次耗时（纳秒）"""
+
+    def __init__(self) -> None:
+        """"""
+        self.samples: dict[str, list[int]] = defaultdict(list)
+
+    def call(self, name: str, func: Callable, *args) -> None:
+        """执行并记录耗时"""
+        start: int = perf_counter_ns()
+        func(*args)
+        self.samples[name].append(perf_counter_ns() - start)
+
+    def get_stats(self) -> dict[str, dict]:
+        """统计各路径的分位数和吞吐量"""
+        return {name: calculate_stats(samples) for name, samples in self.samples.items()}
+
+
+def calculate_stats(samples: list[int]) -> dict:
+    """计算耗时分位数（微秒）和吞吐量（次/秒）"""
+    samples = sorted(samples)
+    n: int = len(samples)
+    total: int = sum(samples)
+
+    def percentile(p: float) -> float:
+        return samples[min(int(n * p), n - 1)] / 1000
+
+    return {
+        "count": n,
+        "mean": total / n / 1000,
+        "p50": percentile(0.5),
+        "p90": percentile(0.9),
+        "p99": percentile(0.99),
+        "max": samples[-1] / 1000,
+        "throughput": n / total * 1_000_000_000 if total else 0,
+    }
+
+
+def create_engine(size: int, seed: int) -> tuple[BenchEngine, FakeMainEngine, BenchClock]:
+    """创建引擎和指定规模的运行中篮子"""
+    rng: Random = Random(seed)
+
+    main_engine: FakeMainEngine = FakeMainEngine()
+    event_engine: FakeEventEngine = FakeEventEngine()
+    clock: BenchClock = BenchClock()
+
+    engine: BenchEngine = BenchEngine(main_engine, event_engine)
+    engine.clock = clock
+    engine.exposure_limit = 0           # 不做敞口控制，保证每轮都会下单
+    engine.init()
+
+    for i in range(size):
+        contract: ContractData = ContractData(
+            symbol=f"rb{i}",
+            exchange=Exchange.SHFE,
+            name=f"螺纹{i}",
+            product=Product.FUTURES,
+            size=10,
+            pricetick=1,
+            net_position=True,
+            gateway_name=GATEWAY_NAME
+        )
+        main_engine.contracts[contract.vt_symbol] = contract
+
+        price: float = 3000 + rng.randint(0, 1000)
+        tick: TickData = TickData(
+            symbol=contract.symbol,
+            exchange=contract.exchange,
+            datetime=datetime.now(),
+            last_price=price,
+            bid_price_1=price - 1,
+            bid_volume_1=rng.randint(10, 100),
+            ask_price_1=price + 1,
+            ask_volume_1=rng.randint(10, 100),
+            gateway_name=GATEWAY_NAME
+        )
+        main_engine.ticks[tick.vt_symbol] = tick
+
+        direction: Direction = Direction.LONG if i % 2 else Direction.SHORT
+        engine.create_algo(contract, direction, 1_000_000, rng.randint(5, 30), 0.1)
+        engine.process_tick_event(Event(EVENT_TICK, tick))
+
+    engine.start_algos()
+
+    return engine, main_engine, clock
+
+
+def run_round(
+    engine: BenchEngine,
+    main_engine: FakeMainEngine,
+    clock: BenchClock,
+    recorder: Recorder,
+    rng: Random,
+    fill_rate: float
+) -> None:
+    """模拟一秒：定时事件，然后处理新委托的回报"""
+    clock.now += 1
+    recorder.call("timer", engine.process_timer_event, None)
+
+    for order in main_engine.pop_new_orders():
+        order.status = Status.NOTTRADED
+        recorder.call("order", engine.process_order_event, Event(EVENT_ORDER, copy_order(order)))
+
+        if rng.random() < fill_rate:
+            trade: TradeData = TradeData(
+                symbol=order.symbol,
+                exchange=order.exchange,
+                orderid=order.orderid,
+                tradeid=order.orderid,
+                direction=order.direction,
+                offset=order.offset,
+                price=order.price,
+                volume=order.volume,
+                datetime=datetime.now(),
+                gateway_name=GATEWAY_NAME
+            )
+            recorder.call("trade", engine.process_trade_event, Event(EVENT_TRADE, trade))
+
+            order.traded = order.volume
+            order.status = Status.ALLTRADED
+        else:
+            order.status = Status.CANCELLED
+
+        recorder.call("order", engine.process_order_event, Event(EVENT_ORDER, copy_order(order)))
+
+
+def copy_order(order: OrderData) -> OrderData:
+    """复制委托（接口每次推送新的委托对象）"""
+    return OrderData(
+        symbol=order.symbol,
+        exchange=order.exchange,
+        orderid=order.orderid,
+        type=order.type,
+        direction=order.direction,
+        offset=order.offset,
+        price=order.price,
+        volume=order.volume,
+        traded=order.traded,
+        status=order.status,
+        reference=order.reference,
+        gateway_name=order.gateway_name
+    )
+
+
+def run_case(size: int, fill_rate: float, rounds: int) -> dict:
+    """测试一组篮子规模和成交比例"""
+    engine, main_engine, clock = create_engine(size, 0)
+    rng: Random = Random(1)
+    recorder: Recorder = Recorder()
+
+    # 事件处理路径
+    for _ in range(rounds):
+        run_round(engine, main_engine, clock, recorder, rng, fill_rate)
+
+    # 单独测试下单路径（不推送回报）
+    algos: list[DfTwapAlgo] = list(engine.algos.values())
+    for i in range(SEND_COUNT):
+        algo: DfTwapAlgo = algos[i % size]
+        tick: TickData = main_engine.ticks[algo.vt_symbol]
+        recorder.call("send_order", engine.send_order, algo, algo.direction, tick.ask_price_1, 1)
+    main_engine.pop_new_orders()
+
+    for _ in range(SAVE_ROUNDS):
+        recorder.call("save_data", engine.save_data)
+
+    for _ in range(VALUE_ROUNDS):
+        recorder.call("value", engine.update_immediate_value)
+
+    # 内存分配：定时和回报处理过程中的净增长和峰值
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+
+    for _ in range(ALLOC_ROUNDS):
+        run_round(engine, main_engine, clock, Recorder(), rng, fill_rate)
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    engine.stop_algos()
+    engine.close()
+
+    return {
+        "size": size,
+        "fill_rate": fill_rate,
+        "paths": recorder.get_stats(),
+        "alloc_net_kb": (current - base) / 1024 / ALLOC_ROUNDS,
+        "alloc_peak_kb": (peak - base) / 1024,
+    }
+
+
+def get_git_revision() -> str:
+    """当前代码版本"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            text=True,
+            stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_case(case: dict, baseline: dict = None) -> None:
+    """输出一组测试结果，有对比基准时显示p50耗时变化"""
+    print(f"\n篮子规模 {case['size']}，成交比例 {case['fill_rate']:.0%}")
+    print(f"{'路径':>10} {'次数':>8} {'p50(us)':>10} {'p90(us)':>10} {'p99(us)':>10} {'max(us)':>10} {'次/秒':>10} {'对比':>8}")
+
+    for name, stats in case["paths"].items():
+        if baseline and name in baseline["paths"]:
+            change: str = f"{stats['p50'] / baseline['paths'][name]['p50'] - 1:+.0%}"
+        else:
+            change: str = ""
+
+        print(
+            f"{name:>12} {stats['count']:>8} {stats['p50']:>10.1f} {stats['p90']:>10.1f} "
+            f"{stats['p99']:>10.1f} {stats['max']:>10.1f} {stats['throughput']:>12.0f} {change:>8}"
+        )
+
+    print(f"内存分配：每秒净增长{case['alloc_net_kb']:.1f}KB，峰值{case['alloc_peak_kb']:.1f}KB")
+
+
+def main() -> None:
+    """"""
+    parser: ArgumentParser = ArgumentParser(description="引擎热点路径测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BASKET_SIZES, help="篮子规模")
+    parser.add_argument("--fill-rates", type=float, nargs="+", default=FILL_RATES, help="成交比例")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help="模拟秒数")
+    parser.add_argument("--output", default=None, help="结果文件，默认保存到benchmark/results")
+    parser.add_argument("--compare", default=None, help="对比的历史结果文件")
+    args = parser.parse_args()
+
+    output: Path = Path(args.output).resolve() if args.output else None
+
+    baselines: dict[tuple, dict] = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            for case in json.load(f)["cases"]:
+                baselines[(case["size"], case["fill_rate"])] = case
+
+    revision: str = get_git_revision()
+
+    # 与主引擎一致，在运行目录下写入数据和日志文件
+    os.chdir(TRADER_DIR)
+
+    cases: list[dict] = []
+    for size in args.sizes:
+        for fill_rate in args.fill_rates:
+            case: dict = run_case(size, fill_rate, args.rounds)
+            cases.append(case)
+            print_case(case, baselines.get((size, fill_rate), None))
+
+    result: dict = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rounds": args.rounds,
+        "cases": cases,
+    }
+
+    if not output:
+        RESULT_DIR.mkdir(exist_ok=True)
+        name: str = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if revision:
+            name += f"_{revision}"
+        output = RESULT_DIR.joinpath(f"{name}.json")
+
+    with open(output, mode="w", encoding="utf-8") as f:
+        json.dump(result, f, indent=4, ensure_ascii=False)
+
+    print(f"\n结果已保存：{output}")
+
+
+if __name__ == "__main__":
+    main()
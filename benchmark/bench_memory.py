@@ -0,0 +1,134 @@
+"""
+算法对象内存与属性访问测试
+
+对比普通类（实例字典 + 活动委托集合）与__slots__版本的DfTwapAlgo、HoldingData，
+统计创建篮子的内存分配以及定时推送中常用属性的读取耗时。
+
+运行方式（项目根目录下）：
+    python -m benchmark.bench_memory
+"""
+import tracemalloc
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable
+
+from vnpy.trader.constant import Direction, Exchange
+
+from vnpy_rebalancetrader.algo import DfTwapAlgo, AlgoStatus
+from vnpy_rebalancetrader.holding import HoldingData
+
+
+BASKET_SIZES: list[int] = [1_000, 10_000]
+ACCESS_ROUNDS: int = 20
+
+
+class DictTwapAlgo:
+    """原有的对象布局（实例字典，活动委托使用集合）"""
+
+    def __init__(
+        self,
+        engine: object,
+        algoid: str,
+        vt_symbol: str,
+        direction: Direction,
+        total_volume: int,
+        time_interval: int,
+        vol_percent: float = 0.1
+    ) -> None:
+        """"""
+        self.engine: object = engine
+        self.algoid: str = algoid
+        self.vt_symbol: str = vt_symbol
+        self.direction: Direction = direction
+        self.total_volume: int = total_volume
+        self.time_interval: int = time_interval
+        self.vol_percent: float = vol_percent
+        self.status: AlgoStatus = AlgoStatus.WAITING
+        self.offset: str = None
+        self.time_left: float = 2
+        self.next_time: float = None
+        self.current_pos: int = 0
+        self.active_orderids: set[str] = set()
+        self.to_run: bool = False
+
+
+@dataclass
+class DictHoldingData:
+    """原有的持仓数据（普通数据类）"""
+    vt_positionid: str
+    symbol: str
+    exchange: Exchange
+    name: str
+    direction: Direction
+    volume: int
+    price: float
+    pnl: float
+    value: float
+
+
+def create_algos(algo_class: type, size: int) -> list:
+    """创建算法篮子"""
+    return [
+        algo_class(None, f"DfTwap_{i}", f"rb{i}.SHFE", Direction.LONG, 10, 10, 0.1)
+        for i in range(size)
+    ]
+
+
+def create_holdings(holding_class: type, size: int) -> list:
+    """创建持仓数据"""
+    return [
+        holding_class(
+            f"SIM.rb{i}.SHFE.多", f"rb{i}", Exchange.SHFE, f"螺纹{i}",
+            Direction.LONG, 10, 3500.0, 100.0, 350_000.0
+        )
+        for i in range(size)
+    ]
+
+
+def measure_memory(func: Callable, cls: type, size: int) -> tuple[list, float]:
+    """返回创建的对象和平均每个对象分配的字节数"""
+    tracemalloc.start()
+    objs: list = func(cls, size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return objs, current / size
+
+
+def measure_access(algos: list) -> float:
+    """读取定时推送中常用的属性，返回每个算法每轮的耗时（纳秒）"""
+    start: float = perf_counter()
+
+    for _ in range(ACCESS_ROUNDS):
+        for algo in algos:
+            algo.status
+            algo.current_pos
+            algo.total_volume
+            algo.next_time
+            algo.active_orderids
+
+    cost: float = perf_counter() - start
+    return cost / ACCESS_ROUNDS / len(algos) * 1_000_000_000
+
+
+def main() -> None:
+    """"""
+    for size in BASKET_SIZES:
+        print(f"\n篮子规模 {size}")
+        print(f"{'对象':>16} {'普通(字节/个)':>14} {'slots(字节/个)':>14} {'节省':>8}")
+
+        dict_algos, dict_algo_mem = measure_memory(create_algos, DictTwapAlgo, size)
+        slot_algos, slot_algo_mem = measure_memory(create_algos, DfTwapAlgo, size)
+        print(f"{'DfTwapAlgo':>18} {dict_algo_mem:>16.0f} {slot_algo_mem:>16.0f} {1 - slot_algo_mem / dict_algo_mem:>10.0%}")
+
+        _, dict_holding_mem = measure_memory(create_holdings, DictHoldingData, size)
+        _, slot_holding_mem = measure_memory(create_holdings, HoldingData, size)
+        print(f"{'HoldingData':>18} {dict_holding_mem:>16.0f} {slot_holding_mem:>16.0f} {1 - slot_holding_mem / dict_holding_mem:>10.0%}")
+
+        dict_access: float = measure_access(dict_algos)
+        slot_access: float = measure_access(slot_algos)
+        print(f"{'属性读取(ns/个)':>12} {dict_access:>16.1f} {slot_access:>16.1f} {dict_access / slot_access:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+定时调度开销测试
+
+对比逐个算法轮询timer_count与时间轮调度两种方式下，每次定时推送的耗时随篮子规模的变化。
+时间轮方式的开销与每次到期的算法数量成正比，交易间隔越长收益越明显。
+
+运行方式（项目根目录下）：
+    python -m benchmark.bench_scheduler
+"""
+from random import Random
+from time import perf_counter
+
+from vnpy_rebalancetrader.scheduler import AlgoScheduler
+
+
+BASKET_SIZES: list[int] = [10, 100, 1_000, 5_000]
+INTERVAL_RANGES: list[tuple[int, int]] = [(10, 10), (2, 60), (30, 300)]
+TICKS: int = 600
+
+
+class PollingAlgo:
+    """原有的逐秒计数方式"""
+
+    def __init__(self, time_interval: int) -> None:
+        """"""
+        self.time_interval: int = time_interval
+        self.timer_count: int = time_interval - 2
+        self.fired: int = 0
+
+    def on_timer(self) -> None:
+        """"""
+        self.timer_count += 1
+        if self.timer_count < self.time_interval:
+            return
+        self.timer_count = 0
+        self.fired += 1
+
+
+class ScheduledAlgo:
+    """由调度器唤醒的方式"""
+
+    def __init__(self, time_interval: int) -> None:
+        """"""
+        self.time_interval: int = time_interval
+        self.fired: int = 0
+
+    def on_timer(self) -> None:
+        """"""
+        self.fired += 1
+
+
+def run_polling(intervals: list[int]) -> float:
+    """轮询方式，返回每次定时推送的平均耗时（微秒）"""
+    algos: list[PollingAlgo] = [PollingAlgo(i) for i in intervals]
+
+    start: float = perf_counter()
+    for _ in range(TICKS):
+        for algo in algos:
+            algo.on_timer()
+    cost: float = perf_counter() - start
+
+    return cost / TICKS * 1_000_000
+
+
+def run_scheduler(intervals: list[int]) -> float:
+    """调度器方式，返回每次定时推送的平均耗时（微秒）"""
+    scheduler: AlgoScheduler = AlgoScheduler()
+
+    for i in intervals:
+        algo: ScheduledAlgo = ScheduledAlgo(i)
+        scheduler.schedule(algo, 2)
+
+    start: float = perf_counter()
+    for now in range(1, TICKS + 1):
+        for algo in scheduler.pop_due(now):
+            algo.on_timer()
+            scheduler.schedule(algo, now + algo.time_interval)
+    cost: float = perf_counter() - start
+
+    return cost / TICKS * 1_000_000
+
+
+def main() -> None:
+    """"""
+    rng: Random = Random(0)
+
+    for low, high in INTERVAL_RANGES:
+        print(f"\n交易间隔 {low}~{high} 秒")
+        print(f"{'篮子规模':>8} {'轮询(us/次)':>14} {'调度器(us/次)':>14} {'加速比':>8}")
+
+        for size in BASKET_SIZES:
+            intervals: list[int] = [rng.randint(low, high) for _ in range(size)]
+
+            polling: float = run_polling(intervals)
+            scheduled: float = run_scheduler(intervals)
+
+            print(f"{size:>12} {polling:>16.1f} {scheduled:>16.1f} {polling / scheduled:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
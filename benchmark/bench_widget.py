@@ -0,0 +1,132 @@
+"""
+算法表格加载测试
+
+将不同规模篮子的算法快照载入AlgoTableModel（连接多、空两个AlgoMonitor视图，与界面一致），
+统计以下操作的耗时（含事件循环处理和可见行绘制）：
+    加载        首次批量插入全部行
+    全部刷新    所有行的显示数据变化（运行中算法读秒）
+    部分刷新    10%的行变化
+    排序        按目标仓位排序
+    筛选        按合约代码筛选
+目标：5000行篮子的加载在1秒以内。
+
+运行方式（项目根目录下，无显示环境时自动使用offscreen平台）：
+    python -m benchmark.bench_widget
+"""
+import os
+import sys
+from random import Random
+from time import perf_counter
+from typing import Callable
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from vnpy.trader.constant import Direction
+from vnpy.trader.ui import QtWidgets, QtCore
+
+from vnpy_rebalancetrader.algo import AlgoSnapshot, AlgoStatus
+from vnpy_rebalancetrader.ui.widget import AlgoTableModel, AlgoMonitor
+
+
+BASKET_SIZES: list[int] = [1_000, 5_000, 10_000]
+TARGET_SIZE: int = 5_000
+TARGET_TIME: float = 1_000          # 目标篮子规模的加载耗时上限（毫秒）
+PARTIAL_RATIO: float = 0.1
+
+
+def create_snapshots(size: int, rng: Random) -> list[AlgoSnapshot]:
+    """生成算法快照"""
+    snapshots: list[AlgoSnapshot] = []
+
+    for i in range(size):
+        direction: Direction = Direction.LONG if i % 2 else Direction.SHORT
+        volume: int = rng.randint(1, 100)
+        if direction == Direction.SHORT:
+            volume = -volume
+
+        snapshots.append(AlgoSnapshot(
+            f"DfTwap_{i + 1}",
+            f"rb{i:05d}.SHFE",
+            direction,
+            volume,
+            0,
+            None,
+            AlgoStatus.RUNNING,
+            0,
+            rng.randint(2, 60),
+            0.1
+        ))
+
+    return snapshots
+
+
+def measure(app: QtWidgets.QApplication, func: Callable, *args) -> float:
+    """执行操作并处理完事件循环（含绘制），返回耗时（毫秒）"""
+    start: float = perf_counter()
+    func(*args)
+    app.processEvents()
+    return (perf_counter() - start) * 1000
+
+
+def run_case(app: QtWidgets.QApplication, size: int, rng: Random) -> dict[str, float]:
+    """测试单个篮子规模"""
+    model: AlgoTableModel = AlgoTableModel(None)
+
+    monitors: list[AlgoMonitor] = []
+    for direction in (Direction.LONG, Direction.SHORT):
+        monitor: AlgoMonitor = AlgoMonitor(model, direction)
+        monitor.resize(1000, 600)
+        monitor.show()
+        monitors.append(monitor)
+    app.processEvents()
+
+    snapshots: list[AlgoSnapshot] = create_snapshots(size, rng)
+    result: dict[str, float] = {}
+
+    result["加载"] = measure(app, model.update_datas, snapshots)
+
+    snapshots = [s._replace(timer_count=1) for s in snapshots]
+    result["全部刷新"] = measure(app, model.update_datas, snapshots)
+
+    changed: list[AlgoSnapshot] = [
+        s._replace(current_pos=1) for s in rng.sample(snapshots, int(size * PARTIAL_RATIO))
+    ]
+    result["部分刷新"] = measure(app, model.update_datas, changed)
+
+    def sort() -> None:
+        for monitor in monitors:
+            monitor.sortByColumn(model.fields.index("total_volume"), QtCore.Qt.DescendingOrder)
+    result["排序"] = measure(app, sort)
+
+    def apply_filter() -> None:
+        for monitor in monitors:
+            monitor.set_filter("rb001")
+    result["筛选"] = measure(app, apply_filter)
+
+    for monitor in monitors:
+        monitor.close()
+
+    return result
+
+
+def main() -> None:
+    """"""
+    app: QtWidgets.QApplication = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    rng: Random = Random(0)
+
+    names: list[str] = ["加载", "全部刷新", "部分刷新", "排序", "筛选"]
+    print(f"{'篮子规模':>8}" + "".join(f"{name + '(ms)':>12}" for name in names))
+
+    for size in BASKET_SIZES:
+        result: dict[str, float] = run_case(app, size, rng)
+        print(f"{size:>12}" + "".join(f"{result[name]:>14.1f}" for name in names))
+
+        if size == TARGET_SIZE:
+            load_time: float = result["加载"]
+
+    status: str = "达标" if load_time < TARGET_TIME else "未达标"
+    print(f"\n{TARGET_SIZE}行加载耗时{load_time:.1f}ms，目标{TARGET_TIME:.0f}ms以内：{status}")
+
+
+if __name__ == "__main__":
+    main()
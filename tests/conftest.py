@@ -0,0 +1,177 @@
+from collections import defaultdict
+from datetime import datetime
+
+import pytest
+
+from vnpy.event import Event
+from vnpy.trader.constant import Exchange, Product
+from vnpy.trader.object import ContractData, TickData, OrderData, TradeData, OrderRequest
+
+from vnpy_rebalancetrader.engine import DfRebalanceEngine
+
+
+class SyncEventEngine:
+    """同步事件引擎：事件放入队列，由测试调用process处理"""
+
+    def __init__(self) -> None:
+        self.handlers: dict[str, list] = defaultdict(list)
+        self.queue: list[Event] = []
+
+    def register(self, type: str, handler) -> None:
+        if handler not in self.handlers[type]:
+            self.handlers[type].append(handler)
+
+    def unregister(self, type: str, handler) -> None:
+        if handler in self.handlers[type]:
+            self.handlers[type].remove(handler)
+
+    def put(self, event: Event) -> None:
+        self.queue.append(event)
+
+    def process(self) -> None:
+        while self.queue:
+            event: Event = self.queue.pop(0)
+            for handler in list(self.handlers[event.type]):
+                handler(event)
+
+
+class FakeMainEngine:
+    """只记录订阅和委托的主引擎"""
+
+    def __init__(self, event_engine: SyncEventEngine) -> None:
+        self.event_engine: SyncEventEngine = event_engine
+        self.contracts: dict[str, ContractData] = {}
+        self.ticks: dict[str, TickData] = {}
+        self.orders: dict[str, OrderData] = {}
+        self.subscribed: list[str] = []
+        self.order_count: int = 0
+
+    def add_contract(self, vt_symbol: str) -> ContractData:
+        symbol, exchange = vt_symbol.split(".")
+        contract: ContractData = ContractData(
+            symbol=symbol,
+            exchange=Exchange(exchange),
+            name=symbol,
+            product=Product.FUTURES,
+            size=10,
+            pricetick=1,
+            min_volume=1,
+            net_position=True,
+            gateway_name="TEST"
+        )
+        self.contracts[vt_symbol] = contract
+        return contract
+
+    def get_contract(self, vt_symbol: str) -> ContractData:
+        return self.contracts.get(vt_symbol, None)
+
+    def get_tick(self, vt_symbol: str) -> TickData:
+        return self.ticks.get(vt_symbol, None)
+
+    def get_order(self, vt_orderid: str) -> OrderData:
+        return self.orders.get(vt_orderid, None)
+
+    def get_position(self, vt_positionid: str) -> None:
+        return None
+
+    def get_engine(self, engine_name: str) -> None:
+        return None
+
+    def subscribe(self, req, gateway_name: str) -> None:
+        self.subscribed.append(req.vt_symbol)
+
+    def send_order(self, req: OrderRequest, gateway_name: str) -> str:
+        self.order_count += 1
+        order: OrderData = req.create_order_data(str(self.order_count), gateway_name)
+        self.orders[order.vt_orderid] = order
+        return order.vt_orderid
+
+    def cancel_order(self, req, gateway_name: str) -> None:
+        pass
+
+
+class Clock:
+    """可手动调整的时钟"""
+
+    def __init__(self) -> None:
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_tick(vt_symbol: str, last_price: float = 100) -> TickData:
+    """生成行情（买卖一档各100手）"""
+    symbol, exchange = vt_symbol.split(".")
+    return TickData(
+        symbol=symbol,
+        exchange=Exchange(exchange),
+        datetime=datetime.now(),
+        last_price=last_price,
+        bid_price_1=last_price - 1,
+        ask_price_1=last_price + 1,
+        bid_volume_1=100,
+        ask_volume_1=100,
+        gateway_name="TEST"
+    )
+
+
+def make_trade(order: OrderData, tradeid: str, volume: float) -> TradeData:
+    """生成委托的成交"""
+    return TradeData(
+        symbol=order.symbol,
+        exchange=order.exchange,
+        orderid=order.orderid,
+        tradeid=tradeid,
+        direction=order.direction,
+        offset=order.offset,
+        price=order.price,
+        volume=volume,
+        datetime=datetime.now(),
+        gateway_name=order.gateway_name
+    )
+
+
+@pytest.fixture
+def engine_class(tmp_path, monkeypatch):
+    """数据文件放在临时目录、不启动执行线程的引擎类"""
+    monkeypatch.chdir(tmp_path)
+
+    class TestEngine(DfRebalanceEngine):
+        data_filename = str(tmp_path.joinpath("data.json"))
+        backup_filename = str(tmp_path.joinpath("data_backup.json"))
+        journal_filename = str(tmp_path.joinpath("journal.jsonl"))
+        history_filename = str(tmp_path.joinpath("history.json"))
+        use_worker = False
+
+    return TestEngine
+
+
+@pytest.fixture
+def make_engine(engine_class):
+    """创建引擎（同一测试内多次调用模拟重启），测试结束后停止后台线程"""
+    engines: list[DfRebalanceEngine] = []
+
+    def create(*vt_symbols: str) -> tuple[DfRebalanceEngine, FakeMainEngine]:
+        event_engine: SyncEventEngine = SyncEventEngine()
+        main_engine: FakeMainEngine = FakeMainEngine(event_engine)
+        for vt_symbol in vt_symbols:
+            main_engine.add_contract(vt_symbol)
+
+        engine: DfRebalanceEngine = engine_class(main_engine, event_engine)
+        engines.append(engine)
+        return engine, main_engine
+
+    yield create
+
+    for engine in engines:
+        stop_engine(engine)
+
+
+def stop_engine(engine: DfRebalanceEngine) -> None:
+    """停止引擎的后台线程（不保存检查点，模拟进程退出）"""
+    engine.snapshot_writer.stop()
+    engine.trade_recorder.stop()
+    engine.log_sink.stop()
+    engine.journal.close()
+    engine.worker.stop()
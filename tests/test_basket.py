@@ -0,0 +1,226 @@
+import pandas as pd
+
+from vnpy.trader.constant import Direction, Exchange, Product
+from vnpy.trader.object import ContractData
+
+from vnpy_rebalancetrader.algo import AlgoStatus, DfTwapAlgo
+from vnpy_rebalancetrader.basket import validate_basket, diff_basket, get_signed_volume
+
+
+def make_contract(vt_symbol: str, min_volume: float = 1) -> ContractData:
+    """生成测试合约"""
+    symbol, exchange = vt_symbol.split(".")
+    return ContractData(
+        symbol=symbol,
+        exchange=Exchange(exchange),
+        name=symbol,
+        product=Product.FUTURES,
+        size=10,
+        pricetick=1,
+        min_volume=min_volume,
+        gateway_name="TEST"
+    )
+
+
+CONTRACTS: dict[str, ContractData] = {
+    "rb2210.SHFE": make_contract("rb2210.SHFE"),
+    "hc2210.SHFE": make_contract("hc2210.SHFE"),
+    "IF2209.CFFEX": make_contract("IF2209.CFFEX", 2),
+}
+
+
+def make_basket(rows: list[tuple]) -> pd.DataFrame:
+    """生成篮子数据"""
+    return pd.DataFrame(rows, columns=["vt_symbol", "direction", "total_volume", "time_interval", "vol_percent"])
+
+
+def test_valid_basket():
+    df = make_basket([
+        ("rb2210.SHFE", "多", 10, 5, 0.1),
+        ("hc2210.SHFE", "SHORT", 5, 5, 0.2),
+    ])
+    df, errors = validate_basket(df, CONTRACTS.get)
+
+    assert errors == []
+    assert list(df["direction"]) == [Direction.LONG, Direction.SHORT]
+    assert df["contract"].iat[0] is CONTRACTS["rb2210.SHFE"]
+
+
+def test_net_direction_rejected():
+    df = make_basket([
+        ("rb2210.SHFE", "多", 10, 5, 0.1),
+        ("hc2210.SHFE", "净", 5, 5, 0.1),
+        ("IF2209.CFFEX", "NET", 2, 5, 0.1),
+    ])
+    _, errors = validate_basket(df, CONTRACTS.get)
+
+    assert errors == [
+        "第3行 hc2210.SHFE：方向无效（须为多或空）",
+        "第4行 IF2209.CFFEX：方向无效（须为多或空）",
+    ]
+
+
+def test_unknown_contract():
+    df = make_basket([
+        ("rb2210.SHFE", "多", 10, 5, 0.1),
+        ("ag2212.SHFE", "空", 5, 5, 0.1),
+    ])
+    _, errors = validate_basket(df, CONTRACTS.get)
+
+    assert errors == ["第3行 ag2212.SHFE：找不到合约"]
+
+
+def test_duplicate_symbol():
+    df = make_basket([
+        ("rb2210.SHFE", "多", 10, 5, 0.1),
+        ("hc2210.SHFE", "多", 10, 5, 0.1),
+        ("rb2210.SHFE", "空", 5, 5, 0.1),
+    ])
+    _, errors = validate_basket(df, CONTRACTS.get)
+
+    assert errors == [
+        "第2行 rb2210.SHFE：合约代码重复",
+        "第4行 rb2210.SHFE：合约代码重复",
+    ]
+
+
+def test_errors_grouped_by_row():
+    df = make_basket([
+        ("IF2209.CFFEX", "多", 3, 1, 0.1),
+        ("rb2210.SHFE", "多", -1, 5, 1.5),
+    ])
+    _, errors = validate_basket(df, CONTRACTS.get)
+
+    assert errors == [
+        "第2行 IF2209.CFFEX：目标数量不是最小下单量的整数倍",
+        "第2行 IF2209.CFFEX：时间间隔不得小于2",
+        "第3行 rb2210.SHFE：目标数量无效",
+        "第3行 rb2210.SHFE：盘口百分比须在0到1之间",
+    ]
+
+
+class StubAlgo:
+    """只包含对比所需字段的算法"""
+
+    def __init__(self, vt_symbol: str, direction: Direction, total_volume: int) -> None:
+        self.vt_symbol: str = vt_symbol
+        self.direction: Direction = direction
+        self.total_volume: int = total_volume
+        self.time_interval: int = 5
+        self.vol_percent: float = 0.1
+
+
+def test_diff_basket():
+    rb = StubAlgo("rb2210.SHFE", Direction.LONG, 10)
+    hc = StubAlgo("hc2210.SHFE", Direction.SHORT, -5)
+    if_ = StubAlgo("IF2209.CFFEX", Direction.LONG, 4)
+
+    df = make_basket([
+        ("rb2210.SHFE", "多", 10, 5, 0.1),
+        ("hc2210.SHFE", "空", 8, 5, 0.1),
+        ("ag2212.SHFE", "多", 1, 5, 0.1),
+    ])
+    df, _ = validate_basket(df, {**CONTRACTS, "ag2212.SHFE": make_contract("ag2212.SHFE")}.get)
+
+    report: dict = diff_basket(df, {
+        "rb2210.SHFE": [rb],
+        "hc2210.SHFE": [hc],
+        "IF2209.CFFEX": [if_],
+    })
+
+    assert report["unchanged"] == [rb]
+    assert [(algo, row.total_volume) for algo, row in report["change"]] == [(hc, 8)]
+    assert [row.vt_symbol for row in report["add"]] == ["ag2212.SHFE"]
+    assert report["remove"] == [if_]
+    assert report["errors"] == []
+
+
+def test_diff_basket_direction_reversal():
+    rb = StubAlgo("rb2210.SHFE", Direction.LONG, 10)
+
+    df, _ = validate_basket(make_basket([("rb2210.SHFE", "空", 10, 5, 0.1)]), CONTRACTS.get)
+    report: dict = diff_basket(df, {"rb2210.SHFE": [rb]})
+
+    assert len(report["errors"]) == 1
+    assert get_signed_volume(Direction.SHORT, 10) == -10
+
+
+def write_basket(path, rows: list[tuple]) -> str:
+    """写入篮子文件"""
+    make_basket(rows).to_csv(path, index=False, encoding="utf-8-sig")
+    return str(path)
+
+
+def test_rebalance_to_file(make_engine, tmp_path):
+    engine, _ = make_engine("rb2210.SHFE", "hc2210.SHFE", "ag2212.SHFE", "IF2209.CFFEX")
+    engine.init()
+
+    rb: str = engine.add_algo("rb2210.SHFE", Direction.LONG, 10, 5, 0.1)
+    hc: str = engine.add_algo("hc2210.SHFE", Direction.SHORT, 5, 5, 0.1)
+    if_: str = engine.add_algo("IF2209.CFFEX", Direction.LONG, 4, 5, 0.1)
+    engine.start_algos()
+    engine.pause_algo(hc)
+
+    path: str = write_basket(tmp_path.joinpath("basket.csv"), [
+        ("rb2210.SHFE", "多", 12, 5, 0.1),
+        ("ag2212.SHFE", "空", 3, 5, 0.1),
+    ])
+    preview: dict = engine.preview_basket(path)
+    assert preview["text"].splitlines()[0] == "新增1个，调整1个，平仓2个，不变0个"
+
+    report: dict = engine.rebalance_to_file(path, preview["text"])
+    assert report["errors"] == []
+
+    assert engine.algos[rb].total_volume == 12
+    assert engine.algos[hc].total_volume == 0
+    assert engine.algos[if_].total_volume == 0
+
+    # 暂停中的平仓腿恢复运行，已启动的篮子中新增的腿直接启动
+    assert engine.algos[hc].status == AlgoStatus.RUNNING
+    ag: DfTwapAlgo = engine.symbol_algos["ag2212.SHFE"][0]
+    assert ag.total_volume == -3
+    assert ag.status == AlgoStatus.RUNNING
+
+
+def test_rebalance_starts_waiting_dropped_legs(make_engine, tmp_path):
+    engine, _ = make_engine("rb2210.SHFE", "hc2210.SHFE")
+    engine.init()
+
+    rb: str = engine.add_algo("rb2210.SHFE", Direction.LONG, 10, 5, 0.1)
+    engine.start_algos()
+
+    # 篮子启动后加入、尚未启动的腿
+    hc: str = engine.add_algo("hc2210.SHFE", Direction.SHORT, 5, 5, 0.1)
+    engine.algos[hc].current_pos = -2
+
+    path: str = write_basket(tmp_path.joinpath("basket.csv"), [("rb2210.SHFE", "多", 10, 5, 0.1)])
+    engine.rebalance_to_file(path)
+
+    assert engine.algos[hc].total_volume == 0
+    assert engine.algos[hc].status == AlgoStatus.RUNNING
+    assert engine.algos[rb].status == AlgoStatus.RUNNING
+
+
+def test_rebalance_rejects_stale_preview(make_engine, tmp_path):
+    engine, _ = make_engine("rb2210.SHFE", "hc2210.SHFE")
+    engine.init()
+
+    rb: str = engine.add_algo("rb2210.SHFE", Direction.LONG, 10, 5, 0.1)
+    hc: str = engine.add_algo("hc2210.SHFE", Direction.SHORT, 5, 5, 0.1)
+
+    path: str = write_basket(tmp_path.joinpath("basket.csv"), [("rb2210.SHFE", "多", 12, 5, 0.1)])
+    preview: dict = engine.preview_basket(path)
+
+    # 预览后目标仓位被修改
+    engine.change_target_pos(-8, hc)
+
+    report: dict = engine.rebalance_to_file(path, preview["text"])
+    assert report["errors"] == ["预览后算法或篮子文件已变化，请重新预览"]
+    assert engine.algos[rb].total_volume == 10
+    assert engine.algos[hc].total_volume == -8
+
+    # 重新预览后可以执行
+    preview = engine.preview_basket(path)
+    assert not engine.rebalance_to_file(path, preview["text"])["errors"]
+    assert engine.algos[rb].total_volume == 12
+    assert engine.algos[hc].total_volume == 0
@@ -0,0 +1,66 @@
+from vnpy_rebalancetrader.dedup import RecentIdCache
+
+
+def test_check_and_hits():
+    cache: RecentIdCache = RecentIdCache(10, 60)
+    cache.add("a", 0)
+
+    assert cache.check("a")
+    assert not cache.check("b")
+    assert "a" in cache
+    assert cache.get_stats() == {"size": 1, "add_count": 1, "hit_count": 1, "evict_count": 0}
+
+
+def test_capacity_evicts_oldest():
+    cache: RecentIdCache = RecentIdCache(3, 60)
+
+    for i, key in enumerate("abc"):
+        assert cache.add(key, i) == []
+
+    assert cache.add("d", 3) == ["a"]
+    assert cache.add("e", 4) == ["b"]
+    assert list(cache.ids) == ["c", "d", "e"]
+    assert len(cache) == 3
+
+
+def test_readd_moves_to_end():
+    cache: RecentIdCache = RecentIdCache(3, 60)
+    cache.add("a", 0)
+    cache.add("b", 1)
+    cache.add("c", 2)
+
+    # 重新加入的编号刷新时间，不会被优先淘汰
+    cache.add("a", 3)
+    assert cache.add("d", 4) == ["b"]
+    assert "a" in cache
+
+
+def test_window_expiry():
+    cache: RecentIdCache = RecentIdCache(100, 10)
+    cache.add("a", 0)
+    cache.add("b", 5)
+
+    assert cache.add("c", 10) == []
+    assert cache.add("d", 10.5) == ["a"]
+    assert cache.add("e", 16) == ["b"]
+    assert list(cache.ids) == ["c", "d", "e"]
+    assert cache.get_stats()["evict_count"] == 2
+
+
+def test_clear():
+    cache: RecentIdCache = RecentIdCache(10, 60)
+    cache.add("a", 0)
+    cache.clear()
+
+    assert not cache.check("a")
+    assert len(cache) == 0
+
+
+def test_expire_without_add():
+    cache: RecentIdCache = RecentIdCache(100, 10)
+    cache.add("a", 0)
+    cache.add("b", 5)
+
+    assert cache.expire(10) == []
+    assert cache.expire(15.5) == ["a", "b"]
+    assert cache.items() == []
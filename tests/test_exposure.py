@@ -0,0 +1,199 @@
+import random
+
+import pytest
+
+from vnpy.trader.constant import Direction, Exchange
+from vnpy.trader.object import TickData
+
+from vnpy_rebalancetrader.exposure import ExposureValuator, ArrayExposureValuator, ExposureController
+
+
+SYMBOLS: list[str] = [f"rb{i}.SHFE" for i in range(6)]
+
+
+def test_array_matches_dict_valuator():
+    rng: random.Random = random.Random(3)
+
+    # 初始容量较小，覆盖数组扩容和空槽位复用
+    valuator: ExposureValuator = ExposureValuator()
+    array_valuator: ArrayExposureValuator = ArrayExposureValuator(capacity=4)
+
+    keys: list[str] = []
+
+    for i in range(3000):
+        action: float = rng.random()
+
+        if action < 0.15 or not keys:
+            key: str = f"leg{i}"
+            vt_symbol: str = rng.choice(SYMBOLS)
+            direction: Direction = rng.choice([Direction.LONG, Direction.SHORT])
+            size: float = rng.choice([1, 5, 10, 300])
+            pos: float = rng.randint(-20, 20)
+            target: float = rng.randint(-20, 20)
+            price: float = rng.uniform(10, 5000)
+
+            for v in (valuator, array_valuator):
+                v.add_leg(key, vt_symbol, size, direction, pos, target, price)
+            keys.append(key)
+        elif action < 0.22:
+            key: str = keys.pop(rng.randrange(len(keys)))
+            for v in (valuator, array_valuator):
+                v.remove_leg(key)
+        elif action < 0.6:
+            vt_symbol: str = rng.choice(SYMBOLS)
+            price: float = round(rng.uniform(10, 5000), 1)
+            assert valuator.update_price(vt_symbol, price) == array_valuator.update_price(vt_symbol, price)
+        elif action < 0.9:
+            key: str = rng.choice(keys)
+            pos: float = rng.randint(-20, 20)
+            assert valuator.update_pos(key, pos) == array_valuator.update_pos(key, pos)
+        else:
+            key: str = rng.choice(keys)
+            target: float = rng.randint(-20, 20)
+            for v in (valuator, array_valuator):
+                v.update_target(key, target)
+
+        assert array_valuator.get_values() == pytest.approx(valuator.get_values(), rel=1e-9, abs=1e-3)
+        assert array_valuator.get_residual_value() == pytest.approx(valuator.get_residual_value(), rel=1e-9, abs=1e-3)
+
+    progress: dict = valuator.get_leg_progress()
+    array_progress: dict = array_valuator.get_leg_progress()
+    assert progress.keys() == array_progress.keys()
+    for key, (completion, residual) in progress.items():
+        assert array_progress[key] == pytest.approx((completion, residual), rel=1e-9, abs=1e-3)
+
+
+def test_values_and_clear():
+    for valuator in (ExposureValuator(), ArrayExposureValuator()):
+        valuator.add_leg("a", "rb2210.SHFE", 10, Direction.LONG, 2, 4, 100)
+        valuator.add_leg("b", "hc2210.SHFE", 10, Direction.SHORT, -1, -4, 100)
+
+        assert valuator.get_values() == pytest.approx((2000, 1000, 1000, 100 / 3))
+        assert valuator.get_residual_value() == pytest.approx(2000 + 3000)
+
+        valuator.clear()
+        assert valuator.get_values() == (0, 0, 0, 0)
+        assert valuator.get_residual_value() == 0
+
+
+def test_same_symbol_legs_with_different_prices():
+    valuator: ExposureValuator = ExposureValuator()
+    array_valuator: ArrayExposureValuator = ArrayExposureValuator()
+
+    # 同一合约的两条腿以不同价格加入，行情价格等于第一条腿的价格
+    for v in (valuator, array_valuator):
+        v.add_leg("a", "rb2210.SHFE", 10, Direction.LONG, 2, 4, 100)
+        v.add_leg("b", "rb2210.SHFE", 10, Direction.SHORT, -1, -4, 120)
+
+    assert valuator.update_price("rb2210.SHFE", 100)
+    assert array_valuator.update_price("rb2210.SHFE", 100)
+    assert array_valuator.get_values() == pytest.approx(valuator.get_values())
+    assert array_valuator.get_values() == pytest.approx((2000, 1000, 1000, 100 / 3))
+    assert array_valuator.get_residual_value() == pytest.approx(valuator.get_residual_value())
+
+    assert not valuator.update_price("rb2210.SHFE", 100)
+    assert not array_valuator.update_price("rb2210.SHFE", 100)
+
+
+def test_controller_hysteresis():
+    controller: ExposureController = ExposureController(0.5)
+
+    # 下轨以内不限制
+    assert not controller.update(400, 1000)
+    assert (controller.long_factor, controller.short_factor) == (1, 1)
+
+    # 上下轨之间按比例缩小加大敞口方向的委托
+    assert not controller.update(750, 1000)
+    assert controller.long_factor == pytest.approx(0.5)
+    assert controller.short_factor == 1
+
+    # 达到上轨暂停
+    assert controller.update(1000, 1000)
+    assert controller.long_pause and not controller.short_pause
+    assert controller.get_factor(Direction.LONG) == 0
+
+    # 回落到上下轨之间仍保持暂停
+    assert not controller.update(700, 1000)
+    assert controller.long_pause
+    assert controller.long_factor == 0
+
+    # 回落到下轨以下才恢复
+    assert controller.update(500, 1000)
+    assert not controller.long_pause
+    assert controller.long_factor == 1
+
+    # 再次进入上下轨之间只缩小数量
+    assert not controller.update(900, 1000)
+    assert not controller.long_pause
+    assert controller.long_factor == pytest.approx(0.2)
+
+
+def test_controller_short_side_and_disable():
+    controller: ExposureController = ExposureController(0.5)
+
+    assert controller.update(-1200, 1000)
+    assert controller.short_pause and not controller.long_pause
+    assert controller.get_factor(Direction.SHORT) == 0
+    assert controller.get_factor(Direction.LONG) == 1
+
+    # 上限为0时不控制
+    assert controller.update(-1200, 0)
+    assert not controller.short_pause
+    assert controller.get_factor(Direction.SHORT) == 1
+    assert not controller.update(-1200, 0)
+
+
+def test_order_volume_throttled_by_direction(make_engine):
+    engine, main_engine = make_engine("rb2210.SHFE", "hc2210.SHFE")
+    for vt_symbol in ("rb2210.SHFE", "hc2210.SHFE"):
+        symbol, exchange = vt_symbol.split(".")
+        main_engine.ticks[vt_symbol] = TickData(
+            symbol=symbol,
+            exchange=Exchange(exchange),
+            datetime=None,
+            last_price=100,
+            bid_price_1=99,
+            ask_price_1=101,
+            bid_volume_1=100,
+            ask_volume_1=100,
+            gateway_name="TEST"
+        )
+    engine.init()
+
+    # 乘数10、价格100，每手市值1000；下轨50000，上轨100000
+    engine.set_exposure_limit(100_000)
+    rb: str = engine.add_algo("rb2210.SHFE", Direction.LONG, 1000, 5, 0.1)
+    hc: str = engine.add_algo("hc2210.SHFE", Direction.SHORT, 1000, 5, 0.1)
+    engine.start_algos()
+
+    def run_with_long_pos(pos: int) -> tuple[float, float]:
+        """设置多头仓位后各执行一轮，返回买入、卖出委托数量"""
+        engine.valuator.update_pos(rb, pos)
+        engine.check_exposure()
+
+        volumes: list[float] = []
+        for algoid in (rb, hc):
+            count: int = main_engine.order_count
+            engine.algos[algoid].run()
+            if main_engine.order_count > count:
+                volumes.append(main_engine.orders[f"TEST.{main_engine.order_count}"].volume)
+            else:
+                volumes.append(0)
+        return tuple(volumes)
+
+    # 敞口在上下轨之间：买入数量减半，卖出不受影响
+    assert run_with_long_pos(75) == (5, 10)
+
+    # 超过上限：暂停买入
+    assert run_with_long_pos(100) == (0, 10)
+    assert engine.long_pause and not engine.short_pause
+
+    # 回落到上下轨之间仍暂停
+    assert run_with_long_pos(60) == (0, 10)
+
+    # 回落到下轨以下恢复
+    assert run_with_long_pos(40) == (10, 10)
+    assert not engine.long_pause
+
+    # 再次进入上下轨之间只缩小数量
+    assert run_with_long_pos(75) == (5, 10)
@@ -0,0 +1,121 @@
+from vnpy.event import Event
+from vnpy.trader.constant import Direction, Exchange
+from vnpy.trader.event import EVENT_CONTRACT, EVENT_POSITION, EVENT_TIMER
+from vnpy.trader.object import ContractData, PositionData, TickData
+
+from vnpy_rebalancetrader.holding import HoldingData, HoldingBook
+
+from conftest import FakeMainEngine
+
+
+VT_SYMBOL: str = "rb2210.SHFE"
+POSITIONID: str = "rb2210.SHFE.净"
+
+
+def make_position(volume: float, price: float, direction: Direction = Direction.NET, pnl: float = 0) -> PositionData:
+    """生成持仓（合约乘数10）"""
+    return PositionData(
+        symbol="rb2210",
+        exchange=Exchange.SHFE,
+        direction=direction,
+        volume=volume,
+        price=price,
+        pnl=pnl,
+        gateway_name="TEST"
+    )
+
+
+def make_contract() -> ContractData:
+    """生成合约"""
+    return FakeMainEngine(None).add_contract(VT_SYMBOL)
+
+
+def test_mark_and_totals():
+    book: HoldingBook = HoldingBook()
+    contract: ContractData = make_contract()
+
+    # 尚无行情时使用接口推送的盈亏，市值为0
+    book.update_position(make_position(2, 100, pnl=30.4), contract)
+    holding: HoldingData = book.holdings[POSITIONID]
+    assert (holding.value, holding.pnl) == (0, 30)
+    assert book.get_totals() == {"long_value": 0, "short_value": 0, "net_value": 0, "pnl": 30}
+
+    # 行情到达后盯市
+    assert book.update_price(VT_SYMBOL, 110)
+    assert (holding.value, holding.pnl) == (2200, 200)
+
+    # 净持仓为负时计入空头市值
+    book.update_position(make_position(-3, 100), contract)
+    assert (holding.value, holding.pnl) == (-3300, -300)
+    assert book.get_totals() == {"long_value": 0, "short_value": 3300, "net_value": -3300, "pnl": -300}
+
+
+def test_short_position_sign():
+    book: HoldingBook = HoldingBook()
+    contract: ContractData = make_contract()
+
+    book.update_position(make_position(1, 100), contract, 100)
+    book.update_position(make_position(2, 100, Direction.SHORT), contract)
+    book.update_price(VT_SYMBOL, 90)
+
+    assert book.get_totals() == {"long_value": 900, "short_value": 1800, "net_value": -900, "pnl": 100}
+
+
+def test_pop_changes():
+    book: HoldingBook = HoldingBook()
+    contract: ContractData = make_contract()
+
+    # 无持仓的合约和价格不变的行情不产生变化
+    assert not book.update_price("ag2212.SHFE", 100)
+    book.update_position(make_position(1, 100), contract, 100)
+    assert not book.update_price(VT_SYMBOL, 100)
+
+    changes: list[HoldingData] = book.pop_changes()
+    assert [h.vt_positionid for h in changes] == [POSITIONID]
+    assert book.pop_changes() == []
+
+    # 返回的是副本
+    changes[0].volume = 99
+    assert book.holdings[POSITIONID].volume == 1
+
+
+def test_position_before_contract(make_engine):
+    engine, main_engine = make_engine()
+    engine.init()
+
+    # 合约推送前的持仓不缓存
+    position: PositionData = make_position(2, 100)
+    engine.process_position_event(Event(EVENT_POSITION, position))
+    assert not engine.positions
+    assert not engine.holding_book.holdings
+
+    contract: ContractData = main_engine.add_contract(VT_SYMBOL)
+    engine.process_contract_event(Event(EVENT_CONTRACT, contract))
+
+    # 合约推送后相同的持仓推送计入组合
+    engine.process_position_event(Event(EVENT_POSITION, make_position(2, 100)))
+    assert engine.holding_book.holdings[position.vt_positionid].volume == 2
+    assert VT_SYMBOL in main_engine.subscribed
+
+    # 之后数据不变的推送被过滤
+    engine.process_timer_event(Event(EVENT_TIMER))
+    engine.event_engine.queue.clear()
+    engine.process_position_event(Event(EVENT_POSITION, make_position(2, 100)))
+    assert not engine.holding_book.changed
+
+
+def test_position_marked_on_tick(make_engine):
+    engine, main_engine = make_engine(VT_SYMBOL)
+    engine.init()
+
+    main_engine.ticks[VT_SYMBOL] = TickData(
+        symbol="rb2210",
+        exchange=Exchange.SHFE,
+        datetime=None,
+        last_price=105,
+        gateway_name="TEST"
+    )
+    engine.process_position_event(Event(EVENT_POSITION, make_position(2, 100)))
+
+    assert engine.holding_book.get_totals()["long_value"] == 2100
+    assert engine.holding_book.get_totals()["pnl"] == 100
@@ -0,0 +1,126 @@
+import json
+
+from vnpy.trader.constant import Direction
+
+from vnpy_rebalancetrader.algo import AlgoStatus
+from vnpy_rebalancetrader.persistence import AlgoJournal
+
+from conftest import stop_engine
+
+
+VT_SYMBOL: str = "rb2210.SHFE"
+
+
+def test_append_and_read(tmp_path):
+    journal: AlgoJournal = AlgoJournal(str(tmp_path.joinpath("journal.jsonl")))
+    journal.reset(0)
+
+    for i in range(5):
+        assert journal.append({"type": "trade", "volume": i}) == i + 1
+    journal.close()
+
+    assert [r["seq"] for r in journal.read()] == [1, 2, 3, 4, 5]
+    assert [r["seq"] for r in journal.read(3)] == [4, 5]
+    assert journal.record_count == 5
+
+
+def test_truncated_last_line(tmp_path):
+    path = tmp_path.joinpath("journal.jsonl")
+    journal: AlgoJournal = AlgoJournal(str(path))
+    journal.reset(0)
+    journal.append({"type": "trade", "volume": 1})
+    journal.append({"type": "trade", "volume": 2})
+    journal.close()
+
+    # 崩溃时最后一行只写入了一半
+    with open(path, mode="a", encoding="UTF-8") as f:
+        f.write('{"type": "trade", "vol')
+
+    assert [r["volume"] for r in journal.read()] == [1, 2]
+
+
+def test_checkpoint_resets_journal(tmp_path):
+    checkpoint_path = tmp_path.joinpath("data.json")
+    journal: AlgoJournal = AlgoJournal(str(tmp_path.joinpath("journal.jsonl")))
+    journal.start()
+    journal.reset(0)
+
+    journal.append({"type": "trade", "volume": 1})
+    journal.checkpoint(checkpoint_path, {"journal_seq": journal.seq})
+    journal.append({"type": "trade", "volume": 2})
+    assert journal.flush()
+    journal.close()
+
+    assert json.loads(checkpoint_path.read_text(encoding="UTF-8")) == {"journal_seq": 1}
+    assert [r["seq"] for r in journal.read(1)] == [2]
+    assert journal.record_count == 1
+
+
+def test_failed_write_flagged(tmp_path):
+    errors: list[str] = []
+    journal: AlgoJournal = AlgoJournal(str(tmp_path.joinpath("journal.jsonl")), on_error=errors.append)
+    journal.start()
+    journal.reset(0)
+
+    write = journal.write
+
+    def fail_once(record: dict) -> None:
+        if record["seq"] == 2:
+            raise OSError("disk full")
+        write(record)
+
+    journal.write = fail_once
+    for i in range(3):
+        journal.append({"type": "trade", "volume": i})
+
+    # 写入线程不退出，后续记录照常写入，失败状态保持到下一次检查点
+    assert not journal.flush()
+    assert len(errors) == 1
+    assert [r["seq"] for r in journal.read()] == [1, 3]
+
+    journal.checkpoint(tmp_path.joinpath("data.json"), {"journal_seq": journal.seq})
+    assert journal.flush()
+    journal.close()
+
+
+def test_engine_crash_recovery(make_engine):
+    engine, _ = make_engine(VT_SYMBOL, "hc2210.SHFE")
+    engine.init()
+
+    rb: str = engine.add_algo(VT_SYMBOL, Direction.LONG, 10, 5, 0.1)
+    hc: str = engine.add_algo("hc2210.SHFE", Direction.SHORT, 6, 5, 0.1)
+    engine.save_data()
+
+    # 检查点之后的变化只记录在状态日志中
+    engine.algos[rb].current_pos = 4
+    engine.write_journal("trade", engine.algos[rb], vt_tradeid="TEST.1", volume=4)
+    engine.change_target_pos(12, rb)
+    engine.start_algos()
+    engine.stop_algo(hc)
+    stop_engine(engine)
+
+    engine, _ = make_engine(VT_SYMBOL, "hc2210.SHFE")
+    assert engine.init()
+
+    assert engine.algos[rb].current_pos == 4
+    assert engine.algos[rb].total_volume == 12
+    assert engine.algos[hc].total_volume == -6
+    assert engine.algos[rb].status == AlgoStatus.WAITING
+    assert "TEST.1" in engine.trade_history
+
+    # 重放后生成新的检查点并清空日志
+    assert engine.journal.read() == []
+    assert engine.journal.seq > 0
+
+
+def test_clear_record_drops_algos(make_engine):
+    engine, _ = make_engine(VT_SYMBOL)
+    engine.init()
+    engine.add_algo(VT_SYMBOL, Direction.LONG, 10, 5, 0.1)
+    engine.save_data()
+    engine.clear_algos()
+    stop_engine(engine)
+
+    engine, _ = make_engine(VT_SYMBOL)
+    assert not engine.init()
+    assert not engine.algos
@@ -0,0 +1,131 @@
+import json
+from urllib.request import urlopen
+
+from vnpy.event import Event
+from vnpy.trader.constant import Direction
+from vnpy.trader.event import EVENT_TIMER
+
+from vnpy_rebalancetrader.engine import EVENT_TICK
+from vnpy_rebalancetrader.metrics import LatencyHistogram, EngineMetrics, MetricsServer
+
+from conftest import Clock, make_tick
+
+
+def test_histogram_buckets():
+    histogram: LatencyHistogram = LatencyHistogram()
+
+    # 第i个桶记录[2^(i-1), 2^i)微秒
+    for ns in (500, 1_500, 3_000, 3_900, 10**9):
+        histogram.record(ns)
+
+    assert histogram.buckets[:3] == [1, 1, 2]
+    assert histogram.buckets[20] == 1
+    assert histogram.count == 5
+    assert histogram.max == 10**9
+
+    # 分位数按桶上界估计，不超过最大值
+    assert histogram.percentile(0.2) == 1
+    assert histogram.percentile(0.5) == 4
+    assert histogram.percentile(1) == 10**6
+
+    stats: dict = histogram.get_stats()
+    assert stats["count"] == 5
+    assert stats["max"] == 10**6
+
+    histogram.clear()
+    assert histogram.percentile(0.5) == 0
+    assert histogram.get_stats()["mean"] == 0
+
+
+def test_disabled_metrics_record_nothing():
+    metrics: EngineMetrics = EngineMetrics(enabled=False)
+    handled: list = []
+
+    metrics.record("save_data", 1000)
+    metrics.add_order()
+    metrics.add_cancel()
+    metrics.wrap("timer", handled.append)(Event(EVENT_TIMER))
+
+    assert len(handled) == 1
+    assert metrics.get_snapshot()["latency"] == {}
+    assert metrics.order_count == metrics.cancel_count == 0
+
+    # 运行中开启
+    metrics.enabled = True
+    metrics.wrap("timer", handled.append)(Event(EVENT_TIMER))
+    assert list(metrics.get_snapshot()["latency"]) == ["timer"]
+
+
+def test_sample_rates_and_reset():
+    metrics: EngineMetrics = EngineMetrics()
+
+    metrics.sample(None, 0, inbox_depth=3)
+    for _ in range(10):
+        metrics.add_order()
+    metrics.add_cancel()
+    metrics.sample(None, 2, inbox_depth=1)
+
+    snapshot: dict = metrics.get_snapshot()
+    assert snapshot["order_rate"] == 5
+    assert snapshot["cancel_rate"] == 0.5
+    assert snapshot["max_order_rate"] == 5
+    assert (snapshot["inbox_depth"], snapshot["max_inbox_depth"]) == (1, 3)
+
+    metrics.record("save_data", 1000)
+    metrics.reset()
+    snapshot = metrics.get_snapshot()
+    assert snapshot["latency"] == {}
+    assert snapshot["order_count"] == 0
+    assert snapshot["max_order_rate"] == 0
+
+
+def test_metrics_server():
+    server: MetricsServer = MetricsServer(0)
+    server.start()
+    try:
+        server.publish({"order_count": 3})
+        with urlopen(f"http://127.0.0.1:{server.port}/", timeout=5) as response:
+            assert json.loads(response.read()) == {"order_count": 3}
+    finally:
+        server.stop()
+
+    assert not server.server
+
+
+def test_tick_to_order_only_for_tick_triggers(make_engine):
+    engine, main_engine = make_engine("rb2210.SHFE")
+    clock: Clock = Clock()
+    engine.clock = clock
+    engine.init()
+
+    algoid: str = engine.add_algo("rb2210.SHFE", Direction.LONG, 100, 5, 0.1)
+    engine.start_algos()
+    main_engine.ticks["rb2210.SHFE"] = make_tick("rb2210.SHFE")
+
+    def count() -> int:
+        # 每轮前清空活动委托，下一轮直接下单
+        engine.algos[algoid].active_orderids.clear()
+        return engine.metrics.get_histogram("tick_to_order").count
+
+    # 定时触发的委托不统计
+    clock.now = 3
+    engine.process_timer_event(Event(EVENT_TIMER))
+    assert main_engine.order_count == 1
+    assert count() == 0
+
+    # 直接调用处理函数时没有到达时间，不统计
+    engine.set_tick_trigger(True)
+    clock.now = 10
+    engine.process_timer_event(Event(EVENT_TIMER))
+    engine.process_tick_event(Event(EVENT_TICK, make_tick("rb2210.SHFE")))
+    assert main_engine.order_count == 2
+    assert count() == 0
+
+    # 经事件引擎转发的行情触发委托时统计
+    clock.now = 20
+    engine.process_timer_event(Event(EVENT_TIMER))
+    engine.event_engine.put(Event(EVENT_TICK, make_tick("rb2210.SHFE")))
+    engine.event_engine.process()
+    assert main_engine.order_count == 3
+    assert count() == 1
+    assert engine.trigger_time == 0
@@ -0,0 +1,53 @@
+import csv
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from vnpy_rebalancetrader.simulation import SimReplay
+
+
+TICK_FIELDS: list[str] = [
+    "datetime", "vt_symbol", "last_price", "volume",
+    "bid_price_1", "bid_volume_1", "ask_price_1", "ask_volume_1"
+]
+
+
+def write_ticks(path: Path, vt_symbol: str, count: int) -> None:
+    """生成每秒一笔、盘口稳定的行情文件"""
+    start: datetime = datetime(2024, 1, 2, 9, 0, 0)
+
+    with open(path, mode="w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(TICK_FIELDS)
+
+        for i in range(count):
+            dt: datetime = start + timedelta(seconds=i)
+            writer.writerow([dt.isoformat(), vt_symbol, 100, i * 10, 99, 50, 101, 50])
+
+
+def test_replay_without_contract_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    write_ticks(tmp_path.joinpath("rb.csv"), "rb2210.SHFE", 60)
+    write_ticks(tmp_path.joinpath("hc.csv"), "hc2210.SHFE", 60)
+
+    basket_path: Path = tmp_path.joinpath("basket.csv")
+    basket_path.write_text(
+        "vt_symbol,direction,total_volume,time_interval,vol_percent\n"
+        "rb2210.SHFE,多,4,2,0.1\n"
+        "hc2210.SHFE,空,4,2,0.1\n",
+        encoding="utf-8"
+    )
+
+    replay: SimReplay = SimReplay(
+        [str(tmp_path.joinpath("rb.csv")), str(tmp_path.joinpath("hc.csv"))],
+        str(basket_path),
+        setting={"委托延迟": 0.1, "排队比例": 0}
+    )
+    replay.init()
+    try:
+        result: dict = replay.run()
+    finally:
+        replay.close()
+
+    filled: dict[str, float] = {d["vt_symbol"]: d["filled"] for d in result["algos"]}
+    assert filled == {"rb2210.SHFE": 4, "hc2210.SHFE": -4}
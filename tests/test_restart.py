@@ -0,0 +1,170 @@
+from time import time
+
+from vnpy.event import Event
+from vnpy.trader.constant import Direction
+from vnpy.trader.event import EVENT_TRADE, EVENT_CONTRACT
+from vnpy.trader.object import ContractData, OrderData, TradeData
+from vnpy.trader.utility import load_json
+
+from vnpy_rebalancetrader.engine import DfRebalanceEngine
+
+from conftest import FakeMainEngine, make_trade, stop_engine
+
+
+VT_SYMBOL: str = "rb2210.SHFE"
+
+
+def run_session(make_engine) -> tuple[DfRebalanceEngine, OrderData, TradeData]:
+    """启动引擎，发出一笔委托并部分成交"""
+    engine, main_engine = make_engine(VT_SYMBOL)
+    engine.init()
+
+    algoid: str = engine.add_algo(VT_SYMBOL, Direction.LONG, 10, 5, 0.1)
+    vt_orderids: list[str] = engine.send_order(engine.algos[algoid], Direction.LONG, 100, 5)
+
+    order: OrderData = main_engine.get_order(vt_orderids[0])
+    trade: TradeData = make_trade(order, "1", 3)
+    engine.process_trade_event(Event(EVENT_TRADE, trade))
+
+    assert engine.algos[algoid].current_pos == 3
+    return engine, order, trade
+
+
+def restart(make_engine) -> tuple[DfRebalanceEngine, FakeMainEngine]:
+    """创建新的引擎实例并恢复数据"""
+    engine, main_engine = make_engine(VT_SYMBOL)
+    engine.init()
+    return engine, main_engine
+
+
+def check_repushed_trades(engine: DfRebalanceEngine, order: OrderData, trade: TradeData) -> None:
+    """重推已计入的成交被过滤，重启期间的新成交归属到原算法"""
+    algo = engine.algos["DfTwap_1"]
+    assert algo.current_pos == 3
+
+    engine.process_trade_event(Event(EVENT_TRADE, trade))
+    assert algo.current_pos == 3
+    assert not engine.external_pos
+
+    engine.process_trade_event(Event(EVENT_TRADE, make_trade(order, "2", 2)))
+    assert algo.current_pos == 5
+    assert not engine.external_pos
+
+
+def test_restart_after_crash(make_engine):
+    engine, order, trade = run_session(make_engine)
+    stop_engine(engine)
+
+    engine, _ = restart(make_engine)
+    check_repushed_trades(engine, order, trade)
+
+
+def test_restart_after_close(make_engine):
+    engine, order, trade = run_session(make_engine)
+    engine.close()
+    stop_engine(engine)
+
+    engine, _ = restart(make_engine)
+    assert engine.journal.read() == []
+    check_repushed_trades(engine, order, trade)
+
+
+def test_external_trade_after_restart(make_engine):
+    engine, order, _ = run_session(make_engine)
+    stop_engine(engine)
+
+    engine, _ = restart(make_engine)
+
+    # 手动委托的成交只计入敞口
+    external: TradeData = make_trade(order, "9", 1)
+    external.orderid = "manual"
+    external.vt_orderid = f"{external.gateway_name}.manual"
+    engine.process_trade_event(Event(EVENT_TRADE, external))
+
+    assert engine.algos["DfTwap_1"].current_pos == 3
+    assert engine.external_pos[VT_SYMBOL] == 1
+
+
+def test_clear_drops_order_history(make_engine):
+    engine, order, _ = run_session(make_engine)
+    engine.algos["DfTwap_1"].total_volume = 0
+    engine.algos["DfTwap_1"].current_pos = 0
+    assert engine.clear_algos()
+    stop_engine(engine)
+
+    engine, _ = restart(make_engine)
+    assert not engine.algos
+    assert not engine.order_history
+
+
+def test_restart_before_contracts(make_engine):
+    engine, order, trade = run_session(make_engine)
+    stop_engine(engine)
+
+    # 合约推送前重启：算法暂存，检查点和状态日志保持不变
+    engine, main_engine = make_engine()
+    assert not engine.init()
+    assert not engine.algos
+    assert "DfTwap_1" in engine.pending_states
+    engine.journal.flush()
+
+    checkpoint: dict = load_json(engine.data_filename)
+    records: list[dict] = engine.journal.read(checkpoint["journal_seq"])
+    assert [r["type"] for r in records] == ["add", "order", "trade"]
+
+    # 恢复前的新成交计入暂存数据，重推的成交被过滤
+    engine.process_trade_event(Event(EVENT_TRADE, trade))
+    engine.process_trade_event(Event(EVENT_TRADE, make_trade(order, "2", 1)))
+    assert engine.pending_states["DfTwap_1"]["current_pos"] == 4
+    assert not engine.external_pos
+
+    # 再次重启仍未丢失
+    stop_engine(engine)
+    engine, main_engine = make_engine()
+    engine.init()
+    assert engine.pending_states["DfTwap_1"]["current_pos"] == 4
+
+    # 合约推送后恢复并生成新的检查点
+    contract: ContractData = main_engine.add_contract(VT_SYMBOL)
+    engine.process_contract_event(Event(EVENT_CONTRACT, contract))
+
+    assert not engine.pending_states
+    assert engine.algos["DfTwap_1"].current_pos == 4
+    engine.journal.flush()
+    assert engine.journal.read() == []
+    assert load_json(engine.data_filename)["algos"][0]["current_pos"] == 4
+
+
+def test_history_bounded_and_kept_out_of_checkpoint(engine_class, make_engine):
+    engine_class.dedup_capacity = 3
+    engine, order, trade = run_session(make_engine)
+    algo = engine.algos["DfTwap_1"]
+
+    for _ in range(4):
+        engine.send_order(algo, Direction.LONG, 100, 1)
+    assert len(engine.order_history) == 3
+    assert len(engine.order_algoids) == 3
+    assert order.vt_orderid not in engine.order_algoids
+
+    engine.save_data()
+    engine.journal.flush()
+
+    # 检查点只包含算法数据，委托归属和成交记录写入历史文件
+    checkpoint: dict = load_json(engine.data_filename)
+    assert set(checkpoint) == {"journal_seq", "algos"}
+
+    history: dict = load_json(engine.history_filename)
+    assert [item[0] for item in history["orders"]] == list(engine.order_algoids)
+    assert [item[0] for item in history["trades"]] == [trade.vt_tradeid]
+
+    # 历史没有变化时不重写
+    assert not engine.history_changed
+    engine.save_data()
+    engine.journal.flush()
+    assert load_json(engine.history_filename) == history
+
+    # 超出保存时长后由定时事件淘汰
+    engine.prune_history(time() + engine.dedup_window + 1)
+    assert not engine.order_algoids
+    assert not len(engine.trade_history)
+    assert engine.history_changed
@@ -0,0 +1,106 @@
+import random
+from math import ceil, floor
+
+from vnpy_rebalancetrader.scheduler import AlgoScheduler
+
+
+RESOLUTION: float = 0.1
+
+
+class ReferenceScheduler:
+    """逐个检查全部对象的参考实现（按刻度计时）"""
+
+    def __init__(self) -> None:
+        self.ticks: dict[int, int] = {}
+        self.current_tick: int = None
+
+    def schedule(self, key: int, deadline: float) -> None:
+        tick: int = ceil(deadline / RESOLUTION - 1e-6)
+
+        # 不早于下一次推进弹出
+        if self.current_tick is not None:
+            tick = max(tick, self.current_tick + 1)
+
+        self.ticks[key] = tick
+
+    def cancel(self, key: int) -> None:
+        self.ticks.pop(key, None)
+
+    def pop_due(self, now: float) -> set[int]:
+        target: int = floor(now / RESOLUTION + 1e-6)
+        if self.current_tick is None or target > self.current_tick:
+            self.current_tick = target
+
+        due: set[int] = {key for key, tick in self.ticks.items() if tick <= target}
+        for key in due:
+            del self.ticks[key]
+        return due
+
+
+def test_against_reference():
+    rng: random.Random = random.Random(7)
+
+    # 槽位数较少，覆盖超过一圈的到期时间和跳跃推进
+    scheduler: AlgoScheduler = AlgoScheduler(RESOLUTION, 16)
+    reference: ReferenceScheduler = ReferenceScheduler()
+
+    now: float = 1000.0
+
+    for _ in range(5000):
+        action: float = rng.random()
+        key: int = rng.randrange(50)
+
+        if action < 0.45:
+            deadline: float = now + rng.choice([
+                rng.uniform(-1, 1),
+                rng.uniform(0, 5),
+                rng.uniform(5, 30),
+            ])
+            scheduler.schedule(key, deadline)
+            reference.schedule(key, deadline)
+        elif action < 0.55:
+            scheduler.cancel(key)
+            reference.cancel(key)
+        else:
+            now += rng.choice([0, 0.05, 0.1, 0.3, 1, 2.5, 10])
+            assert set(scheduler.pop_due(now)) == reference.pop_due(now)
+
+        assert len(scheduler) == len(reference.ticks)
+
+
+def test_never_early():
+    scheduler: AlgoScheduler = AlgoScheduler(RESOLUTION, 8)
+    scheduler.pop_due(0)
+
+    scheduler.schedule("a", 0.35)
+    scheduler.schedule("b", 2.0)        # 超过一圈（0.8秒）
+
+    assert scheduler.pop_due(0.3) == []
+    assert scheduler.pop_due(0.4) == ["a"]
+    assert scheduler.pop_due(1.2) == []
+    assert scheduler.get_deadline("b") == 2.0
+    assert scheduler.pop_due(2.0) == ["b"]
+    assert len(scheduler) == 0
+
+
+def test_reschedule_and_cancel():
+    scheduler: AlgoScheduler = AlgoScheduler(RESOLUTION, 8)
+
+    scheduler.schedule("a", 1.0)
+    scheduler.schedule("a", 3.0)
+    scheduler.schedule("b", 1.0)
+    scheduler.cancel("b")
+    scheduler.cancel("missing")
+
+    assert scheduler.pop_due(1.0) == []
+    assert scheduler.pop_due(3.0) == ["a"]
+
+
+def test_past_deadline_fires_on_next_advance():
+    scheduler: AlgoScheduler = AlgoScheduler(RESOLUTION, 8)
+    scheduler.pop_due(5.0)
+
+    scheduler.schedule("a", 4.0)
+
+    assert scheduler.pop_due(5.0) == []
+    assert scheduler.pop_due(5.1) == ["a"]
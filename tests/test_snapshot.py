@@ -0,0 +1,79 @@
+import json
+from threading import Thread
+from time import sleep
+
+from vnpy_rebalancetrader.persistence import SnapshotWriter
+
+
+def wait_until(condition, timeout: float = 5) -> None:
+    """等待条件成立"""
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        sleep(0.01)
+    raise TimeoutError
+
+
+def read(writer: SnapshotWriter) -> list:
+    """读取快照文件"""
+    with open(writer.file_path, encoding="UTF-8") as f:
+        return json.load(f)
+
+
+def test_coalesce_while_blocked(tmp_path):
+    writer: SnapshotWriter = SnapshotWriter(str(tmp_path.joinpath("backup.json")))
+    writer.start()
+
+    try:
+        # 占用写入锁，写入线程取出第一份快照后阻塞
+        with writer.write_lock:
+            writer.submit([0])
+            wait_until(lambda: writer.pending is None)
+
+            for i in range(1, 5):
+                writer.submit([i])
+
+        wait_until(lambda: writer.write_count == 2)
+    finally:
+        writer.stop()
+
+    # 阻塞期间提交的快照只写入最后一份
+    assert read(writer) == [4]
+
+    stats: dict = writer.get_stats()
+    assert stats["submit_count"] == 5
+    assert stats["coalesced_count"] == 3
+    assert stats["write_count"] == 2
+    assert stats["bytes_written"] > 0
+    assert stats["max_latency"] >= stats["avg_latency"] > 0
+
+
+def test_flush_on_stop(tmp_path):
+    writer: SnapshotWriter = SnapshotWriter(str(tmp_path.joinpath("backup.json")))
+    writer.start()
+
+    with writer.write_lock:
+        writer.submit([0])
+        wait_until(lambda: writer.pending is None)
+        writer.submit([1])
+        writer.submit([2])
+
+        # 停止时等待写入线程写完尚未落盘的快照
+        stopper: Thread = Thread(target=writer.stop)
+        stopper.start()
+        wait_until(lambda: not writer.active)
+
+    stopper.join(5)
+    assert not stopper.is_alive()
+    assert writer.thread is None
+
+    assert read(writer) == [2]
+    assert writer.get_stats()["write_count"] == 2
+    assert not writer.file_path.with_name("backup.json.tmp").exists()
+
+
+def test_stats_before_write(tmp_path):
+    writer: SnapshotWriter = SnapshotWriter(str(tmp_path.joinpath("backup.json")))
+
+    assert writer.get_stats()["avg_latency"] == 0
+    writer.stop()
@@ -0,0 +1,110 @@
+from vnpy.event import Event
+from vnpy.trader.constant import Direction
+from vnpy.trader.event import EVENT_CONTRACT, EVENT_TICK, EVENT_TIMER
+from vnpy.trader.object import ContractData
+
+from vnpy_rebalancetrader.engine import EVENT_REBALANCE_ALGO
+
+from conftest import Clock, make_tick
+
+
+def test_subscribe_after_contract_arrives(make_engine):
+    engine, main_engine = make_engine()
+    engine.init()
+
+    # 合约尚未推送时不标记为已订阅
+    engine.subscribe("rb2210.SHFE")
+    assert main_engine.subscribed == []
+    assert "rb2210.SHFE" not in engine.subscribed
+
+    contract: ContractData = main_engine.add_contract("rb2210.SHFE")
+    engine.process_contract_event(Event(EVENT_CONTRACT, contract))
+
+    assert main_engine.subscribed == ["rb2210.SHFE"]
+    assert "rb2210.SHFE" in engine.subscribed
+
+
+def test_retry_until_tick(make_engine):
+    engine, main_engine = make_engine("rb2210.SHFE")
+    clock: Clock = Clock()
+    engine.clock = clock
+    engine.init()
+
+    engine.subscribe("rb2210.SHFE")
+    engine.subscribe("rb2210.SHFE")
+    assert main_engine.subscribed == ["rb2210.SHFE"]
+
+    # 超过重试间隔仍无行情时重新订阅
+    clock.now = engine.subscribe_retry_interval - 1
+    engine.process_timer_event(Event(EVENT_TIMER))
+    assert len(main_engine.subscribed) == 1
+
+    clock.now = engine.subscribe_retry_interval
+    engine.process_timer_event(Event(EVENT_TIMER))
+    assert len(main_engine.subscribed) == 2
+
+    # 收到行情后不再重试
+    engine.process_tick_event(Event(EVENT_TICK, make_tick("rb2210.SHFE")))
+    clock.now = engine.subscribe_retry_interval * 3
+    engine.process_timer_event(Event(EVENT_TIMER))
+    assert len(main_engine.subscribed) == 2
+    assert not engine.pending_subscribes
+
+
+def pop_algo_events(engine) -> list[list]:
+    """取出已推送的算法事件"""
+    events: list[list] = [event.data for event in engine.event_engine.queue if event.type == EVENT_REBALANCE_ALGO]
+    engine.event_engine.queue.clear()
+    return events
+
+
+def test_publish_changed_algos_once_per_batch(make_engine):
+    engine, _ = make_engine("rb2210.SHFE", "hc2210.SHFE")
+    clock: Clock = Clock()
+    engine.clock = clock
+    engine.init()
+
+    rb: str = engine.add_algo("rb2210.SHFE", Direction.LONG, 10, 5, 0.1)
+    hc: str = engine.add_algo("hc2210.SHFE", Direction.SHORT, 5, 5, 0.1)
+    engine.event_engine.queue.clear()
+
+    clock.now = 1
+    engine.publish_algo_events()
+    events: list[list] = pop_algo_events(engine)
+    assert [[s.algoid for s in snapshots] for snapshots in events] == [[rb, hc]]
+
+    # 没有变化时不推送
+    clock.now = 2
+    engine.publish_algo_events()
+    assert pop_algo_events(engine) == []
+
+    # 推送间隔内的多次修改合并为一次推送
+    engine.change_target_pos(12, rb)
+    engine.change_target_pos(14, rb)
+    clock.now = 2.5
+    engine.publish_algo_events()
+    assert pop_algo_events(engine) == []
+
+    clock.now = 3
+    engine.publish_algo_events()
+    events = pop_algo_events(engine)
+    assert len(events) == 1
+    assert [(s.algoid, s.total_volume) for s in events[0]] == [(rb, 14)]
+
+    # 标记变化但显示数据相同时不推送
+    engine.put_algo_event(engine.algos[hc])
+    engine.publish_algo_events(force=True)
+    assert pop_algo_events(engine) == []
+
+    # 运行中的算法读秒变化时推送
+    engine.start_algo(hc)
+    engine.publish_algo_events(force=True)
+    assert [[s.algoid for s in snapshots] for snapshots in pop_algo_events(engine)] == [[hc]]
+
+    clock.now = 4
+    engine.publish_algo_events(force=True)
+    events = pop_algo_events(engine)
+    assert [[(s.algoid, s.timer_count) for s in snapshots] for snapshots in events] == [[(hc, 4)]]
+
+    engine.publish_algo_events(force=True)
+    assert pop_algo_events(engine) == []
@@ -0,0 +1,99 @@
+from vnpy.event import Event
+from vnpy.trader.constant import Direction
+from vnpy.trader.event import EVENT_TICK, EVENT_TIMER
+
+from vnpy_rebalancetrader.engine import DfRebalanceEngine
+
+from conftest import Clock, FakeMainEngine, make_tick
+
+
+RB: str = "rb2210.SHFE"
+HC: str = "hc2210.SHFE"
+
+
+def start_basket(make_engine, **settings) -> tuple[DfRebalanceEngine, FakeMainEngine, Clock]:
+    """启动两个合约的篮子，返回引擎、主引擎和时钟"""
+    engine, main_engine = make_engine(RB, HC)
+    for name, value in settings.items():
+        setattr(engine, name, value)
+
+    clock: Clock = Clock()
+    engine.clock = clock
+    engine.init()
+
+    engine.add_algo(RB, Direction.LONG, 100, 5, 0.1)
+    engine.add_algo(HC, Direction.SHORT, 100, 5, 0.1)
+    engine.start_algos()
+    return engine, main_engine, clock
+
+
+def push_tick(engine: DfRebalanceEngine, main_engine: FakeMainEngine, vt_symbol: str) -> None:
+    """推送行情"""
+    tick = make_tick(vt_symbol)
+    main_engine.ticks[vt_symbol] = tick
+    engine.process_tick_event(Event(EVENT_TICK, tick))
+
+
+def get_order_symbols(main_engine: FakeMainEngine) -> list[str]:
+    """已发出委托的合约"""
+    return [order.vt_symbol for order in main_engine.orders.values()]
+
+
+def test_tick_runs_only_its_symbol(make_engine):
+    engine, main_engine, clock = start_basket(make_engine, tick_trigger=True)
+
+    # 未到期时行情不触发
+    push_tick(engine, main_engine, RB)
+    assert main_engine.order_count == 0
+
+    # 到期后定时事件不下单，等待各自合约的行情
+    clock.now = 3
+    engine.process_timer_event(Event(EVENT_TIMER))
+    assert main_engine.order_count == 0
+
+    push_tick(engine, main_engine, RB)
+    assert get_order_symbols(main_engine) == [RB]
+
+    # 已执行的算法重新调度，同一合约的下一笔行情不再触发
+    push_tick(engine, main_engine, RB)
+    assert get_order_symbols(main_engine) == [RB]
+
+    push_tick(engine, main_engine, HC)
+    assert get_order_symbols(main_engine) == [RB, HC]
+
+
+def test_timer_mode_ignores_ticks(make_engine):
+    engine, main_engine, clock = start_basket(make_engine)
+    push_tick(engine, main_engine, RB)
+    push_tick(engine, main_engine, HC)
+
+    clock.now = 3
+    push_tick(engine, main_engine, RB)
+    assert main_engine.order_count == 0
+
+    engine.process_timer_event(Event(EVENT_TIMER))
+    assert sorted(get_order_symbols(main_engine)) == [HC, RB]
+
+
+def test_stale_quote_suppresses_orders(make_engine):
+    engine, main_engine, clock = start_basket(make_engine, max_quote_age=5)
+
+    # 尚未收到行情推送
+    main_engine.ticks[RB] = make_tick(RB)
+    assert not engine.check_quote_age(RB)
+
+    push_tick(engine, main_engine, RB)
+    push_tick(engine, main_engine, HC)
+
+    # 超过最大行情时长时不下单
+    clock.now = 6
+    push_tick(engine, main_engine, HC)
+    engine.process_timer_event(Event(EVENT_TIMER))
+    assert get_order_symbols(main_engine) == [HC]
+    assert not engine.check_quote_age(RB)
+
+    # 收到新行情后恢复
+    push_tick(engine, main_engine, RB)
+    assert engine.check_quote_age(RB)
+    engine.algos["DfTwap_1"].run()
+    assert get_order_symbols(main_engine) == [HC, RB]
@@ -0,0 +1,113 @@
+import csv
+
+import pytest
+
+from vnpy.trader.constant import Direction
+
+from vnpy_rebalancetrader.tracing import SliceTrace, SliceTracer
+
+
+def start(tracer: SliceTracer, algoid: str) -> SliceTrace:
+    """开始一轮下单"""
+    return tracer.start_slice(algoid, "rb2210.SHFE", Direction.LONG, 100, 1)
+
+
+def test_ring_buffer_wraparound():
+    tracer: SliceTracer = SliceTracer(3)
+
+    for i in range(5):
+        trace: SliceTrace = start(tracer, f"algo{i}")
+        tracer.add_order(trace, f"order{i}")
+
+    # 只保留最近3条，被淘汰记录的委托不再接收回报
+    assert [trace.algoid for trace in tracer.traces] == ["algo2", "algo3", "algo4"]
+    assert sorted(tracer.order_traces) == ["order2", "order3", "order4"]
+
+    tracer.on_ack("order0")
+    tracer.on_ack("order3")
+    assert tracer.traces[1].ack_time is not None
+
+
+def test_disabled_tracer():
+    tracer: SliceTracer = SliceTracer(3, enabled=False)
+    tracer.on_tick("rb2210.SHFE", 1.0)
+
+    assert start(tracer, "algo") is None
+    assert not tracer.tick_times
+
+
+def test_ack_and_fill_recorded_once():
+    tracer: SliceTracer = SliceTracer(10)
+    trace: SliceTrace = start(tracer, "algo")
+    tracer.add_order(trace, "order1")
+    tracer.add_order(trace, "order2")
+
+    tracer.on_ack("order1")
+    tracer.on_fill("order1")
+    ack_time, fill_time = trace.ack_time, trace.fill_time
+
+    tracer.on_ack("order2")
+    tracer.on_fill("order2")
+    assert (trace.ack_time, trace.fill_time) == (ack_time, fill_time)
+    assert trace.vt_orderids == ["order1", "order2"]
+
+
+def make_trace(tracer: SliceTracer, tick_time: float, offsets: list[float]) -> SliceTrace:
+    """生成各阶段相对行情到达的时间（秒）已知的记录"""
+    trace: SliceTrace = start(tracer, "algo")
+    trace.tick_time = tick_time
+    (
+        trace.decided_time,
+        trace.converted_time,
+        trace.sent_time,
+        trace.ack_time,
+        trace.fill_time
+    ) = [None if offset is None else tick_time + offset for offset in offsets]
+    return trace
+
+
+def test_summary():
+    tracer: SliceTracer = SliceTracer(10)
+    make_trace(tracer, 1.0, [0.000010, 0.000020, 0.000050, 0.001050, None])
+    make_trace(tracer, 2.0, [0.000030, 0.000040, 0.000070, None, None])
+
+    summary: dict = tracer.get_summary()
+
+    assert summary["行情->生成委托"]["count"] == 2
+    assert summary["行情->生成委托"]["mean"] == pytest.approx(20)
+    assert summary["行情->生成委托"]["max"] == pytest.approx(30)
+    assert summary["行情->发出委托"]["p50"] == pytest.approx(70)
+    assert summary["下单->回报"]["count"] == 1
+    assert summary["下单->回报"]["mean"] == pytest.approx(1000)
+
+    # 没有成交的阶段不出现在汇总中
+    assert "回报->首次成交" not in summary
+
+    tracer.clear()
+    assert tracer.get_summary() == {}
+    assert not tracer.order_traces
+
+
+def test_export(tmp_path):
+    tracer: SliceTracer = SliceTracer(10)
+    trace: SliceTrace = make_trace(tracer, 1.0, [0.000010, 0.000020, 0.000050, None, None])
+    tracer.add_order(trace, "order1")
+
+    # 没有行情到达时间的记录以生成委托时间为基准
+    no_tick: SliceTrace = start(tracer, "algo2")
+    no_tick.converted_time = no_tick.decided_time + 0.000005
+
+    path = tmp_path.joinpath("traces.csv")
+    assert tracer.export(str(path)) == 2
+
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows: list[dict] = list(csv.DictReader(f))
+
+    assert rows[0]["vt_orderids"] == "order1"
+    assert rows[0]["direction"] == Direction.LONG.value
+    assert float(rows[0]["decided_time"]) == pytest.approx(10)
+    assert float(rows[0]["sent_time"]) == pytest.approx(50)
+    assert rows[0]["ack_time"] == ""
+
+    assert float(rows[1]["decided_time"]) == 0
+    assert float(rows[1]["converted_time"]) == pytest.approx(5)
@@ -0,0 +1,84 @@
+import os
+
+from basic.utils import TradeRecorder, get_day_name
+
+
+def make_row(i: int) -> dict:
+    """生成成交记录"""
+    return {"交易ID": str(i), "交易价格": 100 + i, "交易数量": 1}
+
+
+def read_lines(path) -> list[str]:
+    """读取当日成交文件"""
+    with open(os.path.join(path, get_day_name() + ".csv")) as f:
+        return f.read().splitlines()
+
+
+def test_header_written_once(tmp_path):
+    path: str = str(tmp_path) + "/"
+
+    recorder: TradeRecorder = TradeRecorder(path=path)
+    recorder.start()
+    for i in range(3):
+        recorder.record(make_row(i))
+    recorder.flush()
+    recorder.stop()
+
+    # 重启后追加写入同一文件，不再重复表头
+    recorder = TradeRecorder(path=path)
+    recorder.start()
+    recorder.record(make_row(3))
+    recorder.stop()
+
+    assert read_lines(path) == [
+        "交易ID,交易价格,交易数量",
+        "0,100,1",
+        "1,101,1",
+        "2,102,1",
+        "3,103,1",
+    ]
+
+
+def test_flush_on_close(tmp_path):
+    path: str = str(tmp_path) + "/"
+
+    # 落盘间隔和条数都足够大，关闭时写入剩余记录
+    recorder: TradeRecorder = TradeRecorder(path=path, flush_interval=60, flush_size=10_000)
+    for i in range(500):
+        recorder.record(make_row(i))
+
+    recorder.start()
+    recorder.stop()
+
+    lines: list[str] = read_lines(path)
+    assert len(lines) == 501
+    assert lines[-1] == "499,599,1"
+    assert recorder.file is None
+    assert recorder.record_count == 500
+
+
+def test_error_does_not_stop_thread(tmp_path, capsys):
+    path: str = str(tmp_path) + "/"
+    recorder: TradeRecorder = TradeRecorder(path=path)
+
+    # 第一次打开文件失败
+    open_file = recorder.open_file
+
+    def fail_once(file_name: str) -> None:
+        recorder.open_file = open_file
+        raise OSError("disk full")
+
+    recorder.open_file = fail_once
+    recorder.start()
+    try:
+        recorder.record(make_row(0))
+        recorder.record(make_row(1))
+        recorder.flush()
+
+        assert recorder.thread.is_alive()
+        assert recorder.error_count == 1
+        assert "disk full" in capsys.readouterr().out
+    finally:
+        recorder.stop()
+
+    assert read_lines(path) == ["交易ID,交易价格,交易数量", "1,101,1"]
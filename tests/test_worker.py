@@ -0,0 +1,101 @@
+from threading import Event as ThreadEvent, current_thread
+
+import pytest
+
+from vnpy.event import Event
+from vnpy.trader.event import EVENT_TIMER
+
+from vnpy_rebalancetrader.worker import ExecutionWorker
+
+
+def test_inline_before_accept():
+    worker: ExecutionWorker = ExecutionWorker()
+    handled: list = []
+
+    forwarder = worker.forward(handled.append)
+    forwarder(Event(EVENT_TIMER, 1))
+
+    assert [event.data for event in handled] == [1]
+    assert worker.call(sum, [1, 2]) == 3
+
+
+def test_events_wait_until_start():
+    worker: ExecutionWorker = ExecutionWorker()
+    handled: list = []
+    threads: set = set()
+    event_times: list[float] = []
+
+    def handler(event: Event) -> None:
+        handled.append(event.data)
+        threads.add(current_thread().name)
+        event_times.append(worker.event_time)
+
+    forwarder = worker.forward(handler)
+    stamped = worker.forward(handler, stamp=True)
+
+    # 接收后、启动前只放入收件箱
+    worker.accept()
+    for i in range(3):
+        forwarder(Event(EVENT_TIMER, i))
+    stamped(Event(EVENT_TIMER, 3))
+
+    assert handled == []
+    assert worker.get_depth() == 4
+
+    worker.start()
+    try:
+        # call排在已收到的事件之后执行
+        assert worker.call(lambda: list(handled)) == [0, 1, 2, 3]
+    finally:
+        worker.stop()
+
+    assert threads == {worker.name}
+    assert not worker.accepting
+
+    # 只有记录到达时间的事件在处理期间能读取到达时间
+    assert event_times[:3] == [0, 0, 0]
+    assert event_times[3] > 0
+    assert worker.event_time == 0
+
+
+def test_errors_do_not_stop_worker():
+    errors: list[str] = []
+    worker: ExecutionWorker = ExecutionWorker(errors.append)
+    worker.start()
+
+    def fail(event: Event) -> None:
+        raise RuntimeError("boom")
+
+    try:
+        worker.forward(fail)(Event(EVENT_TIMER))
+
+        done: ThreadEvent = ThreadEvent()
+        worker.submit(done.set)
+        assert done.wait(5)
+        assert len(errors) == 1 and "boom" in errors[0]
+
+        # call的异常返回给调用方
+        with pytest.raises(ZeroDivisionError):
+            worker.call(lambda: 1 / 0)
+        assert worker.call(lambda: current_thread().name) == worker.name
+    finally:
+        worker.stop()
+
+
+def test_engine_close_stops_threads(engine_class, make_engine):
+    engine_class.use_worker = True
+    engine, _ = make_engine("rb2210.SHFE")
+    engine.init()
+
+    assert engine.worker.active and engine.journal.active
+    assert engine.event_engine.handlers[EVENT_TIMER]
+
+    engine.close()
+
+    assert not engine.worker.active
+    assert not engine.journal.active
+    assert not engine.trade_recorder.active
+    assert not engine.snapshot_writer.active
+    assert not engine.log_sink.active
+    assert not engine.event_engine.handlers[EVENT_TIMER]
+    assert engine.log_sink.handler not in engine.log_sink.logger.handlers
@@ -1,10 +1,11 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
+from logging import WARNING
 from enum import Enum
 from math import floor, ceil
 
 from vnpy.trader.utility import round_to
 from vnpy.trader.constant import Direction, Offset
-from vnpy.trader.object import TickData, OrderData, TradeData, ContractData
+from vnpy.trader.object import TickData, OrderData, TradeData, ContractData, OrderRequest
 
 if TYPE_CHECKING:
     from .engine import DfRebalanceEngine
@@ -19,12 +20,53 @@ class AlgoStatus(Enum):
     STOPPED = "撤销"
 
 
+# 交易方向显示文本（预先生成，避免每轮下单重复创建字符串）
+OPEN_OFFSETS: dict[Direction, str] = {d: f"{d.value}开" for d in Direction}
+CLOSE_OFFSETS: dict[Direction, str] = {d: f"{d.value}平" for d in Direction}
+
+
+class AlgoSnapshot(NamedTuple):
+    """算法显示数据快照（不可变，由执行线程生成，供界面线程读取）"""
+
+    algoid: str
+    vt_symbol: str
+    direction: Direction
+    total_volume: int
+    current_pos: int
+    offset: str
+    status: AlgoStatus
+    timer_count: int
+    time_interval: int
+    vol_percent: float
+
+
 class DfTwapAlgo:
     """盾枫TWAP算法"""
 
+    # 不创建实例字典，降低大篮子的内存占用
+    __slots__ = (
+        "engine",
+        "algoid",
+        "vt_symbol",
+        "direction",
+        "total_volume",
+        "time_interval",
+        "vol_percent",
+        "contract",
+        "order_template",
+        "status",
+        "offset",
+        "time_left",
+        "next_time",
+        "current_pos",
+        "active_orderids",
+        "to_run",
+    )
+
     def __init__(
         self,
         engine: "DfRebalanceEngine",
+        algoid: str,
         vt_symbol: str,
         direction: Direction,
         total_volume: int,
@@ -35,6 +77,7 @@ class DfTwapAlgo:
         self.engine: DfRebalanceEngine = engine
 
         # 参数
+        self.algoid: str = algoid                       # 算法编号（同一合约可有多个算法）
         self.vt_symbol: str = vt_symbol
         self.direction: Direction = direction
         self.total_volume: int = total_volume           # 总目标成交量
@@ -42,18 +85,20 @@ class DfTwapAlgo:
             self.total_volume = -self.total_volume
         self.time_interval: int = time_interval         # 时间间隔
         self.vol_percent = vol_percent                  #　对手价盘口的百分比
+        self.contract: ContractData = None              # 合约信息，由引擎设置
+        self.order_template: OrderRequest = None        # 委托模板，由引擎设置
 
         # 变量
         self.status: AlgoStatus = AlgoStatus.WAITING
         self.offset: str = None
-        if self.time_interval < 2:
-            self.engine.write_log(f'[{self.vt_symbol}] 交易时间间隔为{self.time_interval}, 不得小于2 -- 停止交易')
-            self.status = AlgoStatus.STOPPED
-            return
-        self.timer_count: int = self.time_interval - 2
+        self.time_left: float = 2               # 未调度时距下一轮的剩余秒数
+        self.next_time: float = None            # 已调度时下一轮的到期时间
         self.current_pos: int = 0               # 当前仓位
-        self.active_orderids: set[str] = set()
+        self.active_orderids: list[str] = []    # 同时活动的委托很少，列表比集合更省内存
         self.to_run: bool = False
+        if self.time_interval < 2:
+            self.engine.write_log(f'[{self.vt_symbol}] 交易时间间隔为{self.time_interval}, 不得小于2 -- 停止交易', WARNING)
+            self.status = AlgoStatus.STOPPED
 
     def on_trade(self, trade: TradeData):
         """成交推送"""
@@ -81,16 +126,33 @@ class DfTwapAlgo:
             self.to_run = False
             self.run()
 
-    def on_timer(self) -> None:
-        """定时推送"""
+    @property
+    def timer_count(self) -> int:
+        """本轮读秒"""
+        if self.next_time is not None:
+            time_left: float = max(self.next_time - self.engine.clock(), 0)
+        else:
+            time_left: float = self.time_left
 
-        # 间隔检查
-        self.timer_count += 1
-        self.engine.save_data("rebalance_trader_data_backup.json")
-        if self.timer_count < self.time_interval:
-            return
-        self.timer_count = 0
+        return self.time_interval - ceil(time_left)
+
+    def get_snapshot(self) -> AlgoSnapshot:
+        """生成显示数据快照"""
+        return AlgoSnapshot(
+            self.algoid,
+            self.vt_symbol,
+            self.direction,
+            self.total_volume,
+            self.current_pos,
+            self.offset,
+            self.status,
+            self.timer_count,
+            self.time_interval,
+            self.vol_percent
+        )
 
+    def on_timer(self, tick: TickData = None) -> None:
+        """定时推送（由引擎按时间间隔调度，行情驱动模式下附带触发的行情）"""
         # 委托检查
         if self.active_orderids:
             for vt_orderid in self.active_orderids:
@@ -100,16 +162,21 @@ class DfTwapAlgo:
             return
 
         # 执行下单
-        self.run()
+        self.run(tick)
 
-    def run(self) -> None:
+    def run(self, tick: TickData = None) -> None:
         """执行下单"""
         # 过滤无行情的情况
-        tick: TickData = self.engine.get_tick(self.vt_symbol)
+        if not tick:
+            tick = self.engine.get_tick(self.vt_symbol)
         if not tick:
             return
 
-        contract: ContractData = self.engine.get_contract(self.vt_symbol)
+        # 过滤过期行情
+        if not self.engine.check_quote_age(self.vt_symbol):
+            return
+
+        contract: ContractData = self.contract
 
         # 计算剩余委托量
         volume_left: int = abs(self.total_volume) - abs(self.current_pos)
@@ -120,48 +187,52 @@ class DfTwapAlgo:
         # 开仓阶段
         if volume_left > 0:
             direction = self.direction
-            self.offset = f'{direction.value}开'
+            self.offset = OPEN_OFFSETS[direction]
         # 平仓阶段
         elif volume_left < 0:
             if self.direction == Direction.LONG:
                 direction = Direction.SHORT
                 # 防止反向开仓
                 if self.current_pos < 0:
-                    self.engine.write_log(f'[{self.vt_symbol}] 空平阶段: 策略记录的current_pos 与 实际持仓不符, 需检查')
+                    self.engine.write_log(f'[{self.vt_symbol}] 空平阶段: 策略记录的current_pos 与 实际持仓不符, 需检查', WARNING)
                     return
             elif self.direction == Direction.SHORT:
                 direction = Direction.LONG
                 # 防止反向开仓
                 if self.current_pos > 0:
-                    self.engine.write_log(f'[{self.vt_symbol}] 多平阶段: 策略记录的current_pos 与 实际持仓不符, 需检查')
+                    self.engine.write_log(f'[{self.vt_symbol}] 多平阶段: 策略记录的current_pos 与 实际持仓不符, 需检查', WARNING)
                     return
-            self.offset = f'{direction.value}平'
+            self.offset = CLOSE_OFFSETS[direction]
         volume_left = abs(volume_left)
 
+        # 敞口控制：该方向暂停则跳过本轮，否则按系数缩小委托数量
+        factor: float = self.engine.get_order_factor(direction)
+        if not factor:
+            return
+
         # 计算委托价格，1档盘口超加1个pricetick; 计算委托成交量，1档盘口量的百分比
         if direction == Direction.LONG:
             order_price: float = tick.ask_price_1 + contract.pricetick
-            order_volume = tick.ask_volume_1 * self.vol_percent
+            order_volume = tick.ask_volume_1 * self.vol_percent * factor
             order_volume = round_to(order_volume, contract.min_volume)
             order_volume = min(order_volume, volume_left)
         else:
             order_price: float = tick.bid_price_1 - contract.pricetick
-            order_volume = tick.bid_volume_1 * self.vol_percent
+            order_volume = tick.bid_volume_1 * self.vol_percent * factor
             order_volume = round_to(order_volume, contract.min_volume)
             order_volume = min(order_volume, volume_left)
 
         if order_volume == 0:
                 order_volume = contract.min_volume
                 if order_volume == 0:
-                    self.engine.write_log(f'[{self.vt_symbol}] order_volume和contract.min_volume都为0')
+                    self.engine.write_log(f'[{self.vt_symbol}] order_volume和contract.min_volume都为0', WARNING)
 
         # 发出委托
         vt_orderids = self.engine.send_order(
             self,
-            self.vt_symbol,
             direction,
             order_price,
             order_volume
         )
 
-        self.active_orderids.update(vt_orderids)
+        self.active_orderids.extend(vt_orderids)
@@ -0,0 +1,179 @@
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from vnpy.trader.constant import Direction
+from vnpy.trader.object import ContractData
+
+
+BASKET_FIELDS: list[str] = ["vt_symbol", "direction", "total_volume", "time_interval", "vol_percent"]
+
+# 篮子只支持多、空两个方向（净方向等其他取值视为无效）
+BASKET_DIRECTIONS: list[Direction] = [Direction.LONG, Direction.SHORT]
+
+DIRECTION_MAP: dict[str, Direction] = {d.value: d for d in BASKET_DIRECTIONS}
+DIRECTION_MAP.update({d.name: d for d in BASKET_DIRECTIONS})
+
+
+def load_basket(path: str) -> pd.DataFrame:
+    """读取篮子文件（CSV/Parquet/Feather）"""
+    suffix: str = Path(path).suffix.lower()
+
+    if suffix == ".csv":
+        df: pd.DataFrame = pd.read_csv(path, encoding="utf-8-sig", dtype={"vt_symbol": str, "direction": str})
+    elif suffix == ".parquet":
+        df: pd.DataFrame = pd.read_parquet(path)
+    elif suffix == ".feather":
+        df: pd.DataFrame = pd.read_feather(path)
+    else:
+        raise ValueError(f"不支持的篮子文件格式：{suffix}")
+
+    missing: list[str] = [field for field in BASKET_FIELDS if field not in df.columns]
+    if missing:
+        raise ValueError(f"篮子文件缺少字段：{','.join(missing)}")
+
+    return df[BASKET_FIELDS].reset_index(drop=True)
+
+
+def validate_basket(
+    df: pd.DataFrame,
+    get_contract: Callable[[str], ContractData]
+) -> tuple[pd.DataFrame, list[str]]:
+    """
+    整体校验篮子数据
+
+    所有检查按列一次完成，返回整理后的数据（附带合约对象）和全部错误信息，
+    错误信息中的行号与文件中的行号一致（表头为第1行）。
+    """
+    df = df.copy()
+    df["vt_symbol"] = df["vt_symbol"].astype(str).str.strip()
+    df["direction"] = df["direction"].astype(str).str.strip().map(DIRECTION_MAP)
+
+    for field in ["total_volume", "time_interval", "vol_percent"]:
+        df[field] = pd.to_numeric(df[field], errors="coerce")
+
+    contracts: list[ContractData] = [get_contract(vt_symbol) for vt_symbol in df["vt_symbol"]]
+    df["contract"] = contracts
+
+    known: pd.Series = df["contract"].notna()
+    min_volume: pd.Series = pd.Series(
+        [contract.min_volume if contract else np.nan for contract in contracts],
+        index=df.index,
+        dtype=float
+    )
+
+    # 数量须为最小下单量的整数倍
+    lots: pd.Series = df["total_volume"].abs() / min_volume
+    volume_mismatch: pd.Series = known & df["total_volume"].notna() & (min_volume > 0) & ((lots - lots.round()).abs() > 1e-6)
+
+    checks: list[tuple[pd.Series, str]] = [
+        (df["vt_symbol"].duplicated(keep=False), "合约代码重复"),
+        (~known, "找不到合约"),
+        (df["direction"].isna(), "方向无效（须为多或空）"),
+        (df["total_volume"].isna() | (df["total_volume"] < 0), "目标数量无效"),
+        (df["total_volume"].notna() & (df["total_volume"] % 1 != 0), "目标数量须为整数"),
+        (volume_mismatch, "目标数量不是最小下单量的整数倍"),
+        (df["time_interval"].isna() | (df["time_interval"] < 2), "时间间隔不得小于2"),
+        (df["vol_percent"].isna() | (df["vol_percent"] <= 0) | (df["vol_percent"] > 1), "盘口百分比须在0到1之间"),
+    ]
+
+    # 按行号汇总，同一行的多个错误保持检查顺序
+    items: list[tuple[int, str]] = []
+    for mask, reason in checks:
+        for i in np.flatnonzero(mask.to_numpy()):
+            items.append((i, f"第{i + 2}行 {df['vt_symbol'].iat[i]}：{reason}"))
+
+    items.sort(key=lambda item: item[0])
+    errors: list[str] = [msg for _, msg in items]
+
+    return df, errors
+
+
+def diff_basket(df: pd.DataFrame, symbol_algos: dict[str, list]) -> dict:
+    """
+    对比新篮子与当前算法
+
+    目标仓位按方向带符号比较（空头为负）。返回新增、调整、移除和不变的腿，
+    同一合约方向反转或同时运行多个算法时无法按合约调整，作为错误返回。
+    """
+    report: dict = {
+        "add": [],              # 新增的数据行
+        "change": [],           # (算法, 数据行)
+        "remove": [],           # 新篮子中已不存在的算法
+        "unchanged": [],        # 无需调整的算法
+        "errors": [],
+    }
+
+    symbols: set[str] = set()
+
+    for i, row in enumerate(df.itertuples(index=False)):
+        symbols.add(row.vt_symbol)
+
+        algos: list = symbol_algos.get(row.vt_symbol, None)
+        if not algos:
+            report["add"].append(row)
+            continue
+
+        if len(algos) > 1:
+            report["errors"].append(f"第{i + 2}行 {row.vt_symbol}：该合约有{len(algos)}个算法，无法按文件调整")
+            continue
+
+        algo = algos[0]
+
+        if algo.direction != row.direction:
+            report["errors"].append(
+                f"第{i + 2}行 {row.vt_symbol}：方向由{algo.direction.value}变为{row.direction.value}，无法直接调整"
+            )
+            continue
+
+        target: int = get_signed_volume(row.direction, row.total_volume)
+        if (
+            target == algo.total_volume
+            and row.time_interval == algo.time_interval
+            and row.vol_percent == algo.vol_percent
+        ):
+            report["unchanged"].append(algo)
+        else:
+            report["change"].append((algo, row))
+
+    for vt_symbol, algos in symbol_algos.items():
+        if vt_symbol in symbols:
+            continue
+
+        for algo in algos:
+            if algo.total_volume:
+                report["remove"].append(algo)
+            else:
+                report["unchanged"].append(algo)
+
+    return report
+
+
+def get_signed_volume(direction: Direction, volume: float) -> int:
+    """按方向转换为带符号的目标仓位"""
+    if direction == Direction.SHORT:
+        return -int(volume)
+    return int(volume)
+
+
+def format_basket_diff(report: dict) -> str:
+    """生成调仓预览文本"""
+    lines: list[str] = [
+        f"新增{len(report['add'])}个，调整{len(report['change'])}个，"
+        f"平仓{len(report['remove'])}个，不变{len(report['unchanged'])}个"
+    ]
+
+    for row in report["add"]:
+        volume: int = get_signed_volume(row.direction, row.total_volume)
+        lines.append(f"新增 {row.vt_symbol} {row.direction.value} 目标仓位 {volume}")
+
+    for algo, row in report["change"]:
+        volume: int = get_signed_volume(row.direction, row.total_volume)
+        lines.append(f"调整 {algo.vt_symbol} 目标仓位 {algo.total_volume} -> {volume}")
+
+    for algo in report["remove"]:
+        lines.append(f"平仓 {algo.vt_symbol} 目标仓位 {algo.total_volume} -> 0")
+
+    return "\n".join(lines)
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+
+class RecentIdCache:
+    """
+    有界的近期编号集合
+
+    按加入顺序保存编号和加入时间，超过容量或超出时间窗口的最旧编号被淘汰，
+    内存占用不随运行时长增长。用于过滤重复的委托和成交推送。
+    """
+
+    def __init__(self, capacity: int, window: float) -> None:
+        """构造函数"""
+        self.capacity: int = capacity
+        self.window: float = window
+
+        self.ids: OrderedDict[str, float] = OrderedDict()
+
+        # 统计数据
+        self.add_count: int = 0             # 加入次数
+        self.hit_count: int = 0             # 命中（被过滤的重复推送）次数
+        self.evict_count: int = 0           # 淘汰次数
+
+    def __contains__(self, key: str) -> bool:
+        """检查编号是否存在"""
+        return key in self.ids
+
+    def __len__(self) -> int:
+        """当前保存的编号数量"""
+        return len(self.ids)
+
+    def check(self, key: str) -> bool:
+        """检查编号是否存在，存在时计入命中次数"""
+        if key in self.ids:
+            self.hit_count += 1
+            return True
+        return False
+
+    def add(self, key: str, now: float) -> list[str]:
+        """加入编号，返回被淘汰的编号"""
+        self.ids[key] = now
+        self.ids.move_to_end(key)
+        self.add_count += 1
+
+        return self.expire(now)
+
+    def expire(self, now: float) -> list[str]:
+        """淘汰超过容量或超出时间窗口的编号，返回被淘汰的编号"""
+        evicted: list[str] = []
+        deadline: float = now - self.window
+
+        while self.ids:
+            oldest, timestamp = next(iter(self.ids.items()))
+            if len(self.ids) <= self.capacity and timestamp >= deadline:
+                break
+
+            self.ids.popitem(last=False)
+            evicted.append(oldest)
+
+        self.evict_count += len(evicted)
+        return evicted
+
+    def items(self) -> list[tuple[str, float]]:
+        """按加入顺序返回编号和加入时间"""
+        return list(self.ids.items())
+
+    def clear(self) -> None:
+        """清空"""
+        self.ids.clear()
+
+    def get_stats(self) -> dict:
+        """获取统计数据"""
+        return {
+            "size": len(self.ids),
+            "add_count": self.add_count,
+            "hit_count": self.hit_count,
+            "evict_count": self.evict_count,
+        }
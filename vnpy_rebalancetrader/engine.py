@@ -1,5 +1,12 @@
-from dataclasses import dataclass
+from collections import defaultdict
+from copy import copy
 from datetime import datetime
+from concurrent.futures import Future
+from logging import INFO, WARNING, ERROR
+from time import monotonic, perf_counter, perf_counter_ns, time
+from typing import Any, Callable
+
+import pandas as pd
 
 from vnpy.event import EventEngine, Event
 from vnpy.trader.engine import BaseEngine, MainEngine
@@ -7,7 +14,8 @@ from vnpy.trader.event import (
     EVENT_TIMER,
     EVENT_ORDER,
     EVENT_TRADE,
-    EVENT_POSITION
+    EVENT_POSITION,
+    EVENT_CONTRACT
 )
 from vnpy.trader.object import (
     ContractData,
@@ -20,15 +28,22 @@ from vnpy.trader.object import (
     CancelRequest,
     SubscribeRequest
 )
-from vnpy.trader.constant import Direction, Offset, OrderType, Exchange
+from vnpy.trader.constant import Direction, Offset, OrderType, Status
 from vnpy.trader.converter import OffsetConverter
-from vnpy.trader.utility import load_json, save_json
-
-from .algo import AlgoStatus, DfTwapAlgo
+from vnpy.trader.utility import load_json, save_json, get_file_path
 
-from basic.utils import make_print_to_file, save_csv
-make_print_to_file()
+from .algo import AlgoStatus, AlgoSnapshot, DfTwapAlgo
+from .basket import load_basket, validate_basket, diff_basket, format_basket_diff, get_signed_volume
+from .persistence import SnapshotWriter, AlgoJournal
+from .scheduler import AlgoScheduler
+from .dedup import RecentIdCache
+from .holding import HoldingData, HoldingBook
+from .metrics import EngineMetrics, MetricsServer
+from .tracing import SliceTrace, SliceTracer
+from .worker import ExecutionWorker
+from .exposure import ExposureValuator, ArrayExposureValuator, ExposureController
 
+from basic.utils import TradeRecorder, LogSink, LogThrottle
 
 
 APP_NAME: str = "RebalanceTrader"
@@ -38,64 +53,179 @@ EVENT_REBALANCE_LOG = "eRebalanceLog"
 EVENT_REBALANCE_ALGO = "eRebalanceAlgo"
 EVENT_REBALANCE_EXPOSURE = "eRebalanceExposure"
 EVENT_REBALANCE_HOLDING = "eRebalanceHolding"
+EVENT_REBALANCE_BASKET = "eRebalanceBasket"
+EVENT_REBALANCE_PORTFOLIO = "eRebalancePortfolio"
+EVENT_REBALANCE_METRICS = "eRebalanceMetrics"
 
-
-@dataclass
-class HoldingData:
-    """组合持仓数据"""
-    vt_positionid: str
-    symbol: str
-    exchange: Exchange
-    name: str
-    direction: Direction
-    volume: int
-    price: float
-    pnl: float
-    value: float
-
+JOURNAL_TIME_FORMAT: str = "%Y-%m-%d %H:%M:%S.%f"
 
 
 class DfRebalanceEngine(BaseEngine):
     """篮子执行引擎"""
 
     data_filename = "rebalance_trader_data.json"
+    backup_filename = "rebalance_trader_data_backup.json"
+    snapshot_interval: float = 1            # 备份快照最小写入间隔（秒）
+    journal_filename = "rebalance_trader_journal.jsonl"
+    history_filename = "rebalance_trader_history.json"
+    journal_compact_count: int = 10_000     # 日志记录数达到该值后生成检查点
+    journal_fsync: bool = False             # 每条日志记录是否强制落盘
+    log_level: int = INFO                   # 低于该级别的日志不输出
+    log_throttle_window: float = 60         # 重复告警日志的限流窗口（秒）
+    array_basket: bool = False              # 是否使用数组化估值（适用于大篮子）
+    exposure_resume_ratio: float = 0.5      # 敞口回落到上限的该比例以下时解除暂停
+    tick_trigger: bool = False              # 行情驱动模式：到期后等下一个行情推送再执行
+    max_quote_age: float = 0                # 行情最大允许时长（秒），0表示不检查
+    algo_refresh_interval: float = 1        # 算法监控批量推送间隔（秒）
+    dedup_capacity: int = 100_000           # 已结束委托号、成交号的最大保存数量
+    dedup_window: float = 86_400            # 已结束委托号、成交号的保存时长（秒），断线重连可能重推当日全部成交
+    subscribe_retry_interval: float = 30    # 订阅后未收到行情时的重试间隔（秒）
+    metrics_enabled: bool = True            # 是否统计运行指标（运行中可切换）
+    metrics_interval: float = 5             # 运行指标推送间隔（秒）
+    metrics_filename = "rebalance_trader_metrics.json"
+    metrics_dump: bool = False              # 是否定时将运行指标写入文件
+    metrics_port: int = 0                   # 本地指标HTTP服务端口，0表示不启动
+    trace_enabled: bool = True              # 是否记录委托链路（运行中可切换）
+    trace_capacity: int = 10_000            # 委托链路记录的保存数量
+    use_worker: bool = True                 # 是否在独立执行线程中处理算法事件
 
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
-        """构造函数"""
+        """
+        构造函数
+
+        算法状态（algos及其关联字典、估值、持仓、调度器）只由执行线程修改：
+        事件引擎线程只把事件转发到执行线程的收件箱，界面的操作通过submit/call排队执行，
+        界面读取的都是执行线程生成的快照（算法快照、持仓副本、统计字典）。
+        检查点和状态日志、备份快照、成交记录、日志输出分别由各自的后台线程写入。
+        """
         super().__init__(main_engine, event_engine, APP_NAME)
 
+        # 执行线程
+        self.worker: ExecutionWorker = ExecutionWorker(self.on_worker_error)
+        self.forwarders: list[tuple[str, Callable]] = []    # 已注册的事件转发函数
+
         # 对象字典
-        self.algos: dict[str, DfTwapAlgo] = {}      # vt_symbol: DfTwapAlgo
-        self.orders: dict[str, OrderData] = {}
-        self.trades: dict[str, TradeData] = {}
+        self.algos: dict[str, DfTwapAlgo] = {}      # algoid: DfTwapAlgo
+        self.symbol_algos: dict[str, list[DfTwapAlgo]] = defaultdict(list)
+        self.orderid_algo_map: dict[str, DfTwapAlgo] = {}   # vt_orderid: DfTwapAlgo
+        self.active_orders: dict[str, OrderData] = {}
+
+        # 重复推送过滤
+        self.finished_orderids: RecentIdCache = RecentIdCache(self.dedup_capacity, self.dedup_window)
+        self.tradeids: RecentIdCache = RecentIdCache(self.dedup_capacity, self.dedup_window)
+        self.algo_count: int = 0
+
+        # 非本引擎发出委托的成交持仓（只计入敞口）
+        self.external_pos: dict[str, float] = defaultdict(float)
+
+        # 当日委托归属和已计入算法仓位的成交（随状态日志和检查点时的历史文件保存），
+        # 重启后接口重推的当日成交据此归属到算法或直接过滤，不会重复计入敞口。
+        # 按本地时间戳淘汰，与重复推送过滤使用相同的容量和保存时长
+        self.order_history: RecentIdCache = RecentIdCache(self.dedup_capacity, self.dedup_window)
+        self.order_algoids: dict[str, str] = {}     # vt_orderid: algoid
+        self.trade_history: RecentIdCache = RecentIdCache(self.dedup_capacity, self.dedup_window)
+        self.history_changed: bool = False
+
+        # 载入时找不到合约的算法数据，合约推送后恢复（随检查点保存）
+        self.pending_states: dict[str, dict] = {}               # algoid: 算法数据
 
         # 开平转换
         self.offset_converter: OffsetConverter = OffsetConverter(self.main_engine)
 
         # 统计数据
-        self.values: dict[str, dict] = {}           # 实时市值
+        if self.array_basket:
+            self.valuator: ArrayExposureValuator = ArrayExposureValuator()
+        else:
+            self.valuator: ExposureValuator = ExposureValuator()
         self.long_value: int = 0
         self.short_value: int = 0
         self.net_value: int = 0
         self.deviate: float = 0
+        self.residual_value: float = 0
 
         # 敞口限制
         self.exposure_limit: int = 2_000_000
+        self.exposure_controller: ExposureController = ExposureController(self.exposure_resume_ratio)
         self.long_pause: bool = False
         self.short_pause: bool = False
 
         # 查询函数
-        self.get_contract = main_engine.get_contract
         self.get_tick = main_engine.get_tick
+        self.contracts: dict[str, ContractData] = {}    # vt_symbol: ContractData（合约信息缓存）
+        self.subscribed: set[str] = set()               # 已发送订阅请求的合约
+        self.pending_subscribes: dict[str, float] = {}  # vt_symbol: 上次尝试订阅时间（尚未收到行情）
+
+        # 组合持仓
+        self.positions: dict[str, PositionData] = {}        # vt_positionid: 最新持仓推送
+        self.holding_book: HoldingBook = HoldingBook()
+
+        # 定时调度
+        self.clock = monotonic
+        self.scheduler: AlgoScheduler = AlgoScheduler()
+        self.tick_times: dict[str, float] = {}      # vt_symbol: 最新行情到达时间（引擎时钟）
+        self.trigger_time: float = 0                # 触发当前下单的行情到达事件引擎的本地时间（perf_counter），非行情触发为0
+
+        # 算法推送
+        self.changed_algos: dict[DfTwapAlgo, None] = {}      # 按加入顺序保存，保证界面行序稳定
+        self.algo_displays: dict[DfTwapAlgo, AlgoSnapshot] = {}
+        self.last_publish_time: float = 0
 
         # 算法状态
+        self.inited: bool = False
         self.algo_started = False
 
+        # 备份快照
+        self.snapshot_writer: SnapshotWriter = SnapshotWriter(self.backup_filename)
+        self.data_dirty: bool = False
+        self.last_snapshot_time: float = 0
+
+        # 日志输出
+        self.log_sink: LogSink = LogSink(level=self.log_level)
+        self.log_throttle: LogThrottle = LogThrottle(self.log_throttle_window)
+
+        # 成交记录
+        self.trade_recorder: TradeRecorder = TradeRecorder(log_sink=self.log_sink)
+
+        # 状态日志
+        self.journal: AlgoJournal = AlgoJournal(
+            self.journal_filename,
+            self.journal_fsync,
+            self.on_journal_error
+        )
+        self.replaying: bool = False
+
+        # 运行指标
+        self.metrics: EngineMetrics = EngineMetrics(self.metrics_enabled)
+        self.metrics_writer: SnapshotWriter = SnapshotWriter(self.metrics_filename)
+        self.metrics_server: MetricsServer = MetricsServer(self.metrics_port)
+        self.last_metrics_time: float = 0
+
+        # 委托链路追踪
+        self.tracer: SliceTracer = SliceTracer(self.trace_capacity, self.trace_enabled)
+
     def init(self) -> bool:
         """初始化引擎"""
+        # 载入数据期间到达的事件先在收件箱中等待，执行线程启动后再处理
+        if self.use_worker:
+            self.worker.accept()
+
         self.register_event()
+        self.log_sink.start()
+        self.snapshot_writer.start()
+        self.trade_recorder.start()
+
+        if self.metrics_dump:
+            self.metrics_writer.start()
+        if self.metrics_port:
+            self.metrics_server.start()
 
         n: bool = self.load_data()
+        self.inited = True
+
+        # 数据载入完成后启动执行线程
+        if self.use_worker:
+            self.journal.start()
+            self.worker.start()
 
         self.write_log("引擎初始化完成")
 
@@ -103,45 +233,176 @@ class DfRebalanceEngine(BaseEngine):
 
     def close(self) -> None:
         """关闭引擎"""
+        # 未初始化时不覆盖已有的检查点和状态日志
+        if not self.inited:
+            return
+
+        self.inited = False
+        self.unregister_event()
+
+        # 在执行线程中处理完已收到的事件并保存，再按启动的相反顺序停止各线程
+        self.worker.call(self.save_all)
+        self.worker.stop()
+        self.journal.close()
+
+        self.metrics_server.stop()
+        self.metrics_writer.stop()
+        self.trade_recorder.stop()
+        self.snapshot_writer.stop()
+        self.log_sink.stop()
+
+    def save(self) -> None:
+        """保存检查点和备份快照（由后台线程写入，不等待完成）"""
+        self.save_data()
+        self.save_snapshot(force=True)
+
+    def save_all(self) -> None:
+        """保存检查点、备份快照和成交记录，并等待写入完成"""
         self.save_data()
+        self.save_snapshot(force=True)
+        if not self.journal.flush():
+            self.write_log("状态日志或检查点写入失败，请检查磁盘后重新保存", ERROR)
+        self.trade_recorder.flush()
+
+        self.publish_metrics(force=True)
+
+    def submit(self, func: Callable, *args) -> Future:
+        """提交操作到执行线程（界面线程修改算法状态的唯一入口）"""
+        return self.worker.submit(func, *args)
+
+    def call(self, func: Callable, *args) -> Any:
+        """在执行线程中执行操作并等待结果"""
+        return self.worker.call(func, *args)
+
+    def on_worker_error(self, msg: str) -> None:
+        """执行线程异常"""
+        self.write_log(msg, ERROR)
+
+    def on_journal_error(self, msg: str) -> None:
+        """状态日志写入异常（在写入线程中调用），下一次定时事件会重新生成检查点"""
+        self.write_log(msg, ERROR)
 
     def register_event(self) -> None:
         """注册事件监听"""
-        self.event_engine.register(EVENT_TIMER, self.process_timer_event)
-        self.event_engine.register(EVENT_ORDER, self.process_order_event)
-        self.event_engine.register(EVENT_TRADE, self.process_trade_event)
-        self.event_engine.register(EVENT_POSITION, self.process_position_event)
+        # 事件处理函数统一统计耗时，由事件引擎线程转发到执行线程处理
+        handlers: list[tuple[str, str, Callable]] = [
+            (EVENT_TIMER, "timer", self.process_timer_event),
+            (EVENT_ORDER, "order", self.process_order_event),
+            (EVENT_TRADE, "trade", self.process_trade_event),
+            (EVENT_POSITION, "position", self.process_position_event),
+            (EVENT_TICK, "tick", self.process_tick_event),
+            (EVENT_CONTRACT, "contract", self.process_contract_event),
+        ]
+
+        # 行情事件在到达时记录本地时间，行情到委托的延迟包含排队时间
+        for type, name, handler in handlers:
+            forwarder: Callable = self.worker.forward(self.metrics.wrap(name, handler), type == EVENT_TICK)
+            self.event_engine.register(type, forwarder)
+            self.forwarders.append((type, forwarder))
+
+    def unregister_event(self) -> None:
+        """注销事件监听"""
+        for type, forwarder in self.forwarders:
+            self.event_engine.unregister(type, forwarder)
+        self.forwarders.clear()
+
+    def process_tick_event(self, event: Event) -> None:
+        """处理行情事件"""
+        tick: TickData = event.data
+        now: float = self.clock()
+        self.tick_times[tick.vt_symbol] = now
+
+        # 未经转发函数直接调用时没有到达时间
+        arrival_time: float = self.worker.event_time
+        self.tracer.on_tick(tick.vt_symbol, arrival_time or None)
+
+        # 收到行情即订阅成功
+        if self.pending_subscribes:
+            self.pending_subscribes.pop(tick.vt_symbol, None)
+
+        if self.valuator.update_price(tick.vt_symbol, tick.last_price):
+            self.check_exposure()
+
+        # 重新估值该合约的持仓
+        self.holding_book.update_price(tick.vt_symbol, tick.last_price)
+
+        # 行情驱动模式下，唤醒该合约已到期的算法
+        if not self.tick_trigger:
+            return
+
+        algos: list = self.symbol_algos.get(tick.vt_symbol, None)
+        if not algos:
+            return
+
+        self.trigger_time = arrival_time
+        try:
+            for algo in algos:
+                if (
+                    algo.status == AlgoStatus.RUNNING
+                    and algo.next_time is not None
+                    and now >= algo.next_time
+                ):
+                    self.fire_algo(algo, tick)
+        finally:
+            self.trigger_time = 0
+
+    def process_contract_event(self, event: Event) -> None:
+        """处理合约事件，刷新已缓存的合约信息，重试等待中的订阅"""
+        contract: ContractData = event.data
+
+        if self.pending_states:
+            self.contracts[contract.vt_symbol] = contract
+            self.restore_pending_states(contract.vt_symbol)
+
+        if contract.vt_symbol in self.pending_subscribes:
+            self.contracts[contract.vt_symbol] = contract
+            self.send_subscribe(contract.vt_symbol)
+
+        if contract.vt_symbol not in self.contracts:
+            return
+
+        self.contracts[contract.vt_symbol] = contract
+
+        for algo in self.symbol_algos.get(contract.vt_symbol, []):
+            self.set_algo_contract(algo, contract)
 
     def process_timer_event(self, event: Event) -> None:
         """处理定时事件"""
         # 检查敞口
         self.check_exposure()
+        self.put_exposure_event()
 
-        # 生成列表避免字典改变
-        algos: list = list(self.algos.values())
+        # 只唤醒到期的算法
+        now: float = self.clock()
 
-        for algo in algos:
-            if algo.status == AlgoStatus.RUNNING:
-                algo.on_timer()
-
-                self.put_algo_event(algo)
-
-                tick: TickData = self.get_tick(algo.vt_symbol)
-                if not tick:
-                    self.subscribe(algo.vt_symbol)
-                    return
-                
-                contract: ContractData = self.get_contract(algo.vt_symbol)
-                if not contract:
-                    return
-                
-                self.values[algo.vt_symbol] = {
-                    'value': tick.last_price * abs(algo.current_pos) * contract.size,
-                    'direction': algo.direction.value
-                }
-        
-        # 更新实时市值
-        self.update_immediate_value()
+        for algo in self.scheduler.pop_due(now):
+            # 行情驱动模式下保留到期时间，等待下一个行情推送
+            if self.tick_trigger:
+                continue
+
+            self.fire_algo(algo)
+
+        # 重试尚未收到行情的订阅
+        if self.pending_subscribes:
+            self.retry_subscribes(now)
+
+        # 淘汰超出保存时长的委托归属和成交记录
+        self.prune_history(time())
+
+        # 批量推送算法和持仓更新
+        self.publish_algo_events()
+        self.publish_holding_events()
+
+        # 写入备份快照
+        self.save_snapshot()
+
+        # 采样并推送运行指标
+        self.metrics.sample(self.event_engine, now, self.worker.get_depth())
+        self.publish_metrics()
+
+        # 日志过长或写入失败时生成检查点
+        if self.journal.failed or self.journal.record_count >= self.journal_compact_count:
+            self.save_data()
         
     def process_position_event(self, event: Event):
         """处理持仓事件"""
@@ -149,51 +410,84 @@ class DfRebalanceEngine(BaseEngine):
 
         self.offset_converter.update_position(position)
 
-        # 推送组合持仓更新
-        tick: TickData = self.get_tick(position.vt_symbol)
-        if not tick:
-            self.subscribe(position.vt_symbol)
+        # 过滤数量、均价、盈亏都没有变化的重复推送
+        old_position: PositionData = self.positions.get(position.vt_positionid, None)
+        if (
+            old_position
+            and old_position.volume == position.volume
+            and old_position.price == position.price
+            and old_position.pnl == position.pnl
+        ):
             return
-        
+
+        # 尚无合约信息时不缓存，合约推送后的下一次持仓推送再计入
         contract: ContractData = self.get_contract(position.vt_symbol)
         if not contract:
             return
-        
-        value: float = tick.last_price * position.volume * contract.size
-
-        holding: HoldingData = HoldingData(
-            vt_positionid=position.vt_positionid,
-            symbol=position.symbol,
-            exchange=position.exchange,
-            name=contract.name,
-            direction=position.direction,
-            volume=position.volume,
-            price=position.price,
-            pnl=round(position.pnl, 0),
-            value=round(value, 0)
-        )
 
-        event: Event = Event(EVENT_REBALANCE_HOLDING, holding)
-        self.event_engine.put(event)
+        # 尚无行情时先订阅，等行情推送后再盯市
+        tick: TickData = self.get_tick(position.vt_symbol)
+        if not tick:
+            self.subscribe(position.vt_symbol)
+            self.holding_book.update_position(position, contract)
+        else:
+            self.holding_book.update_position(position, contract, tick.last_price)
+
+        self.positions[position.vt_positionid] = position
 
     def process_trade_event(self, event: Event) -> None:
         """处理成交事件"""
         trade: TradeData = event.data
 
         # 过滤重复推送
-        if trade.vt_tradeid in self.trades:
+        if self.tradeids.check(trade.vt_tradeid):
             return
-        self.trades[trade.vt_tradeid] = trade
+        self.tradeids.add(trade.vt_tradeid, self.clock())
 
         # 更新到开平转换器
         self.offset_converter.update_trade(trade)
 
-        # 推送给算法
-        algo: DfTwapAlgo = self.algos.get(trade.vt_symbol, None)
-        if algo:
+        # 推送给算法，非本引擎发出的委托只计入敞口
+        algo: DfTwapAlgo = self.orderid_algo_map.get(trade.vt_orderid, None)
+        if not algo:
+            # 重启前已计入算法仓位的成交
+            if trade.vt_tradeid in self.trade_history:
+                return
+
+            # 重启前发出的委托
+            algo = self.get_history_algo(trade.vt_orderid)
+
+            # 所属算法尚未恢复时计入暂存的算法数据
+            if not algo and self.update_pending_state(trade):
+                return
+
+        if not algo:
+            self.update_external_pos(trade)
+        else:
+            self.add_trade_history(trade.vt_tradeid, time())
+            self.tracer.on_fill(trade.vt_orderid)
+
+            start: int = perf_counter_ns() if self.metrics.enabled else 0
             algo.on_trade(trade)
+            if start:
+                self.metrics.record("algo.on_trade", perf_counter_ns() - start)
+
+            if self.valuator.update_pos(algo.algoid, algo.current_pos):
+                self.check_exposure()
+            self.mark_dirty()
+
+            if trade.direction == Direction.LONG:
+                volume: float = trade.volume
+            else:
+                volume: float = -trade.volume
+            self.write_journal(
+                "trade",
+                algo,
+                vt_tradeid=trade.vt_tradeid,
+                volume=volume
+            )
             # self.write_log(f'[成交记录]: {trade}')
-            contract: ContractData = self.get_contract(trade.vt_symbol)
+            contract: ContractData = algo.contract
             trade_data = {
                 '交易ID': trade.tradeid,
                 '交易时间': trade.datetime,
@@ -206,11 +500,14 @@ class DfRebalanceEngine(BaseEngine):
                 '交易数量': trade.volume,
                 '交易接口': trade.gateway_name,
             }
-            save_csv(data=trade_data)
+            start: int = perf_counter_ns() if self.metrics.enabled else 0
+            self.trade_recorder.record(trade_data)
+            if start:
+                self.metrics.record("trade_record", perf_counter_ns() - start)
 
             # 检查是否结束
             if algo.current_pos == algo.total_volume:
-                self.write_log(f"{trade.vt_symbol}交易结束! [{algo.current_pos}/{algo.total_volume}]")
+                self.write_log(f"{algo.algoid}[{trade.vt_symbol}]交易结束! [{algo.current_pos}/{algo.total_volume}]")
 
             self.put_algo_event(algo)
 
@@ -219,20 +516,176 @@ class DfRebalanceEngine(BaseEngine):
         order: OrderData = event.data
 
         # 过滤已经结束的委托推送
-        existing_order = self.orders.get(order.vt_orderid, None)
-        if existing_order and not existing_order.is_active():
+        if self.finished_orderids.check(order.vt_orderid):
             return
-        self.orders[order.vt_orderid] = order
+
+        if order.is_active():
+            self.active_orders[order.vt_orderid] = order
+        else:
+            self.active_orders.pop(order.vt_orderid, None)
+
+            # 委托结束后仍保留算法归属，直到委托号被淘汰（成交推送可能晚于委托推送）
+            evicted: list[str] = self.finished_orderids.add(order.vt_orderid, self.clock())
+            for vt_orderid in evicted:
+                self.orderid_algo_map.pop(vt_orderid, None)
 
         self.offset_converter.update_order(order)
 
-        algo: DfTwapAlgo = self.algos.get(order.vt_symbol, None)
+        if order.status != Status.SUBMITTING:
+            self.tracer.on_ack(order.vt_orderid)
+
+        algo: DfTwapAlgo = self.orderid_algo_map.get(order.vt_orderid, None)
         if algo:
+            start: int = perf_counter_ns() if self.metrics.enabled else 0
             algo.on_order(order)
+            if start:
+                self.metrics.record("algo.on_order", perf_counter_ns() - start)
+
+    def get_history_algo(self, vt_orderid: str) -> DfTwapAlgo:
+        """查找重启前发出委托所属的算法"""
+        algoid: str = self.order_algoids.get(vt_orderid, None)
+        if not algoid:
+            return None
+        return self.algos.get(algoid, None)
+
+    def update_pending_state(self, trade: TradeData) -> bool:
+        """重启前委托的成交计入尚未恢复的算法数据，返回是否已计入"""
+        algoid: str = self.order_algoids.get(trade.vt_orderid, None)
+        if not algoid:
+            return False
+
+        d: dict = self.pending_states.get(algoid, None)
+        if not d:
+            return False
+
+        if trade.direction == Direction.LONG:
+            volume: float = trade.volume
+        else:
+            volume: float = -trade.volume
+        d["current_pos"] += volume
+
+        self.add_trade_history(trade.vt_tradeid, time())
+        self.mark_dirty()
+        self.write_journal(
+            "trade",
+            algoid=algoid,
+            vt_symbol=d["vt_symbol"],
+            vt_tradeid=trade.vt_tradeid,
+            volume=volume
+        )
+        return True
+
+    def add_order_history(self, vt_orderid: str, algoid: str, timestamp: float) -> None:
+        """记录委托归属，淘汰的委托号同时移除归属"""
+        self.order_algoids[vt_orderid] = algoid
+
+        for evicted in self.order_history.add(vt_orderid, timestamp):
+            self.order_algoids.pop(evicted, None)
+
+        self.history_changed = True
+
+    def add_trade_history(self, vt_tradeid: str, timestamp: float) -> None:
+        """记录已计入算法仓位的成交"""
+        self.trade_history.add(vt_tradeid, timestamp)
+        self.history_changed = True
+
+    def prune_history(self, now: float) -> None:
+        """移除超出保存时长的委托归属和成交记录"""
+        evicted: list[str] = self.order_history.expire(now)
+        for vt_orderid in evicted:
+            self.order_algoids.pop(vt_orderid, None)
+
+        if self.trade_history.expire(now) or evicted:
+            self.history_changed = True
+
+    def clear_history(self) -> None:
+        """清空委托归属"""
+        self.order_history.clear()
+        self.order_algoids.clear()
+        self.history_changed = True
+
+    def get_history_data(self) -> dict:
+        """生成委托归属和成交记录的历史文件数据（按记录时间排序）"""
+        return {
+            "orders": [
+                (vt_orderid, self.order_algoids[vt_orderid], timestamp)
+                for vt_orderid, timestamp in self.order_history.items()
+            ],
+            "trades": self.trade_history.items()
+        }
+
+    def update_external_pos(self, trade: TradeData) -> None:
+        """非本引擎委托的成交，按合约汇总为外部估值腿"""
+        contract: ContractData = self.get_contract(trade.vt_symbol)
+        if not contract:
+            return
+
+        if trade.direction == Direction.LONG:
+            pos: float = self.external_pos[trade.vt_symbol] + trade.volume
+        else:
+            pos: float = self.external_pos[trade.vt_symbol] - trade.volume
+        self.external_pos[trade.vt_symbol] = pos
+
+        # 外部腿的方向随净持仓变化，目标等于持仓（不产生剩余市值）
+        key: str = f"{trade.vt_symbol}.external"
+
+        if not pos:
+            self.valuator.remove_leg(key)
+        else:
+            tick: TickData = self.get_tick(trade.vt_symbol)
+            if not tick:
+                self.subscribe(trade.vt_symbol)
+
+            self.valuator.add_leg(
+                key,
+                trade.vt_symbol,
+                contract.size,
+                Direction.LONG if pos > 0 else Direction.SHORT,
+                pos,
+                pos,
+                tick.last_price if tick else trade.price
+            )
+
+        self.check_exposure()
+
+    def get_contract(self, vt_symbol: str) -> ContractData:
+        """查询合约（首次查询后缓存，合约推送时刷新）"""
+        contract: ContractData = self.contracts.get(vt_symbol, None)
+        if contract:
+            return contract
+
+        contract = self.main_engine.get_contract(vt_symbol)
+        if contract:
+            self.contracts[vt_symbol] = contract
+        return contract
+
+    def set_algo_contract(self, algo: DfTwapAlgo, contract: ContractData) -> None:
+        """设置算法的合约信息和委托模板，下单时只需填写方向、价格和数量"""
+        algo.contract = contract
+        algo.order_template = OrderRequest(
+            symbol=contract.symbol,
+            exchange=contract.exchange,
+            direction=algo.direction,
+            type=OrderType.LIMIT,
+            volume=0,
+            price=0,
+            reference=f"{APP_NAME}_{algo.algoid}"
+        )
 
     def subscribe(self, vt_symbol: str) -> None:
-        """订阅行情"""
+        """订阅行情（每个合约只订阅一次，收到行情前由定时和合约推送重试）"""
+        if vt_symbol in self.subscribed or vt_symbol in self.pending_subscribes:
+            return
+
+        self.send_subscribe(vt_symbol)
+
+    def send_subscribe(self, vt_symbol: str) -> bool:
+        """发送订阅请求，尚无合约信息时等待合约推送"""
+        self.pending_subscribes[vt_symbol] = self.clock()
+
         contract: ContractData = self.get_contract(vt_symbol)
+        if not contract:
+            return False
 
         req = SubscribeRequest(
             symbol=contract.symbol,
@@ -240,6 +693,15 @@ class DfRebalanceEngine(BaseEngine):
         )
         self.main_engine.subscribe(req, contract.gateway_name)
 
+        self.subscribed.add(vt_symbol)
+        return True
+
+    def retry_subscribes(self, now: float) -> None:
+        """重新发送超过重试间隔仍未收到行情的订阅"""
+        for vt_symbol, last_time in list(self.pending_subscribes.items()):
+            if now - last_time >= self.subscribe_retry_interval:
+                self.send_subscribe(vt_symbol)
+
     def add_algo(
         self,
         vt_symbol: str,
@@ -248,110 +710,326 @@ class DfRebalanceEngine(BaseEngine):
         total_volume: int,
         time_interval: int,
         # total_time: int,
-        vol_percent: float
-    ) -> bool:
-        """添加算法"""
+        vol_percent: float,
+        algoid: str = None
+    ) -> str:
+        """添加算法，返回算法编号"""
         # 检查合约信息
         contract: ContractData = self.get_contract(vt_symbol)
         if not contract:
-            self.write_log(f"添加算法失败，找不到合约：{vt_symbol}")
-            return
+            self.write_log(f"添加算法失败，找不到合约：{vt_symbol}", WARNING)
+            return ""
 
         # 订阅行情推送
         self.subscribe(vt_symbol)
 
+        algo: DfTwapAlgo = self.create_algo(contract, direction, total_volume, time_interval, vol_percent, algoid)
+
+        self.write_log(f"添加算法成功{algo.algoid}[{vt_symbol}]")
+        return algo.algoid
+
+    def new_algoid(self) -> str:
+        """生成新的算法编号"""
+        while True:
+            self.algo_count += 1
+            algoid: str = f"DfTwap_{self.algo_count}"
+            if algoid not in self.algos:
+                return algoid
+
+    def create_algo(
+        self,
+        contract: ContractData,
+        direction: Direction,
+        total_volume: int,
+        time_interval: int,
+        vol_percent: float,
+        algoid: str = None
+    ) -> DfTwapAlgo:
+        """创建算法实例并加入估值（不订阅行情，不输出日志）"""
+        vt_symbol: str = contract.vt_symbol
+
+        if not algoid:
+            algoid = self.new_algoid()
+
         # 创建算法实例
         algo: DfTwapAlgo = DfTwapAlgo(
             self,
+            algoid,
             vt_symbol,
             direction,
             total_volume,
             time_interval,
             vol_percent
         )
-        self.algos[vt_symbol] = algo
+        self.set_algo_contract(algo, contract)
+
+        old_algo: DfTwapAlgo = self.algos.get(algoid, None)
+        if old_algo:
+            self.scheduler.cancel(old_algo)
+            self.symbol_algos[vt_symbol].remove(old_algo)
+            self.algo_displays.pop(old_algo, None)
+
+        self.algos[algoid] = algo
+        self.symbol_algos[vt_symbol].append(algo)
+        self.put_algo_event(algo)
+        self.mark_dirty()
+
+        # 添加估值腿
+        tick: TickData = self.get_tick(vt_symbol)
+        self.valuator.add_leg(
+            algoid,
+            vt_symbol,
+            contract.size,
+            algo.direction,
+            algo.current_pos,
+            algo.total_volume,
+            tick.last_price if tick else 0
+        )
+
+        self.write_journal(
+            "add",
+            algo,
+            direction=algo.direction.value,
+            total_volume=algo.total_volume,
+            time_interval=algo.time_interval,
+            vol_percent=algo.vol_percent
+        )
+
+        return algo
+
+    def add_algos_bulk(self, path: str) -> dict:
+        """
+        批量添加篮子文件中的算法
+
+        先整体校验全部数据行，有任何错误则不添加并一次性汇报全部错误；
+        校验通过后按接口批量订阅行情，最后推送一条汇总事件。
+        """
+        summary: dict = {"path": path, "count": 0, "errors": []}
+
+        try:
+            df: pd.DataFrame = load_basket(path)
+        except Exception as ex:
+            summary["errors"].append(f"读取篮子文件失败：{ex}")
+        else:
+            df, errors = validate_basket(df, self.get_contract)
+            summary["errors"].extend(errors)
+
+        if summary["errors"]:
+            msg: str = "\n".join(summary["errors"])
+            self.write_log(f"委托篮子数据导入失败：{path}，共{len(summary['errors'])}处错误\n{msg}", WARNING)
+            self.put_basket_event(summary)
+            return summary
+
+        # 按接口汇总订阅请求
+        gateway_reqs: dict[str, list[SubscribeRequest]] = defaultdict(list)
+
+        for row in df.itertuples(index=False):
+            contract: ContractData = row.contract
+            if contract.vt_symbol not in self.subscribed:
+                self.subscribed.add(contract.vt_symbol)
+                self.pending_subscribes[contract.vt_symbol] = self.clock()
+                gateway_reqs[contract.gateway_name].append(
+                    SubscribeRequest(symbol=contract.symbol, exchange=contract.exchange)
+                )
+
+            self.create_algo(
+                contract,
+                row.direction,
+                int(row.total_volume),
+                int(row.time_interval),
+                float(row.vol_percent)
+            )
+
+        for gateway_name, reqs in gateway_reqs.items():
+            for req in reqs:
+                self.main_engine.subscribe(req, gateway_name)
+
+        summary["count"] = len(df)
+        summary["gateways"] = {gateway_name: len(reqs) for gateway_name, reqs in gateway_reqs.items()}
+
+        self.write_log(f"委托篮子数据导入成功：{path}，共{len(df)}个算法")
+        self.put_basket_event(summary)
+        return summary
+
+    def preview_basket(self, path: str) -> dict:
+        """生成调仓到新篮子的预览（不修改算法）"""
+        report: dict = {"path": path, "errors": []}
+
+        try:
+            df: pd.DataFrame = load_basket(path)
+        except Exception as ex:
+            report["errors"].append(f"读取篮子文件失败：{ex}")
+            return report
+
+        df, errors = validate_basket(df, self.get_contract)
+        if errors:
+            report["errors"].extend(errors)
+            return report
+
+        report.update(diff_basket(df, self.symbol_algos))
+        report["text"] = format_basket_diff(report)
+        return report
+
+    def rebalance_to_file(self, path: str, preview_text: str = None) -> dict:
+        """
+        按新篮子文件增量调仓
+
+        执行时重新读取文件并与当前算法对比，preview_text为确认时的预览文本，
+        预览后算法或文件有变化则不调整，需重新预览确认。
+        调整目标变化的腿，新增腿，不在新篮子中的腿目标置0平仓，其余保持不动。
+        已经启动的篮子中新增的腿和等待中的平仓腿直接启动，暂停中的平仓腿恢复运行。
+        """
+        report: dict = self.preview_basket(path)
+
+        if not report["errors"] and preview_text is not None and report["text"] != preview_text:
+            report["errors"].append("预览后算法或篮子文件已变化，请重新预览")
+
+        if report["errors"]:
+            msg: str = "\n".join(report["errors"])
+            self.write_log(f"调仓失败：{path}，共{len(report['errors'])}处错误\n{msg}", WARNING)
+            return report
+
+        for algo, row in report["change"]:
+            algo.total_volume = get_signed_volume(row.direction, row.total_volume)
+            algo.time_interval = int(row.time_interval)
+            algo.vol_percent = float(row.vol_percent)
+            self.update_target(algo)
+
+        for algo in report["remove"]:
+            algo.total_volume = 0
+            self.update_target(algo)
+
+            # 平仓腿须处于运行状态才会执行
+            if algo.status == AlgoStatus.WAITING and self.algo_started:
+                self.start_algo(algo.algoid)
+            elif algo.status == AlgoStatus.PAUSED:
+                self.resume_algo(algo.algoid)
+            elif algo.status == AlgoStatus.STOPPED and algo.current_pos:
+                self.write_log(f"{algo.algoid}[{algo.vt_symbol}]已停止，平仓需手动重置为运行", WARNING)
+
+        for row in report["add"]:
+            contract: ContractData = row.contract
+            self.subscribe(contract.vt_symbol)
+
+            algo: DfTwapAlgo = self.create_algo(
+                contract,
+                row.direction,
+                int(row.total_volume),
+                int(row.time_interval),
+                float(row.vol_percent)
+            )
+            if self.algo_started:
+                self.start_algo(algo.algoid)
+
+        # 保存检查点，参数调整不进入状态日志
+        self.save_data()
+
+        self.write_log(f"调仓完成：{path}，{report['text'].splitlines()[0]}")
+        return report
+
+    def update_target(self, algo: DfTwapAlgo) -> None:
+        """目标仓位修改后同步估值、调度和推送"""
+        self.valuator.update_target(algo.algoid, algo.total_volume)
+        self.reset_timer_count(algo, second=2)
         self.put_algo_event(algo)
+        self.mark_dirty()
+        self.write_journal("target", algo, total_volume=algo.total_volume)
 
-        self.write_log(f"添加算法成功{vt_symbol}")
+    def put_basket_event(self, summary: dict) -> None:
+        """推送篮子导入汇总事件"""
+        event: Event = Event(EVENT_REBALANCE_BASKET, summary)
+        self.event_engine.put(event)
 
-    def start_algo(self, vt_symbol: str) -> bool:
+    def start_algo(self, algoid: str) -> bool:
         """启动算法"""
-        algo: DfTwapAlgo = self.algos[vt_symbol]
+        algo: DfTwapAlgo = self.algos[algoid]
 
         # 只允许启动【等待】状态的算法
         if algo.status != AlgoStatus.WAITING:
             return False
 
         algo.status = AlgoStatus.RUNNING
+        self.update_schedule(algo)
         self.put_algo_event(algo)
+        self.mark_dirty()
+        self.write_journal("status", algo, status=algo.status.name)
 
-        self.write_log(f"启动算法执行{vt_symbol}")
+        self.write_log(f"启动算法执行{algoid}[{algo.vt_symbol}]")
         return True
 
-    def pause_algo(self, vt_symbol: str) -> bool:
+    def pause_algo(self, algoid: str) -> bool:
         """暂停算法"""
-        algo: DfTwapAlgo = self.algos[vt_symbol]
+        algo: DfTwapAlgo = self.algos[algoid]
 
         # 只允许暂停【运行】状态的算法
         if algo.status != AlgoStatus.RUNNING:
             return False
 
         algo.status = AlgoStatus.PAUSED
+        self.update_schedule(algo)
         self.put_algo_event(algo)
+        self.mark_dirty()
+        self.write_journal("status", algo, status=algo.status.name)
 
-        self.write_log(f"暂停算法执行{vt_symbol}")
+        self.write_log(f"暂停算法执行{algoid}[{algo.vt_symbol}]")
         return True
 
-    def resume_algo(self, vt_symbol: str) -> bool:
+    def resume_algo(self, algoid: str) -> bool:
         """恢复算法"""
-        algo: DfTwapAlgo = self.algos[vt_symbol]
+        algo: DfTwapAlgo = self.algos[algoid]
 
         # 只允许恢复【暂停】状态的算法
         if algo.status != AlgoStatus.PAUSED:
             return False
 
         algo.status = AlgoStatus.RUNNING
+        self.update_schedule(algo)
         self.put_algo_event(algo)
+        self.mark_dirty()
+        self.write_journal("status", algo, status=algo.status.name)
 
-        self.write_log(f"恢复算法执行{vt_symbol}")
+        self.write_log(f"恢复算法执行{algoid}[{algo.vt_symbol}]")
         return True
 
-    def stop_algo(self, vt_symbol: str) -> bool:
+    def stop_algo(self, algoid: str) -> bool:
         """停止算法"""
-        algo: DfTwapAlgo = self.algos[vt_symbol]
+        algo: DfTwapAlgo = self.algos[algoid]
 
         # 只允许停止【运行】、【暂停】状态的算法
         if algo.status not in {AlgoStatus.RUNNING, AlgoStatus.PAUSED}:
             return False
 
         algo.status = AlgoStatus.STOPPED
+        self.update_schedule(algo)
         self.put_algo_event(algo)
+        self.mark_dirty()
+        self.write_journal("status", algo, status=algo.status.name)
 
-        self.write_log(f"停止算法执行{vt_symbol}")
+        self.write_log(f"停止算法执行{algoid}[{algo.vt_symbol}]")
         return True
 
     def start_algos(self) -> None:
         """批量启动算法"""
-        for vt_symbol in self.algos.keys():
-            self.start_algo(vt_symbol)
+        for algoid in self.algos.keys():
+            self.start_algo(algoid)
 
         self.algo_started = True
 
     def pause_algos(self, direction: Direction) -> None:
         """批量暂停算法"""
-        for vt_symbol, algo in self.algos.items():
+        for algoid, algo in self.algos.items():
             if algo.direction == direction:
-                self.pause_algo(vt_symbol)
+                self.pause_algo(algoid)
 
     def resume_algos(self) -> None:
         """批量恢复算法"""
-        for vt_symbol in self.algos.keys():
-            self.resume_algo(vt_symbol)
+        for algoid in self.algos.keys():
+            self.resume_algo(algoid)
 
     def stop_algos(self) -> None:
         """批量停止算法"""
-        for vt_symbol in self.algos.keys():
-            self.stop_algo(vt_symbol)
+        for algoid in self.algos.keys():
+            self.stop_algo(algoid)
 
     def clear_algos(self) -> bool:
         """清空所有算法"""
@@ -362,8 +1040,20 @@ class DfRebalanceEngine(BaseEngine):
 
         # 清空算法对象
         self.algos.clear()
+        self.symbol_algos.clear()
+        self.orderid_algo_map.clear()
+        self.clear_history()
+        self.pending_states.clear()
+        self.external_pos.clear()
+        self.changed_algos.clear()
+        self.algo_displays.clear()
+        self.scheduler.clear()
+        self.valuator.clear()
+        self.mark_dirty()
+        self.write_journal("clear")
 
         # 清空暂停状态
+        self.exposure_controller.reset()
         self.long_pause = False
         self.short_pause = False
 
@@ -379,42 +1069,59 @@ class DfRebalanceEngine(BaseEngine):
     def send_order(
         self,
         algo: DfTwapAlgo,
-        vt_symbol: str,
         direction: Direction,
         price: float,
         volume: float,
-    ) -> str:
+    ) -> list[str]:
         """委托下单"""
-        # 创建原始委托
-        contract: ContractData = self.main_engine.get_contract(vt_symbol)
+        # 基于算法的委托模板创建原始委托
+        original_req: OrderRequest = copy(algo.order_template)
+        original_req.direction = direction
+        original_req.price = price
+        original_req.volume = volume
 
-        original_req: OrderRequest = OrderRequest(
-            symbol=contract.symbol,
-            exchange=contract.exchange,
-            direction=direction,
-            type=OrderType.LIMIT,
-            volume=volume,
-            price=price,
-            reference=f"{APP_NAME}_{vt_symbol}"
-        )
+        metrics: EngineMetrics = self.metrics
+        trace: SliceTrace = self.tracer.start_slice(algo.algoid, algo.vt_symbol, direction, price, volume)
 
         # 进行净仓位转换
+        start: int = perf_counter_ns() if metrics.enabled else 0
         reqs: list[OrderRequest] = self.offset_converter.convert_order_request(
             original_req,
             lock=False,
             net=True
         )
+        if start:
+            metrics.record("convert_order_request", perf_counter_ns() - start)
+        if trace:
+            trace.converted_time = perf_counter()
 
         vt_orderids: list[str] = []
         for req in reqs:
-            vt_orderid: str = self.main_engine.send_order(req, contract.gateway_name)
+            start: int = perf_counter_ns() if metrics.enabled else 0
+            vt_orderid: str = self.main_engine.send_order(req, algo.contract.gateway_name)
+            if start:
+                metrics.record("gateway.send_order", perf_counter_ns() - start)
 
             if not vt_orderid:
                 continue
 
+            metrics.add_order()
+            if trace:
+                self.tracer.add_order(trace, vt_orderid)
+
             vt_orderids.append(vt_orderid)
             self.offset_converter.update_order_request(req, vt_orderid)
 
+            # 记录委托所属算法，用于委托和成交推送的路由
+            self.orderid_algo_map[vt_orderid] = algo
+            self.add_order_history(vt_orderid, algo.algoid, time())
+            self.write_journal("order", algo, vt_orderid=vt_orderid)
+
+        # 行情触发的委托统计行情到达至委托发出的延迟（本地时间，不受交易所时间戳重复或回放虚拟时钟影响），
+        # 定时触发的委托与行情到达无关，不做统计
+        if vt_orderids and metrics.enabled and self.trigger_time:
+            metrics.record("tick_to_order", int((perf_counter() - self.trigger_time) * 1_000_000_000))
+
         return vt_orderids
 
     def cancel_order(self, 
@@ -424,24 +1131,86 @@ class DfRebalanceEngine(BaseEngine):
         order: OrderData = self.main_engine.get_order(vt_orderid)
 
         if not order:
-            self.write_log(f"委托撤单失败，找不到委托：{vt_orderid}", algo)
+            self.write_log(f"委托撤单失败，找不到委托：{vt_orderid}", WARNING)
             return
 
         req: CancelRequest = order.create_cancel_request()
+
+        start: int = perf_counter_ns() if self.metrics.enabled else 0
         self.main_engine.cancel_order(req, order.gateway_name)
+        if start:
+            self.metrics.record("gateway.cancel_order", perf_counter_ns() - start)
+
+        self.metrics.add_cancel()
 
-    def write_log(self, msg: str) -> None:
+    def write_log(self, msg: str, level: int = INFO) -> None:
         """输出日志"""
-        log: LogData = LogData(msg=msg, gateway_name=APP_NAME)
+        if level < self.log_level:
+            return
+
+        # 重复告警限流
+        if level >= WARNING:
+            suppressed: int = self.log_throttle.check(msg)
+            if suppressed is None:
+                return
+            elif suppressed:
+                msg = f"{msg}（期间重复{suppressed}次）"
+
+        log: LogData = LogData(msg=msg, gateway_name=APP_NAME, level=level)
         event: Event = Event(EVENT_REBALANCE_LOG, data=log)
         self.event_engine.put(event)
-        print(f'[{datetime.now()}] {msg}')
+
+        self.log_sink.log(level, msg)
 
     def put_algo_event(self, 
                 algo: DfTwapAlgo
                 ) -> None:
-        """推送事件"""
-        event: Event = Event(EVENT_REBALANCE_ALGO, data=algo)
+        """标记算法数据变化，由定时推送统一发布"""
+        self.changed_algos[algo] = None
+
+    def publish_algo_events(self, force: bool = False) -> None:
+        """批量推送显示数据有变化的算法"""
+        now: float = self.clock()
+        if not force and now - self.last_publish_time < self.algo_refresh_interval:
+            return
+        self.last_publish_time = now
+
+        # 运行中的算法每秒读秒都会变化
+        candidates: dict[DfTwapAlgo, None] = self.changed_algos
+        self.changed_algos = {}
+
+        for algo in self.algos.values():
+            if algo.status == AlgoStatus.RUNNING:
+                candidates[algo] = None
+
+        snapshots: list[AlgoSnapshot] = []
+
+        for algo in candidates:
+            # 过滤已被移除的算法
+            if self.algos.get(algo.algoid, None) is not algo:
+                continue
+
+            snapshot: AlgoSnapshot = algo.get_snapshot()
+            if self.algo_displays.get(algo, None) == snapshot:
+                continue
+
+            self.algo_displays[algo] = snapshot
+            snapshots.append(snapshot)
+
+        if snapshots:
+            event: Event = Event(EVENT_REBALANCE_ALGO, data=snapshots)
+            self.event_engine.put(event)
+
+    def publish_holding_events(self) -> None:
+        """合并推送发生变化的持仓和组合合计"""
+        holdings: list[HoldingData] = self.holding_book.pop_changes()
+        if not holdings:
+            return
+
+        event: Event = Event(EVENT_REBALANCE_HOLDING, holdings)
+        self.event_engine.put(event)
+
+        event: Event = Event(EVENT_REBALANCE_PORTFOLIO, self.holding_book.get_totals())
         self.event_engine.put(event)
 
     def update_value(self, trade: TradeData) -> None:
@@ -463,39 +1232,48 @@ class DfRebalanceEngine(BaseEngine):
 
     def update_immediate_value(self) -> None:
         '''更新实时市值'''
-        # self.write_log('*'*30)
-        long_values_dict = {k:v['value'] for k,v in self.values.items() if v['direction']=='多'}
-        short_values_dict = {k:v['value'] for k,v in self.values.items() if v['direction']=='空'}
-        self.long_value = sum(long_values_dict.values())
-        self.short_value = sum(short_values_dict.values())
-        self.net_value = self.long_value - self.short_value
-        if self.long_value + self.short_value != 0:
-            self.deviate = 100 * self.net_value / (self.long_value + self.short_value)
-        else:
-            self.deviate = 0
+        (
+            self.long_value,
+            self.short_value,
+            self.net_value,
+            self.deviate
+        ) = self.valuator.get_values()
+        self.residual_value = self.valuator.get_residual_value()
+
+    def get_leg_progress(self) -> dict[str, tuple[float, float]]:
+        """获取各腿完成比例和剩余市值"""
+        return self.valuator.get_leg_progress()
+
+    def set_exposure_limit(self, limit: int) -> None:
+        """设置敞口上限"""
+        self.exposure_limit = limit
 
     def check_exposure(self) -> None:
         """检查敞口"""
-        # if self.algo_started:
-        #     # 多头太快
-        #     if self.net_value > self.exposure_limit:
-        #         if not self.long_pause:
-        #             self.pause_algos(Direction.LONG)
-        #             self.long_pause = True
-        #     # 空头太块
-        #     elif self.net_value < -self.exposure_limit:
-        #         if not self.short_pause:
-        #             self.pause_algos(Direction.SHORT)
-        #             self.short_pause = True
-        #     # 正常范围
-        #     else:
-        #         if self.long_pause or self.short_pause:
-        #             self.long_pause = False
-        #             self.short_pause = False
-        #             self.resume_algos()
+        self.update_immediate_value()
+
+        # 算法启动后才进行控制
+        if not self.algo_started:
+            return
+
+        changed: bool = self.exposure_controller.update(self.net_value, self.exposure_limit)
+        if not changed:
+            return
 
+        self.long_pause = self.exposure_controller.long_pause
+        self.short_pause = self.exposure_controller.short_pause
+
+        self.write_log(
+            f"敞口控制状态变化：当前敞口{self.net_value:.0f}，"
+            f"买入{'暂停' if self.long_pause else '正常'}，"
+            f"卖出{'暂停' if self.short_pause else '正常'}"
+        )
         self.put_exposure_event()
 
+    def get_order_factor(self, direction: Direction) -> float:
+        """获取敞口控制下的委托数量系数，0表示该方向暂停"""
+        return self.exposure_controller.get_factor(direction)
+
     def put_exposure_event(self) -> None:
         """推送敞口事件"""
         event: Event = Event(
@@ -505,19 +1283,153 @@ class DfRebalanceEngine(BaseEngine):
                 "short_value": self.short_value,
                 "net_value": self.net_value,
                 "deviate": f'{self.deviate:.2f}%',
+                "residual_value": self.residual_value,
                 "long_pause": self.long_pause,
                 "short_pause": self.short_pause,
+                "long_factor": self.exposure_controller.long_factor,
+                "short_factor": self.exposure_controller.short_factor,
             }
         )
         self.event_engine.put(event)
     
+    def mark_dirty(self) -> None:
+        """标记算法数据已改变，等待写入备份快照"""
+        self.data_dirty = True
+
+    def save_snapshot(self, force: bool = False) -> None:
+        """提交备份快照，由后台线程写入"""
+        if not self.data_dirty:
+            return
+
+        now: float = monotonic()
+        if not force and now - self.last_snapshot_time < self.snapshot_interval:
+            return
+
+        self.data_dirty = False
+        self.last_snapshot_time = now
+        self.snapshot_writer.submit(self.get_data())
+
+    def publish_metrics(self, force: bool = False) -> None:
+        """定时推送运行指标，并写入文件或更新HTTP服务的快照"""
+        now: float = monotonic()
+        if not force and now - self.last_metrics_time < self.metrics_interval:
+            return
+        self.last_metrics_time = now
+
+        snapshot: dict = self.metrics.get_snapshot()
+        snapshot["time"] = datetime.now().isoformat(timespec="seconds")
+        snapshot["snapshot_writer"] = self.snapshot_writer.get_stats()
+        snapshot["dedup"] = self.get_dedup_stats()
+        snapshot["trace_enabled"] = self.tracer.enabled
+        snapshot["trace"] = self.tracer.get_summary() if self.tracer.enabled else {}
+
+        event: Event = Event(EVENT_REBALANCE_METRICS, snapshot)
+        self.event_engine.put(event)
+
+        if self.metrics_writer.active:
+            self.metrics_writer.submit(snapshot)
+
+        if self.metrics_server.server:
+            self.metrics_server.publish(snapshot)
+
+    def set_metrics_enabled(self, enabled: bool) -> None:
+        """运行中开关指标统计"""
+        if enabled == self.metrics.enabled:
+            return
+
+        self.metrics.enabled = enabled
+        self.publish_metrics(force=True)
+
+        self.write_log(f"运行指标统计已{'开启' if enabled else '关闭'}")
+
+    def reset_metrics(self) -> None:
+        """清空运行指标和委托链路记录"""
+        self.metrics.reset()
+        self.tracer.clear()
+        self.publish_metrics(force=True)
+
+    def set_trace_enabled(self, enabled: bool) -> None:
+        """运行中开关委托链路记录"""
+        if enabled == self.tracer.enabled:
+            return
+
+        self.tracer.enabled = enabled
+        self.publish_metrics(force=True)
+
+        self.write_log(f"委托链路记录已{'开启' if enabled else '关闭'}")
+
+    def export_traces(self, path: str) -> int:
+        """导出委托链路记录，返回记录数"""
+        count: int = self.tracer.export(path)
+        self.write_log(f"导出委托链路记录{count}条：{path}")
+        return count
+
+    def get_dedup_stats(self) -> dict:
+        """获取重复推送过滤统计"""
+        return {
+            "active_orders": len(self.active_orders),
+            "orderid_algo_map": len(self.orderid_algo_map),
+            "finished_orderids": self.finished_orderids.get_stats(),
+            "tradeids": self.tradeids.get_stats(),
+            "order_history": self.order_history.get_stats(),
+            "trade_history": self.trade_history.get_stats(),
+        }
+
+    def get_snapshot_stats(self) -> dict:
+        """获取备份快照写入统计"""
+        return self.snapshot_writer.get_stats()
+
+    def write_journal(self, type: str, algo: DfTwapAlgo = None, **kwargs) -> None:
+        """写入状态日志"""
+        if self.replaying:
+            return
+
+        record: dict = {
+            "type": type,
+            "time": datetime.now().strftime(JOURNAL_TIME_FORMAT)
+        }
+        if algo:
+            record["algoid"] = algo.algoid
+            record["vt_symbol"] = algo.vt_symbol
+        record.update(kwargs)
+
+        self.journal.append(record)
+
     def save_data(self, data_filename=None) -> None:
         """保存数据"""
+        start: int = perf_counter_ns() if self.metrics.enabled else 0
+
+        data: list[dict] = self.get_data()
+
+        if data_filename is not None:
+            save_json(data_filename, data)
+            return
+
+        checkpoint: dict = {
+            "journal_seq": self.journal.seq,
+            "algos": data
+        }
+
+        # 委托归属和成交记录有变化时才重写历史文件（先于检查点写入）
+        files: dict = {}
+        if self.history_changed:
+            self.history_changed = False
+            files[get_file_path(self.history_filename)] = self.get_history_data()
+
+        # 写入检查点后清空状态日志
+        self.journal.checkpoint(get_file_path(self.data_filename), checkpoint, files)
+
+        if start:
+            self.metrics.record("save_data", perf_counter_ns() - start)
+
+    def get_data(self) -> list[dict]:
+        """生成算法数据"""
         data: list[dict] = []
 
         for algo in self.algos.values():
             d: dict = {
                 # 参数
+                "algoid": algo.algoid,
                 "vt_symbol": algo.vt_symbol,
                 "direction": algo.direction.value,
                 "total_volume": algo.total_volume,
@@ -530,67 +1442,189 @@ class DfRebalanceEngine(BaseEngine):
             if d['current_pos'] != 0 or d['total_volume'] != 0:
                 data.append(d)
 
-        if data_filename is not None:
-            save_json(data_filename, data)
-        else:
-            save_json(self.data_filename, data)
+        # 尚未恢复的算法原样保存
+        data.extend(self.pending_states.values())
+
+        return data
 
     def load_data(self) -> bool:
-        """载入数据"""
-        data: list[dict] = load_json(self.data_filename)
-
-        for d in data:
-            # 添加算法实例
-            self.add_algo(
-                d["vt_symbol"],
-                Direction(d["direction"]),
-                d["total_volume"],
-                d["time_interval"],
-                d["vol_percent"],
-            )
+        """载入数据：检查点 + 状态日志重放"""
+        checkpoint: dict = load_json(self.data_filename)
 
-            # 恢复算法变量
-            algo: DfTwapAlgo = self.algos[d["vt_symbol"]]
-            algo.offset = d["offset"]
-            algo.current_pos = d["current_pos"]
+        # 兼容旧版本的列表格式
+        if isinstance(checkpoint, list):
+            data: list[dict] = checkpoint
+            seq: int = 0
+        else:
+            data: list[dict] = checkpoint.get("algos", [])
+            seq: int = checkpoint.get("journal_seq", 0)
 
-            algo.status == AlgoStatus.WAITING
+        # 检查点之前的委托归属和成交记录
+        history: dict = load_json(self.history_filename)
 
-            self.put_algo_event(algo)
+        for vt_orderid, algoid, timestamp in history.get("orders", []):
+            self.add_order_history(vt_orderid, algoid, timestamp)
+        for vt_tradeid, timestamp in history.get("trades", []):
+            self.add_trade_history(vt_tradeid, timestamp)
+        self.history_changed = False
+
+        # 旧版本数据没有算法编号，以合约代码区分
+        states: dict[str, dict] = {d.get("algoid", d["vt_symbol"]): d for d in data}
+
+        # 重放检查点之后的状态日志
+        records: list[dict] = self.journal.read(seq)
+
+        for record in records:
+            seq = record["seq"]
+            type: str = record["type"]
+
+            if type == "clear":
+                states.clear()
+                self.clear_history()
+                continue
+
+            vt_symbol: str = record["vt_symbol"]
+            key: str = record.get("algoid", vt_symbol)
+
+            if type == "order":
+                self.add_order_history(record["vt_orderid"], key, parse_journal_time(record["time"]))
+                continue
+            elif type == "trade":
+                self.add_trade_history(record["vt_tradeid"], parse_journal_time(record["time"]))
+
+            if type == "add":
+                states[key] = {
+                    "algoid": record.get("algoid", None),
+                    "vt_symbol": vt_symbol,
+                    "direction": record["direction"],
+                    "total_volume": record["total_volume"],
+                    "time_interval": record["time_interval"],
+                    "vol_percent": record["vol_percent"],
+                    "offset": None,
+                    "current_pos": 0,
+                }
+                continue
+
+            d: dict = states.get(key, None)
+            if not d:
+                continue
+
+            if type == "trade":
+                d["current_pos"] += record["volume"]
+            elif type == "target":
+                d["total_volume"] = record["total_volume"]
 
-        return bool(data)
+        if records:
+            self.write_log(f"重放状态日志{len(records)}条")
+
+        # 恢复算法实例，找不到合约的暂存到合约推送后再恢复
+        for key, d in states.items():
+            if not d["current_pos"] and not d["total_volume"]:
+                continue
+
+            if not self.restore_algo(d):
+                self.pending_states[key] = d
+
+        if self.pending_states:
+            # 检查点和状态日志保持不变，避免丢失尚未恢复的算法
+            self.journal.resume(seq, records)
+
+            vt_symbols: str = "，".join(sorted({d["vt_symbol"] for d in self.pending_states.values()}))
+            self.write_log(f"{len(self.pending_states)}个算法找不到合约，等待合约推送后恢复：{vt_symbols}", WARNING)
+        else:
+            # 生成新的检查点，并打开状态日志
+            self.journal.seq = seq
+            self.save_data()
+
+        return bool(self.algos)
+
+    def restore_algo(self, d: dict) -> bool:
+        """按保存的数据恢复算法实例（不写入状态日志），返回是否成功"""
+        self.replaying = True
+
+        # 添加算法实例
+        algoid: str = self.add_algo(
+            d["vt_symbol"],
+            Direction(d["direction"]),
+            d["total_volume"],
+            d["time_interval"],
+            d["vol_percent"],
+            d.get("algoid", None)
+        )
+
+        self.replaying = False
+
+        # 恢复算法变量
+        algo: DfTwapAlgo = self.algos.get(algoid, None)
+        if not algo:
+            return False
+
+        algo.total_volume = d["total_volume"]
+        algo.offset = d["offset"]
+        algo.current_pos = d["current_pos"]
+        self.valuator.update_pos(algo.algoid, algo.current_pos)
+        self.valuator.update_target(algo.algoid, algo.total_volume)
+
+        self.put_algo_event(algo)
+        return True
+
+    def restore_pending_states(self, vt_symbol: str) -> None:
+        """合约推送后恢复载入时暂存的算法，全部恢复后生成新的检查点"""
+        keys: list[str] = [key for key, d in self.pending_states.items() if d["vt_symbol"] == vt_symbol]
+        if not keys:
+            return
+
+        for key in keys:
+            if self.restore_algo(self.pending_states[key]):
+                self.pending_states.pop(key)
+                self.write_log(f"合约推送后恢复算法{key}[{vt_symbol}]")
+
+        if not self.pending_states:
+            self.save_data()
 
     def close_all_pos(self) -> None:
         '''平所有仓'''
-        for symbol, algo in self.algos.items():
+        for algo in self.algos.values():
             algo.total_volume = 0
+            self.valuator.update_target(algo.algoid, 0)
             self.reset_timer_count(algo, second=2)
             algo.status = AlgoStatus.RUNNING
+            self.update_schedule(algo)
             
             self.put_algo_event(algo)
+            self.write_journal("target", algo, total_volume=0)
+            self.write_journal("status", algo, status=algo.status.name)
+
+        self.mark_dirty()
         
-    def change_target_pos(self, pos, symbol) -> None:
+    def change_target_pos(self, pos, algoid) -> None:
         '''改变目标仓位'''
-        algo = self.algos[symbol]
+        algo = self.algos[algoid]
         algo.total_volume = pos
+        self.valuator.update_target(algoid, pos)
         self.reset_timer_count(algo, second=2)
-        self.write_log(f'[{symbol}] 改变目标仓位为: {pos}')
+        self.write_log(f'[{algoid}][{algo.vt_symbol}] 改变目标仓位为: {pos}')
         self.put_algo_event(algo)
+        self.mark_dirty()
+        self.write_journal("target", algo, total_volume=pos)
 
-    def reset_status(self, symbol: str, status: str):
+    def reset_status(self, algoid: str, status: str):
         '''重置交易状态'''
-        algo = self.algos[symbol]
+        algo = self.algos[algoid]
         if status == 'running':
-            self.write_log(f'[{symbol}] 交易状态置为: 运行')
+            self.write_log(f'[{algoid}][{algo.vt_symbol}] 交易状态置为: 运行')
             algo.status = AlgoStatus.RUNNING
         elif status == 'paused':
-            self.write_log(f'[{symbol}] 交易状态置为: 暂停')
+            self.write_log(f'[{algoid}][{algo.vt_symbol}] 交易状态置为: 暂停')
             algo.status = AlgoStatus.PAUSED
             self.reset_timer_count(algo, second=2)
+        self.update_schedule(algo)
         self.put_algo_event(algo)
+        self.mark_dirty()
+        self.write_journal("status", algo, status=algo.status.name)
 
-    def update_color(self, symbol: str):
-        algo = self.algos[symbol]
+    def update_color(self, algoid: str):
+        algo = self.algos[algoid]
         if algo.status == AlgoStatus.RUNNING:
             if algo.direction == Direction.LONG:
                 return "rgb(255,0,0)"
@@ -600,5 +1634,64 @@ class DfRebalanceEngine(BaseEngine):
             return "rgb(255,255,255)"
     
     def reset_timer_count(self, algo, second=2):
-        algo.timer_count = algo.time_interval - second
+        '''重置本轮读秒，second秒后执行下一轮'''
+        algo.time_left = second
+        if algo.next_time is not None:
+            self.scheduler.cancel(algo)
+            algo.next_time = None
+            self.update_schedule(algo)
+
+    def fire_algo(self, algo: DfTwapAlgo, tick: TickData = None) -> None:
+        """执行算法的下一轮，并重新调度"""
+        self.scheduler.cancel(algo)
+        algo.next_time = None
+        algo.time_left = algo.time_interval
+
+        if algo.status != AlgoStatus.RUNNING:
+            return
+
+        start: int = perf_counter_ns() if self.metrics.enabled else 0
+        algo.on_timer(tick)
+        if start:
+            self.metrics.record("algo.on_timer", perf_counter_ns() - start)
+
+        self.update_schedule(algo)
+
+    def set_tick_trigger(self, enabled: bool) -> None:
+        """切换行情驱动模式"""
+        self.tick_trigger = enabled
+
+        # 切回定时模式时，重新调度已到期但仍在等待行情的算法
+        if not enabled:
+            for algo in self.algos.values():
+                if algo.next_time is not None and self.scheduler.get_deadline(algo) is None:
+                    self.scheduler.schedule(algo, algo.next_time)
+
+    def check_quote_age(self, vt_symbol: str) -> bool:
+        """检查行情是否足够新"""
+        if not self.max_quote_age:
+            return True
+
+        tick_time: float = self.tick_times.get(vt_symbol, None)
+        if tick_time is None:
+            return False
+
+        return self.clock() - tick_time <= self.max_quote_age
+
+    def update_schedule(self, algo: DfTwapAlgo) -> None:
+        """根据算法状态更新定时调度"""
+        if algo.status == AlgoStatus.RUNNING:
+            if algo.next_time is None:
+                algo.next_time = self.clock() + algo.time_left
+                self.scheduler.schedule(algo, algo.next_time)
+        elif algo.next_time is not None:
+            # 保存剩余时间，恢复运行后继续读秒
+            algo.time_left = max(algo.next_time - self.clock(), 0)
+            algo.next_time = None
+            self.scheduler.cancel(algo)
+
+
 
+def parse_journal_time(text: str) -> float:
+    """状态日志记录时间转换为时间戳"""
+    return datetime.strptime(text, JOURNAL_TIME_FORMAT).timestamp()
@@ -0,0 +1,457 @@
+from collections import defaultdict
+
+import numpy as np
+
+from vnpy.trader.constant import Direction
+
+
+class ExposureLeg:
+    """单腿估值数据"""
+
+    def __init__(
+        self,
+        vt_symbol: str,
+        size: float,
+        direction: Direction,
+        pos: float,
+        target: float,
+        price: float
+    ) -> None:
+        """构造函数"""
+        self.vt_symbol: str = vt_symbol
+        self.size: float = size
+        self.direction: Direction = direction
+        self.pos: float = pos
+        self.target: float = target
+        self.price: float = price
+        self.value: float = price * abs(pos) * size
+        self.residual: float = price * abs(target - pos) * size
+
+
+class ExposureValuator:
+    """
+    敞口估值
+
+    按腿缓存合约乘数和方向，行情或成交到达时只重新估值受影响的腿，
+    并增量调整多空总市值和剩余市值，读取敞口统计为O(1)。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.legs: dict[str, ExposureLeg] = {}
+        self.symbol_legs: dict[str, list[ExposureLeg]] = defaultdict(list)
+
+        self.long_value: float = 0
+        self.short_value: float = 0
+        self.residual_value: float = 0
+
+    def add_leg(
+        self,
+        key: str,
+        vt_symbol: str,
+        size: float,
+        direction: Direction,
+        pos: float = 0,
+        target: float = 0,
+        price: float = 0
+    ) -> None:
+        """添加估值腿（已存在则替换）"""
+        self.remove_leg(key)
+
+        leg: ExposureLeg = ExposureLeg(vt_symbol, size, direction, pos, target, price)
+        self.legs[key] = leg
+        self.symbol_legs[vt_symbol].append(leg)
+
+        self.adjust(leg, leg.value)
+        self.residual_value += leg.residual
+
+    def remove_leg(self, key: str) -> None:
+        """移除估值腿"""
+        leg: ExposureLeg = self.legs.pop(key, None)
+        if not leg:
+            return
+
+        self.adjust(leg, -leg.value)
+        self.residual_value -= leg.residual
+
+        legs: list = self.symbol_legs[leg.vt_symbol]
+        legs.remove(leg)
+        if not legs:
+            self.symbol_legs.pop(leg.vt_symbol)
+
+    def update_price(self, vt_symbol: str, price: float) -> bool:
+        """行情更新，重新估值该合约的所有腿，返回市值是否变化"""
+        legs: list = self.symbol_legs.get(vt_symbol, None)
+        if not legs:
+            return False
+
+        changed: bool = False
+
+        for leg in legs:
+            if leg.price == price:
+                continue
+
+            leg.price = price
+            self.revalue(leg)
+            changed = True
+
+        return changed
+
+    def update_pos(self, key: str, pos: float) -> bool:
+        """仓位更新，重新估值该腿，返回市值是否变化"""
+        leg: ExposureLeg = self.legs.get(key, None)
+        if not leg or leg.pos == pos:
+            return False
+
+        leg.pos = pos
+        self.revalue(leg)
+        return True
+
+    def update_target(self, key: str, target: float) -> None:
+        """目标仓位更新"""
+        leg: ExposureLeg = self.legs.get(key, None)
+        if not leg or leg.target == target:
+            return
+
+        leg.target = target
+        self.revalue(leg)
+
+    def revalue(self, leg: ExposureLeg) -> None:
+        """重新计算单腿市值"""
+        value: float = leg.price * abs(leg.pos) * leg.size
+        self.adjust(leg, value - leg.value)
+        leg.value = value
+
+        residual: float = leg.price * abs(leg.target - leg.pos) * leg.size
+        self.residual_value += residual - leg.residual
+        leg.residual = residual
+
+    def adjust(self, leg: ExposureLeg, change: float) -> None:
+        """调整多空总市值"""
+        if leg.direction == Direction.LONG:
+            self.long_value += change
+        else:
+            self.short_value += change
+
+    def clear(self) -> None:
+        """清空"""
+        self.legs.clear()
+        self.symbol_legs.clear()
+
+        self.long_value = 0
+        self.short_value = 0
+        self.residual_value = 0
+
+    def get_values(self) -> tuple[float, float, float, float]:
+        """计算多头市值、空头市值、净敞口和偏离度"""
+        long_value: float = self.long_value
+        short_value: float = self.short_value
+        net_value: float = long_value - short_value
+
+        if long_value + short_value != 0:
+            deviate: float = 100 * net_value / (long_value + short_value)
+        else:
+            deviate: float = 0
+
+        return long_value, short_value, net_value, deviate
+
+    def get_leg_progress(self) -> dict[str, tuple[float, float]]:
+        """计算各腿完成比例和剩余市值"""
+        progress: dict[str, tuple[float, float]] = {}
+
+        for key, leg in self.legs.items():
+            progress[key] = (
+                calculate_completion(leg.pos, leg.target),
+                leg.residual
+            )
+
+        return progress
+
+    def get_residual_value(self) -> float:
+        """计算剩余待成交市值"""
+        return self.residual_value
+
+
+class ArrayExposureValuator:
+    """
+    数组化敞口估值
+
+    篮子状态保存在连续的numpy数组中（最新价、合约乘数、当前仓位、目标仓位、方向符号），
+    通过键到槽位的映射定位，统计数据用向量化运算一次算出，适用于上千腿的大篮子。
+    接口与ExposureValuator一致。
+    """
+
+    def __init__(self, capacity: int = 256) -> None:
+        """构造函数"""
+        self.price: np.ndarray = np.zeros(capacity)
+        self.size: np.ndarray = np.zeros(capacity)
+        self.pos: np.ndarray = np.zeros(capacity)
+        self.target: np.ndarray = np.zeros(capacity)
+        self.sign: np.ndarray = np.zeros(capacity)      # 多头为1，空头为-1，空槽位为0
+
+        self.slots: dict[str, int] = {}
+        self.symbol_slots: dict[str, list[int]] = defaultdict(list)
+        self.slot_symbols: dict[int, str] = {}
+        self.free_slots: list[int] = []
+        self.count: int = 0                             # 已使用过的槽位数
+
+        self.cache: tuple = None
+
+    def add_leg(
+        self,
+        key: str,
+        vt_symbol: str,
+        size: float,
+        direction: Direction,
+        pos: float = 0,
+        target: float = 0,
+        price: float = 0
+    ) -> None:
+        """添加估值腿（已存在则替换）"""
+        self.remove_leg(key)
+
+        if self.free_slots:
+            slot: int = self.free_slots.pop()
+        else:
+            slot: int = self.count
+            self.count += 1
+
+            if slot >= len(self.price):
+                self.grow()
+
+        self.price[slot] = price
+        self.size[slot] = size
+        self.pos[slot] = pos
+        self.target[slot] = target
+        self.sign[slot] = 1 if direction == Direction.LONG else -1
+
+        self.slots[key] = slot
+        self.symbol_slots[vt_symbol].append(slot)
+        self.slot_symbols[slot] = vt_symbol
+
+        self.cache = None
+
+    def remove_leg(self, key: str) -> None:
+        """移除估值腿"""
+        slot: int = self.slots.pop(key, None)
+        if slot is None:
+            return
+
+        vt_symbol: str = self.slot_symbols.pop(slot)
+        slots: list = self.symbol_slots[vt_symbol]
+        slots.remove(slot)
+        if not slots:
+            self.symbol_slots.pop(vt_symbol)
+
+        self.price[slot] = 0
+        self.size[slot] = 0
+        self.pos[slot] = 0
+        self.target[slot] = 0
+        self.sign[slot] = 0
+        self.free_slots.append(slot)
+
+        self.cache = None
+
+    def grow(self) -> None:
+        """数组扩容"""
+        capacity: int = len(self.price) * 2
+
+        for name in ["price", "size", "pos", "target", "sign"]:
+            old: np.ndarray = getattr(self, name)
+            new: np.ndarray = np.zeros(capacity)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def update_price(self, vt_symbol: str, price: float) -> bool:
+        """行情更新，返回市值是否变化"""
+        slots: list = self.symbol_slots.get(vt_symbol, None)
+        if not slots:
+            return False
+
+        # 同一合约的各腿可能以不同价格加入，逐个槽位比较
+        if (self.price[slots] == price).all():
+            return False
+
+        self.price[slots] = price
+        self.cache = None
+        return True
+
+    def update_pos(self, key: str, pos: float) -> bool:
+        """仓位更新，返回市值是否变化"""
+        slot: int = self.slots.get(key, None)
+        if slot is None or self.pos[slot] == pos:
+            return False
+
+        self.pos[slot] = pos
+        self.cache = None
+        return True
+
+    def update_target(self, key: str, target: float) -> None:
+        """目标仓位更新"""
+        slot: int = self.slots.get(key, None)
+        if slot is None:
+            return
+
+        self.target[slot] = target
+        self.cache = None
+
+    def clear(self) -> None:
+        """清空"""
+        for array in [self.price, self.size, self.pos, self.target, self.sign]:
+            array[:] = 0
+
+        self.slots.clear()
+        self.symbol_slots.clear()
+        self.slot_symbols.clear()
+        self.free_slots.clear()
+        self.count = 0
+
+        self.cache = None
+
+    def get_values(self) -> tuple[float, float, float, float]:
+        """计算多头市值、空头市值、净敞口和偏离度"""
+        if self.cache:
+            return self.cache
+
+        n: int = self.count
+        value: np.ndarray = self.price[:n] * np.abs(self.pos[:n]) * self.size[:n]
+        sign: np.ndarray = self.sign[:n]
+
+        long_value: float = float(value[sign > 0].sum())
+        short_value: float = float(value[sign < 0].sum())
+        net_value: float = long_value - short_value
+
+        if long_value + short_value != 0:
+            deviate: float = 100 * net_value / (long_value + short_value)
+        else:
+            deviate: float = 0
+
+        self.cache = (long_value, short_value, net_value, deviate)
+        return self.cache
+
+    def get_leg_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """计算各槽位的完成比例和剩余市值数组"""
+        n: int = self.count
+        pos: np.ndarray = np.abs(self.pos[:n])
+        target: np.ndarray = np.abs(self.target[:n])
+
+        completion: np.ndarray = np.ones(n)
+        np.divide(pos, target, out=completion, where=target > 0)
+        completion = np.minimum(completion, 1)
+        completion[(target == 0) & (pos != 0)] = 0
+
+        residual: np.ndarray = (
+            self.price[:n]
+            * np.abs(self.target[:n] - self.pos[:n])
+            * self.size[:n]
+        )
+
+        return completion, residual
+
+    def get_leg_progress(self) -> dict[str, tuple[float, float]]:
+        """计算各腿完成比例和剩余市值"""
+        completion, residual = self.get_leg_arrays()
+
+        return {
+            key: (float(completion[slot]), float(residual[slot]))
+            for key, slot in self.slots.items()
+        }
+
+    def get_residual_value(self) -> float:
+        """计算剩余待成交市值"""
+        n: int = self.count
+        return float((
+            self.price[:n]
+            * np.abs(self.target[:n] - self.pos[:n])
+            * self.size[:n]
+        ).sum())
+
+
+class ExposureController:
+    """
+    敞口控制
+
+    净敞口超过上轨（敞口上限）时暂停加大敞口方向的委托，回落到下轨（上限乘以恢复比例）
+    以下才解除暂停，避免在上限附近反复暂停和恢复；
+    未暂停时净敞口处于上下轨之间，则按越过下轨的程度等比例缩小该方向的委托数量。
+    """
+
+    def __init__(self, resume_ratio: float = 0.5) -> None:
+        """构造函数"""
+        self.resume_ratio: float = resume_ratio
+
+        self.long_pause: bool = False
+        self.short_pause: bool = False
+        self.long_factor: float = 1         # 买入委托数量系数
+        self.short_factor: float = 1        # 卖出委托数量系数
+
+    def update(self, net_value: float, limit: float) -> bool:
+        """根据净敞口更新控制状态，返回暂停状态是否变化"""
+        # 上限为0则不做控制
+        if limit <= 0:
+            changed: bool = self.long_pause or self.short_pause
+            self.reset()
+            return changed
+
+        upper: float = limit
+        lower: float = limit * self.resume_ratio
+
+        long_pause, self.long_factor = self.calculate(
+            net_value, upper, lower, self.long_pause
+        )
+        short_pause, self.short_factor = self.calculate(
+            -net_value, upper, lower, self.short_pause
+        )
+
+        changed: bool = (
+            long_pause != self.long_pause
+            or short_pause != self.short_pause
+        )
+        self.long_pause = long_pause
+        self.short_pause = short_pause
+
+        return changed
+
+    def calculate(
+        self,
+        exposure: float,
+        upper: float,
+        lower: float,
+        pause: bool
+    ) -> tuple[bool, float]:
+        """计算单边的暂停状态和委托数量系数"""
+        if pause:
+            if exposure > lower:
+                return True, 0
+            pause = False
+        elif exposure >= upper:
+            return True, 0
+
+        if exposure <= lower:
+            return pause, 1
+
+        return pause, (upper - exposure) / (upper - lower)
+
+    def get_factor(self, direction: Direction) -> float:
+        """获取委托方向对应的数量系数"""
+        if direction == Direction.LONG:
+            return self.long_factor
+        else:
+            return self.short_factor
+
+    def reset(self) -> None:
+        """重置"""
+        self.long_pause = False
+        self.short_pause = False
+        self.long_factor = 1
+        self.short_factor = 1
+
+
+def calculate_completion(pos: float, target: float) -> float:
+    """计算单腿完成比例"""
+    if target:
+        return min(abs(pos) / abs(target), 1)
+    elif pos:
+        return 0
+    else:
+        return 1
@@ -0,0 +1,161 @@
+from collections import defaultdict
+from copy import copy
+from dataclasses import dataclass
+
+from vnpy.trader.constant import Direction, Exchange
+from vnpy.trader.object import PositionData, ContractData
+
+
+@dataclass
+class HoldingData:
+    """组合持仓数据"""
+
+    # 字段均无默认值，可直接声明__slots__
+    __slots__ = (
+        "vt_positionid",
+        "symbol",
+        "exchange",
+        "name",
+        "direction",
+        "volume",
+        "price",
+        "pnl",
+        "value",
+    )
+
+    vt_positionid: str
+    symbol: str
+    exchange: Exchange
+    name: str
+    direction: Direction
+    volume: int
+    price: float
+    pnl: float
+    value: float
+
+
+class HoldingBook:
+    """
+    组合持仓盯市
+
+    持仓按vt_positionid保存，行情推送时只重新估值该合约的持仓，
+    并增量维护组合的多空市值和盈亏合计。发生变化的持仓先记录下来，
+    由引擎定时合并推送，开销只与有行情变化的合约数量相关。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.holdings: dict[str, HoldingData] = {}                  # vt_positionid: HoldingData
+        self.sizes: dict[str, float] = {}                           # vt_positionid: 合约乘数
+        self.symbol_holdings: dict[str, list[HoldingData]] = defaultdict(list)
+        self.prices: dict[str, float] = {}                          # vt_symbol: 盯市价格
+
+        self.changed: dict[str, HoldingData] = {}                   # 等待推送的持仓
+
+        # 组合合计
+        self.long_value: float = 0
+        self.short_value: float = 0
+        self.pnl: float = 0
+
+    def update_position(self, position: PositionData, contract: ContractData, price: float = None) -> None:
+        """持仓更新，price为当前行情价格（尚无行情时为None）"""
+        if price is not None:
+            self.prices[position.vt_symbol] = price
+
+        holding: HoldingData = self.holdings.get(position.vt_positionid, None)
+
+        if not holding:
+            holding = HoldingData(
+                vt_positionid=position.vt_positionid,
+                symbol=position.symbol,
+                exchange=position.exchange,
+                name=contract.name,
+                direction=position.direction,
+                volume=position.volume,
+                price=position.price,
+                pnl=0,
+                value=0
+            )
+            self.holdings[holding.vt_positionid] = holding
+            self.sizes[holding.vt_positionid] = contract.size
+            self.symbol_holdings[position.vt_symbol].append(holding)
+        else:
+            self.remove_totals(holding)
+
+            holding.direction = position.direction
+            holding.volume = position.volume
+            holding.price = position.price
+
+        mark_price: float = self.prices.get(position.vt_symbol, None)
+        if mark_price is None:
+            # 尚无行情时使用接口推送的盈亏，市值等行情到达后再计算
+            holding.pnl = round(position.pnl, 0)
+            holding.value = 0
+        else:
+            self.mark(holding, mark_price)
+
+        self.add_totals(holding)
+        self.changed[holding.vt_positionid] = holding
+
+    def update_price(self, vt_symbol: str, price: float) -> bool:
+        """行情更新，重新估值该合约的持仓，返回是否有持仓变化"""
+        holdings: list = self.symbol_holdings.get(vt_symbol, None)
+        if not holdings or self.prices.get(vt_symbol, None) == price:
+            return False
+
+        self.prices[vt_symbol] = price
+
+        for holding in holdings:
+            self.remove_totals(holding)
+            self.mark(holding, price)
+            self.add_totals(holding)
+            self.changed[holding.vt_positionid] = holding
+
+        return True
+
+    def mark(self, holding: HoldingData, price: float) -> None:
+        """按价格计算单个持仓的市值和盈亏"""
+        size: float = self.sizes[holding.vt_positionid]
+
+        # 净持仓模式下数量带符号，空头持仓数量为正
+        if holding.direction == Direction.SHORT:
+            sign: int = -1
+        else:
+            sign: int = 1
+
+        holding.value = round(price * holding.volume * size, 0)
+        holding.pnl = round((price - holding.price) * holding.volume * size * sign, 0)
+
+    def add_totals(self, holding: HoldingData) -> None:
+        """计入组合合计"""
+        if holding.direction == Direction.SHORT or holding.value < 0:
+            self.short_value += abs(holding.value)
+        else:
+            self.long_value += holding.value
+        self.pnl += holding.pnl
+
+    def remove_totals(self, holding: HoldingData) -> None:
+        """从组合合计中移除"""
+        if holding.direction == Direction.SHORT or holding.value < 0:
+            self.short_value -= abs(holding.value)
+        else:
+            self.long_value -= holding.value
+        self.pnl -= holding.pnl
+
+    def pop_changes(self) -> list[HoldingData]:
+        """取出上次推送后发生变化的持仓（返回副本，界面线程读取时不会被修改）"""
+        if not self.changed:
+            return []
+
+        holdings: list[HoldingData] = [copy(holding) for holding in self.changed.values()]
+        self.changed.clear()
+        return holdings
+
+    def get_totals(self) -> dict:
+        """获取组合合计"""
+        return {
+            "long_value": self.long_value,
+            "short_value": self.short_value,
+            "net_value": self.long_value - self.short_value,
+            "pnl": self.pnl,
+        }
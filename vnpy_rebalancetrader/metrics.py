@@ -0,0 +1,275 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from time import perf_counter_ns
+from typing import Callable
+
+from vnpy.event import Event, EventEngine
+
+
+# 直方图桶数：第i个桶记录[2^(i-1), 2^i)微秒的耗时，最后一个桶包含更长的耗时
+HISTOGRAM_BUCKETS: int = 32
+
+
+class LatencyHistogram:
+    """
+    耗时直方图
+
+    按2的幂次划分微秒桶，记录只需一次位运算和数组累加，
+    分位数按桶的上界估计（误差不超过一倍）。
+    """
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.buckets: list[int] = [0] * HISTOGRAM_BUCKETS
+        self.count: int = 0
+        self.total: int = 0             # 累计耗时（纳秒）
+        self.max: int = 0               # 最大耗时（纳秒）
+
+    def clear(self) -> None:
+        """清空数据"""
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns: int) -> None:
+        """记录一次耗时（纳秒）"""
+        i: int = min((ns // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.buckets[i] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, p: float) -> float:
+        """估计分位数（微秒）"""
+        if not self.count:
+            return 0
+
+        target: float = self.count * p
+        cumulative: int = 0
+
+        for i, n in enumerate(self.buckets):
+            cumulative += n
+            if cumulative >= target:
+                return min(1 << i, self.max / 1000)
+
+        return self.max / 1000
+
+    def get_stats(self) -> dict:
+        """获取统计数据（微秒）"""
+        if self.count:
+            mean: float = self.total / self.count / 1000
+        else:
+            mean: float = 0
+
+        return {
+            "count": self.count,
+            "mean": mean,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": self.max / 1000,
+            "total_ms": self.total / 1_000_000,
+            "buckets": list(self.buckets),
+        }
+
+
+class EngineMetrics:
+    """
+    引擎运行指标
+
+    统计各事件处理函数、算法回调和关键子步骤的耗时直方图，事件队列深度，
+    委托、撤单速率以及行情到委托的延迟。enabled为False时各统计入口只做一次判断即返回，
+    运行中可随时开关。快照为新生成的字典，可直接交给其他线程读取。
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """构造函数"""
+        self.enabled: bool = enabled
+
+        self.histograms: dict[str, LatencyHistogram] = {}
+
+        # 事件队列和执行线程收件箱深度
+        self.queue_depth: int = 0
+        self.max_queue_depth: int = 0
+        self.inbox_depth: int = 0
+        self.max_inbox_depth: int = 0
+
+        # 委托、撤单计数
+        self.order_count: int = 0
+        self.cancel_count: int = 0
+        self.order_rate: float = 0
+        self.cancel_rate: float = 0
+        self.max_order_rate: float = 0
+        self.last_sample_time: float = None
+        self.last_order_count: int = 0
+        self.last_cancel_count: int = 0
+
+    def get_histogram(self, name: str) -> LatencyHistogram:
+        """获取指定名称的直方图（不存在时创建）"""
+        histogram: LatencyHistogram = self.histograms.get(name, None)
+        if not histogram:
+            histogram = LatencyHistogram()
+            self.histograms[name] = histogram
+        return histogram
+
+    def record(self, name: str, ns: int) -> None:
+        """记录一次耗时（纳秒）"""
+        if self.enabled:
+            self.get_histogram(name).record(ns)
+
+    def wrap(self, name: str, handler: Callable[[Event], None]) -> Callable[[Event], None]:
+        """包装事件处理函数，统计每次处理的耗时"""
+        histogram: LatencyHistogram = self.get_histogram(name)
+
+        def wrapper(event: Event) -> None:
+            if not self.enabled:
+                handler(event)
+                return
+
+            start: int = perf_counter_ns()
+            handler(event)
+            histogram.record(perf_counter_ns() - start)
+
+        return wrapper
+
+    def add_order(self) -> None:
+        """委托计数"""
+        if self.enabled:
+            self.order_count += 1
+
+    def add_cancel(self) -> None:
+        """撤单计数"""
+        if self.enabled:
+            self.cancel_count += 1
+
+    def sample(self, event_engine: EventEngine, now: float, inbox_depth: int = 0) -> None:
+        """定时采样队列深度和委托、撤单速率"""
+        if not self.enabled:
+            return
+
+        self.queue_depth = get_queue_depth(event_engine)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        self.inbox_depth = inbox_depth
+        self.max_inbox_depth = max(self.max_inbox_depth, inbox_depth)
+
+        if self.last_sample_time is not None and now > self.last_sample_time:
+            elapsed: float = now - self.last_sample_time
+            self.order_rate = (self.order_count - self.last_order_count) / elapsed
+            self.cancel_rate = (self.cancel_count - self.last_cancel_count) / elapsed
+            self.max_order_rate = max(self.max_order_rate, self.order_rate)
+
+        self.last_sample_time = now
+        self.last_order_count = self.order_count
+        self.last_cancel_count = self.cancel_count
+
+    def reset(self) -> None:
+        """清空统计数据"""
+        for histogram in self.histograms.values():
+            histogram.clear()
+
+        self.max_queue_depth = 0
+        self.max_inbox_depth = 0
+        self.order_count = 0
+        self.cancel_count = 0
+        self.order_rate = 0
+        self.cancel_rate = 0
+        self.max_order_rate = 0
+        self.last_sample_time = None
+        self.last_order_count = 0
+        self.last_cancel_count = 0
+
+    def get_snapshot(self) -> dict:
+        """生成指标快照"""
+        return {
+            "enabled": self.enabled,
+            "latency": {
+                name: histogram.get_stats()
+                for name, histogram in self.histograms.items()
+                if histogram.count
+            },
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "inbox_depth": self.inbox_depth,
+            "max_inbox_depth": self.max_inbox_depth,
+            "order_count": self.order_count,
+            "cancel_count": self.cancel_count,
+            "order_rate": self.order_rate,
+            "cancel_rate": self.cancel_rate,
+            "max_order_rate": self.max_order_rate,
+        }
+
+
+def get_queue_depth(event_engine: EventEngine) -> int:
+    """读取事件引擎队列中等待处理的事件数量"""
+    queue = getattr(event_engine, "_queue", None)
+    if queue is None:
+        return 0
+    if hasattr(queue, "qsize"):
+        return queue.qsize()
+    return len(queue)
+
+
+class MetricsServer:
+    """
+    本地指标HTTP服务
+
+    只监听本机地址，GET请求返回最新的指标快照（JSON）。
+    快照由引擎线程整体替换，服务线程只读取引用，无需加锁。
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1") -> None:
+        """构造函数"""
+        self.host: str = host
+        self.port: int = port
+        self.snapshot: dict = {}
+
+        self.server: ThreadingHTTPServer = None
+        self.thread: Thread = None
+
+    def start(self) -> None:
+        """启动服务线程"""
+        if self.server:
+            return
+
+        metrics_server: MetricsServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                buf: bytes = json.dumps(metrics_server.snapshot, ensure_ascii=False).encode("UTF-8")
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(buf)))
+                self.end_headers()
+                self.wfile.write(buf)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+        self.thread = Thread(target=self.server.serve_forever, name="MetricsServer", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """停止服务"""
+        if not self.server:
+            return
+
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+        self.server = None
+        self.thread = None
+
+    def publish(self, snapshot: dict) -> None:
+        """更新对外提供的快照"""
+        self.snapshot = snapshot
@@ -0,0 +1,323 @@
+import json
+import os
+import traceback
+from pathlib import Path
+from queue import Queue
+from threading import Thread, Condition, Lock
+from time import perf_counter
+from typing import Callable, TextIO
+
+from vnpy.trader.utility import get_file_path
+
+
+def save_json_atomic(file_path: Path, data: object) -> int:
+    """先写临时文件再原子替换，返回写入字节数"""
+    temp_path: Path = file_path.with_name(file_path.name + ".tmp")
+
+    text: str = json.dumps(data, indent=4, ensure_ascii=False)
+    buf: bytes = text.encode("UTF-8")
+
+    with open(temp_path, mode="wb") as f:
+        f.write(buf)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, file_path)
+
+    return len(buf)
+
+
+class SnapshotWriter:
+    """
+    后台快照写入器
+
+    引擎线程只负责提交最新的数据快照，序列化和磁盘写入在独立线程中完成。
+    尚未写入的旧快照会被新快照覆盖（合并写入），写入时先写临时文件再原子替换。
+    """
+
+    def __init__(self, filename: str) -> None:
+        """构造函数"""
+        self.file_path: Path = get_file_path(filename)
+
+        self.pending: list = None
+        self.condition: Condition = Condition()
+        self.write_lock: Lock = Lock()
+
+        self.active: bool = False
+        self.thread: Thread = None
+
+        # 统计数据
+        self.submit_count: int = 0          # 提交次数
+        self.coalesced_count: int = 0       # 被合并（未写入即被覆盖）的次数
+        self.write_count: int = 0           # 写入次数
+        self.bytes_written: int = 0         # 累计写入字节
+        self.last_latency: float = 0        # 最近一次写入耗时（秒）
+        self.max_latency: float = 0         # 最大写入耗时（秒）
+        self.total_latency: float = 0       # 累计写入耗时（秒）
+
+    def start(self) -> None:
+        """启动写入线程"""
+        if self.active:
+            return
+
+        self.active = True
+        self.thread = Thread(target=self.run, name="SnapshotWriter", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """停止写入线程，并写入尚未落盘的快照"""
+        if not self.active:
+            return
+
+        with self.condition:
+            self.active = False
+            self.condition.notify()
+
+        self.thread.join()
+        self.thread = None
+
+    def submit(self, data: list) -> None:
+        """提交快照（引擎线程调用，不阻塞）"""
+        with self.condition:
+            if self.pending is not None:
+                self.coalesced_count += 1
+
+            self.pending = data
+            self.submit_count += 1
+            self.condition.notify()
+
+    def run(self) -> None:
+        """写入线程主循环"""
+        while True:
+            with self.condition:
+                while self.active and self.pending is None:
+                    self.condition.wait()
+
+                data: list = self.pending
+                self.pending = None
+
+            if data is not None:
+                self.write(data)
+
+            if not self.active and self.pending is None:
+                break
+
+    def write(self, data: list) -> None:
+        """原子写入快照文件"""
+        with self.write_lock:
+            start: float = perf_counter()
+
+            size: int = save_json_atomic(self.file_path, data)
+
+            latency: float = perf_counter() - start
+
+            self.write_count += 1
+            self.bytes_written += size
+            self.last_latency = latency
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def get_stats(self) -> dict:
+        """获取统计数据"""
+        if self.write_count:
+            avg_latency: float = self.total_latency / self.write_count
+        else:
+            avg_latency: float = 0
+
+        return {
+            "submit_count": self.submit_count,
+            "coalesced_count": self.coalesced_count,
+            "write_count": self.write_count,
+            "bytes_written": self.bytes_written,
+            "last_latency": self.last_latency,
+            "avg_latency": avg_latency,
+            "max_latency": self.max_latency,
+        }
+
+
+class AlgoJournal:
+    """
+    算法状态日志
+
+    每条状态变化（新增算法、成交、目标调整、状态切换、清空）以一行JSON追加写入，
+    每行带有递增的序号。检查点保存时记录最新序号并清空日志，
+    恢复时载入检查点后只重放序号更大的记录。
+
+    启动写入线程后，序号在调用方线程同步分配，序列化和磁盘写入按提交顺序
+    在写入线程中完成（检查点写入后再清空日志，顺序不变）；未启动时直接写入。
+    写入失败时记录错误并继续处理后续任务，failed标记保持到下一次检查点写入成功，
+    调用方据此重新生成检查点，避免日志缺失记录导致恢复出错。
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        fsync: bool = False,
+        on_error: Callable[[str], None] = None
+    ) -> None:
+        """构造函数"""
+        self.file_path: Path = get_file_path(filename)
+        self.fsync: bool = fsync
+        self.on_error: Callable[[str], None] = on_error
+
+        self.file: TextIO = None
+        self.seq: int = 0                   # 最新记录序号
+        self.record_count: int = 0          # 上次检查点之后的记录数
+
+        self.queue: Queue = Queue()
+        self.active: bool = False
+        self.thread: Thread = None
+
+        # 写入失败状态
+        self.failed: bool = False
+        self.error_count: int = 0
+
+    def start(self) -> None:
+        """启动写入线程"""
+        if self.active:
+            return
+
+        self.active = True
+        self.thread = Thread(target=self.run, name="AlgoJournal", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """写入全部待写记录后停止写入线程"""
+        if not self.active:
+            return
+
+        self.queue.put(None)
+        self.thread.join()
+
+        self.active = False
+        self.thread = None
+
+    def flush(self) -> bool:
+        """等待已提交的记录全部写入，返回是否没有未恢复的写入失败"""
+        if self.active and self.thread.is_alive():
+            self.queue.join()
+
+        return not self.failed
+
+    def run(self) -> None:
+        """写入线程主循环"""
+        while True:
+            item: tuple = self.queue.get()
+
+            try:
+                if item is None:
+                    break
+
+                func, args = item
+                self.execute(func, args)
+            finally:
+                self.queue.task_done()
+
+    def submit(self, func: Callable, *args) -> None:
+        """提交写入任务，未启动写入线程时直接执行"""
+        if self.active:
+            self.queue.put((func, args))
+        else:
+            self.execute(func, args)
+
+    def execute(self, func: Callable, args: tuple) -> None:
+        """执行写入任务，失败时记录错误而不中断后续写入"""
+        try:
+            func(*args)
+        except Exception:
+            self.failed = True
+            self.error_count += 1
+
+            msg: str = f"状态日志写入失败：\n{traceback.format_exc()}"
+            if self.on_error:
+                self.on_error(msg)
+            else:
+                print(msg)
+
+    def reset(self, seq: int) -> None:
+        """清空日志并从指定序号继续写入"""
+        self.seq = seq
+        self.record_count = 0
+        self.submit(self.reopen)
+
+    def resume(self, seq: int, records: list[dict]) -> None:
+        """保留检查点之后的有效记录（去掉崩溃时不完整的最后一行），从指定序号继续写入"""
+        self.seq = seq
+        self.record_count = len(records)
+        self.submit(self.rewrite, records)
+
+    def checkpoint(self, file_path: Path, data: dict, files: dict[Path, object] = None) -> None:
+        """写入检查点文件（及随检查点保存的其他文件），然后清空日志"""
+        self.record_count = 0
+        self.submit(self.write_checkpoint, file_path, data, files)
+
+    def append(self, record: dict) -> int:
+        """追加一条记录，返回其序号"""
+        self.seq += 1
+        record["seq"] = self.seq
+        self.record_count += 1
+
+        self.submit(self.write, record)
+        return self.seq
+
+    def reopen(self) -> None:
+        """以清空方式重新打开日志文件"""
+        if self.file:
+            self.file.close()
+        self.file = open(self.file_path, mode="w", encoding="UTF-8")
+
+    def rewrite(self, records: list[dict]) -> None:
+        """清空日志后重新写入指定记录"""
+        self.reopen()
+
+        for record in records:
+            self.write(record)
+
+    def write(self, record: dict) -> None:
+        """写入一条记录"""
+        if not self.file:
+            return
+
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def write_checkpoint(self, file_path: Path, data: dict, files: dict[Path, object] = None) -> None:
+        """原子写入其他文件和检查点，全部成功后清空日志"""
+        if files:
+            for path, content in files.items():
+                save_json_atomic(path, content)
+
+        save_json_atomic(file_path, data)
+        self.reopen()
+
+        # 检查点已包含此前写入失败的状态变化
+        self.failed = False
+
+    def read(self, after_seq: int = 0) -> list[dict]:
+        """读取序号大于after_seq的记录"""
+        records: list[dict] = []
+
+        if not self.file_path.exists():
+            return records
+
+        with open(self.file_path, mode="r", encoding="UTF-8") as f:
+            for line in f:
+                # 崩溃时最后一行可能写入不完整
+                try:
+                    record: dict = json.loads(line)
+                except ValueError:
+                    break
+
+                if record["seq"] > after_seq:
+                    records.append(record)
+
+        return records
+
+    def close(self) -> None:
+        """停止写入线程并关闭日志文件"""
+        self.stop()
+
+        if self.file:
+            self.file.close()
+            self.file = None
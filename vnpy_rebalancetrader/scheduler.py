@@ -0,0 +1,90 @@
+from math import ceil, floor
+from typing import Any
+
+
+class AlgoScheduler:
+    """
+    算法定时调度器（哈希时间轮）
+
+    到期时间按resolution秒划分为刻度，映射到slot_count个槽位中。
+    调度和取消为O(1)，每次推进只检查经过的槽位，
+    因此每次定时推送的开销只与到期的算法数量有关，与篮子规模无关。
+    到期时间超过一圈的对象留在槽位中，等到对应的圈数再弹出。
+    """
+
+    def __init__(self, resolution: float = 0.1, slot_count: int = 1024) -> None:
+        """构造函数"""
+        self.resolution: float = resolution
+        self.slot_count: int = slot_count
+
+        self.slots: list[dict[Any, int]] = [{} for _ in range(slot_count)]
+        self.entries: dict[Any, tuple[float, int]] = {}     # key: (到期时间, 刻度)
+        self.current_tick: int = None                       # 已推进到的刻度
+
+    def schedule(self, key: Any, deadline: float) -> None:
+        """设置到期时间（已存在则覆盖）"""
+        if key in self.entries:
+            self.cancel(key)
+
+        # 向上取整，保证不会提前弹出（先消除浮点误差）
+        tick: int = ceil(deadline / self.resolution - 1e-6)
+        if self.current_tick is not None and tick <= self.current_tick:
+            tick = self.current_tick + 1
+
+        self.slots[tick % self.slot_count][key] = tick
+        self.entries[key] = (deadline, tick)
+
+    def cancel(self, key: Any) -> None:
+        """取消调度"""
+        entry: tuple = self.entries.pop(key, None)
+        if not entry:
+            return
+
+        tick: int = entry[1]
+        del self.slots[tick % self.slot_count][key]
+
+    def pop_due(self, now: float) -> list:
+        """推进到当前时间，弹出所有已到期的对象"""
+        target: int = floor(now / self.resolution + 1e-6)
+
+        # 首次推进或间隔超过一圈时，检查全部槽位
+        if self.current_tick is None or target - self.current_tick >= self.slot_count:
+            ticks: range = range(target - self.slot_count + 1, target + 1)
+        else:
+            ticks: range = range(self.current_tick + 1, target + 1)
+
+        if self.current_tick is None or target > self.current_tick:
+            self.current_tick = target
+
+        due: list = []
+
+        for tick in ticks:
+            slot: dict = self.slots[tick % self.slot_count]
+            if not slot:
+                continue
+
+            keys: list = [k for k, t in slot.items() if t <= target]
+            for key in keys:
+                del slot[key]
+                del self.entries[key]
+
+            due.extend(keys)
+
+        return due
+
+    def get_deadline(self, key: Any) -> float:
+        """查询到期时间，未调度则返回None"""
+        entry: tuple = self.entries.get(key, None)
+        if entry:
+            return entry[0]
+        return None
+
+    def clear(self) -> None:
+        """清空调度"""
+        for slot in self.slots:
+            slot.clear()
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        """已调度的数量"""
+        return len(self.entries)
@@ -0,0 +1,772 @@
+import csv
+import heapq
+from collections import defaultdict, deque
+from copy import copy
+from datetime import datetime
+from logging import WARNING
+from math import floor
+from pathlib import Path
+from time import thread_time
+from typing import Callable, Iterator
+
+from vnpy.event import Event, EventEngine
+from vnpy.trader.constant import Direction, Exchange, Product, Status
+from vnpy.trader.engine import MainEngine
+from vnpy.trader.event import EVENT_TIMER, EVENT_TRADE
+from vnpy.trader.gateway import BaseGateway
+from vnpy.trader.object import (
+    CancelRequest,
+    ContractData,
+    OrderData,
+    OrderRequest,
+    PositionData,
+    SubscribeRequest,
+    TickData,
+    TradeData
+)
+
+from basic.utils import LogSink, TradeRecorder
+
+from .algo import AlgoStatus, DfTwapAlgo
+from .basket import load_basket
+from .engine import DfRebalanceEngine
+
+
+# 行情文件中按浮点数读取的字段（缺少的字段保持默认值0）
+TICK_FLOAT_FIELDS: list[str] = [
+    "volume", "turnover", "open_interest", "last_price", "last_volume",
+    "limit_up", "limit_down", "open_price", "high_price", "low_price", "pre_close",
+] + [
+    f"{side}_{field}_{i}"
+    for side in ["bid", "ask"]
+    for field in ["price", "volume"]
+    for i in range(1, 6)
+]
+
+
+class SimClock:
+    """回放虚拟时钟（秒），赋值给引擎的clock后由回放驱动推进"""
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.now: float = 0
+
+    def __call__(self) -> float:
+        """当前虚拟时间"""
+        return self.now
+
+
+class SimEventEngine(EventEngine):
+    """
+    回放事件引擎
+
+    不启动工作线程和实时定时器，事件先进入队列，由回放驱动调用process按顺序同步处理，
+    定时事件也由回放驱动按虚拟时间推送。同时统计每类事件的处理次数和线程CPU耗时。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        super().__init__()
+
+        self._queue: deque = deque()
+
+        self.counts: dict[str, int] = defaultdict(int)          # 事件类型: 处理次数
+        self.costs: dict[str, float] = defaultdict(float)       # 事件类型: CPU耗时（秒）
+
+    def start(self) -> None:
+        """回放模式下不启动线程"""
+        pass
+
+    def stop(self) -> None:
+        """回放模式下没有线程需要停止"""
+        pass
+
+    def put(self, event: Event) -> None:
+        """事件放入队列"""
+        self._queue.append(event)
+
+    def process(self) -> None:
+        """处理队列中的全部事件（包括处理过程中新产生的事件）"""
+        while self._queue:
+            event: Event = self._queue.popleft()
+
+            # 没有处理函数的事件（如按合约细分的行情事件）不计入统计
+            if event.type not in self._handlers and not self._general_handlers:
+                continue
+
+            start: float = thread_time()
+            self._process(event)
+            self.costs[event.type] += thread_time() - start
+            self.counts[event.type] += 1
+
+    def get_stats(self) -> dict[str, tuple[int, float]]:
+        """获取各类事件的处理次数和平均耗时（微秒）"""
+        return {
+            type: (count, self.costs[type] / count * 1_000_000)
+            for type, count in self.counts.items()
+        }
+
+
+class SimGateway(BaseGateway):
+    """
+    模拟交易接口
+
+    行情由回放驱动逐笔输入，限价委托经过固定延迟后到达撮合：
+    1. 可立即成交的部分按对手方一档价格成交，数量不超过该笔行情剩余的一档挂单量
+    2. 剩余部分挂单排队，排在前面的数量为同价位挂单量乘以排队比例
+    3. 之后的行情中对手价穿过委托价时按委托价成交，成交价触及委托价时
+       新增成交量先消耗前面的排队量，再成交本委托
+    撤单同样经过延迟后生效，期间委托仍可能成交。持仓按净持仓模式推送。
+    """
+
+    default_name: str = "SIM"
+
+    default_setting: dict = {
+        "委托延迟": 0.1,
+        "排队比例": 1.0,
+    }
+
+    exchanges: list[Exchange] = list(Exchange)
+
+    def __init__(self, event_engine: EventEngine, gateway_name: str) -> None:
+        """构造函数"""
+        super().__init__(event_engine, gateway_name)
+
+        self.clock: Callable[[], float] = None
+        self.latency: float = 0.1               # 委托和撤单到达撮合的延迟（秒）
+        self.queue_ratio: float = 1.0           # 同价位挂单排在本委托之前的比例
+
+        self.contracts: dict[str, ContractData] = {}
+        self.subscribed: set[str] = set()
+
+        # 撮合状态
+        self.ticks: dict[str, TickData] = {}                # vt_symbol: 最新行情
+        self.ask_left: dict[str, float] = {}                # vt_symbol: 该笔行情剩余的卖一量
+        self.bid_left: dict[str, float] = {}                # vt_symbol: 该笔行情剩余的买一量
+        self.orders: dict[str, OrderData] = {}              # orderid: 已到达撮合的活动委托
+        self.symbol_orders: dict[str, dict[str, OrderData]] = defaultdict(dict)
+        self.queue_ahead: dict[str, float] = {}             # orderid: 排在前面的数量
+        self.pending_orders: dict[str, OrderData] = {}      # orderid: 尚未到达撮合的委托
+
+        # 延迟动作（到达时间，序号，函数，参数）
+        self.actions: list[tuple] = []
+        self.action_count: int = 0
+
+        # 净持仓：vt_symbol: [数量, 均价]
+        self.positions: dict[str, list[float]] = {}
+
+        self.order_count: int = 0
+        self.trade_count: int = 0
+
+    def add_contract(
+        self,
+        vt_symbol: str,
+        name: str = "",
+        size: float = 1,
+        pricetick: float = 1,
+        min_volume: float = 1
+    ) -> None:
+        """添加模拟合约"""
+        symbol, exchange_str = vt_symbol.rsplit(".", 1)
+
+        contract: ContractData = ContractData(
+            symbol=symbol,
+            exchange=Exchange(exchange_str),
+            name=name or symbol,
+            product=Product.FUTURES,
+            size=size,
+            pricetick=pricetick,
+            min_volume=min_volume,
+            net_position=True,
+            gateway_name=self.gateway_name
+        )
+        self.contracts[vt_symbol] = contract
+
+    def connect(self, setting: dict) -> None:
+        """连接：读取撮合参数并推送合约信息"""
+        self.latency = float(setting.get("委托延迟", self.latency))
+        self.queue_ratio = float(setting.get("排队比例", self.queue_ratio))
+
+        for contract in self.contracts.values():
+            self.on_contract(contract)
+
+        self.write_log(f"模拟接口连接成功，合约{len(self.contracts)}个")
+
+    def close(self) -> None:
+        """关闭接口"""
+        pass
+
+    def subscribe(self, req: SubscribeRequest) -> None:
+        """订阅行情"""
+        self.subscribed.add(req.vt_symbol)
+
+    def send_order(self, req: OrderRequest) -> str:
+        """委托下单"""
+        self.order_count += 1
+        orderid: str = str(self.order_count)
+
+        order: OrderData = req.create_order_data(orderid, self.gateway_name)
+        order.datetime = self.get_datetime()
+        self.on_order(copy(order))
+
+        self.pending_orders[orderid] = order
+        self.schedule(self.accept_order, orderid)
+
+        return order.vt_orderid
+
+    def cancel_order(self, req: CancelRequest) -> None:
+        """委托撤单"""
+        self.schedule(self.execute_cancel, req.orderid)
+
+    def query_account(self) -> None:
+        """查询资金"""
+        pass
+
+    def query_position(self) -> None:
+        """查询持仓"""
+        pass
+
+    def get_datetime(self) -> datetime:
+        """当前虚拟时间"""
+        return datetime.fromtimestamp(self.clock())
+
+    def schedule(self, func: Callable, orderid: str) -> None:
+        """按延迟安排动作"""
+        self.action_count += 1
+        heapq.heappush(self.actions, (self.clock() + self.latency, self.action_count, func, orderid))
+
+    def get_next_time(self) -> float:
+        """下一个延迟动作的到达时间，没有时返回None"""
+        if self.actions:
+            return self.actions[0][0]
+        return None
+
+    def run_next(self) -> None:
+        """执行下一个延迟动作"""
+        _, _, func, orderid = heapq.heappop(self.actions)
+        func(orderid)
+
+    def update_tick(self, tick: TickData) -> None:
+        """输入新行情：更新盘口，撮合挂单，已订阅的合约推送行情"""
+        vt_symbol: str = tick.vt_symbol
+        last_tick: TickData = self.ticks.get(vt_symbol, None)
+
+        self.ticks[vt_symbol] = tick
+        self.ask_left[vt_symbol] = tick.ask_volume_1
+        self.bid_left[vt_symbol] = tick.bid_volume_1
+
+        # 成交量为当日累计值
+        if last_tick:
+            traded: float = max(tick.volume - last_tick.volume, 0)
+        else:
+            traded: float = 0
+
+        orders: dict[str, OrderData] = self.symbol_orders.get(vt_symbol, None)
+        if orders:
+            for order in list(orders.values()):
+                self.match_resting(order, tick, traded)
+
+        if vt_symbol in self.subscribed:
+            self.on_tick(tick)
+
+    def accept_order(self, orderid: str) -> None:
+        """委托到达撮合"""
+        order: OrderData = self.pending_orders.pop(orderid, None)
+        if not order:
+            return
+
+        tick: TickData = self.ticks.get(order.vt_symbol, None)
+        if not tick:
+            order.status = Status.REJECTED
+            self.on_order(copy(order))
+            self.write_log(f"委托拒单，没有行情：{order.vt_symbol}")
+            return
+
+        # 先推送委托回报，再推送成交
+        order.status = Status.NOTTRADED
+        self.orders[orderid] = order
+        self.symbol_orders[order.vt_symbol][orderid] = order
+        self.on_order(copy(order))
+
+        # 可立即成交的部分按对手价成交
+        if order.direction == Direction.LONG:
+            if tick.ask_price_1 and order.price >= tick.ask_price_1:
+                self.match_book(order, tick.ask_price_1, self.ask_left)
+            best_price: float = tick.bid_price_1
+            same_volume: float = tick.bid_volume_1
+            better: bool = order.price > best_price
+        else:
+            if tick.bid_price_1 and order.price <= tick.bid_price_1:
+                self.match_book(order, tick.bid_price_1, self.bid_left)
+            best_price: float = tick.ask_price_1
+            same_volume: float = tick.ask_volume_1
+            better: bool = not best_price or order.price < best_price
+
+        if not order.is_active():
+            return
+
+        # 剩余部分挂单排队：优于最优价时排在最前，否则按一档挂单量估计排队位置
+        if better:
+            self.queue_ahead[orderid] = 0
+        else:
+            self.queue_ahead[orderid] = same_volume * self.queue_ratio
+
+    def match_book(self, order: OrderData, price: float, book_left: dict[str, float]) -> None:
+        """按对手方一档剩余挂单量成交"""
+        available: float = book_left[order.vt_symbol]
+        volume: float = min(order.volume - order.traded, available)
+        if volume <= 0:
+            return
+
+        book_left[order.vt_symbol] = available - volume
+        self.fill_order(order, price, volume)
+
+    def match_resting(self, order: OrderData, tick: TickData, traded: float) -> None:
+        """新行情撮合挂单"""
+        orderid: str = order.orderid
+        remaining: float = order.volume - order.traded
+
+        if order.direction == Direction.LONG:
+            crossed: bool = bool(tick.ask_price_1) and tick.ask_price_1 <= order.price
+            touched: bool = tick.last_price <= order.price
+            through: bool = tick.last_price < order.price
+            book_left: dict[str, float] = self.ask_left
+        else:
+            crossed: bool = bool(tick.bid_price_1) and tick.bid_price_1 >= order.price
+            touched: bool = tick.last_price >= order.price
+            through: bool = tick.last_price > order.price
+            book_left: dict[str, float] = self.bid_left
+
+        # 对手价穿过委托价，按委托价成交
+        if crossed:
+            volume: float = min(remaining, book_left[order.vt_symbol])
+            book_left[order.vt_symbol] -= volume
+        # 成交价触及委托价，新增成交量先消耗排队量
+        elif touched and traded:
+            if through:
+                self.queue_ahead[orderid] = 0
+
+            ahead: float = self.queue_ahead[orderid]
+            volume: float = min(remaining, max(traded - ahead, 0))
+            self.queue_ahead[orderid] = max(ahead - traded, 0)
+        else:
+            return
+
+        if volume > 0:
+            self.fill_order(order, order.price, volume)
+
+    def fill_order(self, order: OrderData, price: float, volume: float) -> None:
+        """委托成交，推送成交、委托和持仓"""
+        order.traded += volume
+        if order.traded >= order.volume:
+            order.status = Status.ALLTRADED
+            self.remove_order(order.orderid)
+        else:
+            order.status = Status.PARTTRADED
+
+        self.trade_count += 1
+        trade: TradeData = TradeData(
+            symbol=order.symbol,
+            exchange=order.exchange,
+            orderid=order.orderid,
+            tradeid=str(self.trade_count),
+            direction=order.direction,
+            offset=order.offset,
+            price=price,
+            volume=volume,
+            datetime=self.get_datetime(),
+            gateway_name=self.gateway_name
+        )
+        self.on_trade(trade)
+        self.on_order(copy(order))
+
+        self.update_position(trade)
+
+    def execute_cancel(self, orderid: str) -> None:
+        """撤单到达撮合"""
+        order: OrderData = self.orders.get(orderid, None)
+        if not order:
+            return
+
+        order.status = Status.CANCELLED
+        self.remove_order(orderid)
+        self.on_order(copy(order))
+
+    def remove_order(self, orderid: str) -> None:
+        """移除已结束的委托"""
+        order: OrderData = self.orders.pop(orderid)
+        self.symbol_orders[order.vt_symbol].pop(orderid)
+        self.queue_ahead.pop(orderid, None)
+
+    def update_position(self, trade: TradeData) -> None:
+        """更新并推送净持仓"""
+        pos, price = self.positions.get(trade.vt_symbol, (0, 0))
+
+        if trade.direction == Direction.LONG:
+            change: float = trade.volume
+        else:
+            change: float = -trade.volume
+        new_pos: float = pos + change
+
+        # 加仓时更新均价，减仓时均价不变，反向开仓时以成交价为均价
+        if not new_pos:
+            price = 0
+        elif pos * new_pos < 0 or not pos:
+            price = trade.price
+        elif abs(new_pos) > abs(pos):
+            price = (price * pos + trade.price * change) / new_pos
+
+        self.positions[trade.vt_symbol] = [new_pos, price]
+
+        position: PositionData = PositionData(
+            symbol=trade.symbol,
+            exchange=trade.exchange,
+            direction=Direction.NET,
+            volume=new_pos,
+            price=price,
+            gateway_name=self.gateway_name
+        )
+        self.on_position(position)
+
+
+class SimRebalanceEngine(DfRebalanceEngine):
+    """
+    回放用执行引擎
+
+    使用独立的数据文件和日志目录，避免覆盖实盘的检查点和成交记录，
+    每次回放都从空篮子开始。事件在回放循环中同步处理，不启动执行线程。
+    """
+
+    data_filename = "rebalance_trader_sim_data.json"
+    backup_filename = "rebalance_trader_sim_data_backup.json"
+    journal_filename = "rebalance_trader_sim_journal.jsonl"
+    history_filename = "rebalance_trader_sim_history.json"
+    log_level: int = WARNING
+    use_worker: bool = False
+
+    def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
+        """构造函数"""
+        super().__init__(main_engine, event_engine)
+
+        self.log_sink = LogSink(name="rebalance_sim", path="log/sim/txt/", level=self.log_level, console=False)
+        self.trade_recorder = TradeRecorder(path="log/sim/trade/", log_sink=self.log_sink)
+
+    def load_data(self) -> bool:
+        """不恢复历史数据，只清空状态日志"""
+        self.journal.reset(0)
+        return False
+
+
+def load_ticks(paths: list[str], gateway_name: str = SimGateway.default_name) -> Iterator[TickData]:
+    """
+    读取行情文件（CSV，每个文件内按时间排序），按时间合并后逐笔返回
+
+    必需字段：datetime，vt_symbol（或symbol和exchange）；
+    其余字段与TickData同名，缺少的字段为0。
+    """
+    readers: list[Iterator[TickData]] = [read_tick_file(path, gateway_name) for path in paths]
+    return heapq.merge(*readers, key=lambda tick: tick.datetime)
+
+
+def read_tick_file(path: str, gateway_name: str) -> Iterator[TickData]:
+    """逐行读取单个行情文件"""
+    with open(path, mode="r", encoding="utf-8-sig", newline="") as f:
+        reader: csv.DictReader = csv.DictReader(f)
+        fields: list[str] = [field for field in TICK_FLOAT_FIELDS if field in reader.fieldnames]
+
+        for row in reader:
+            if "vt_symbol" in row:
+                symbol, exchange_str = row["vt_symbol"].rsplit(".", 1)
+            else:
+                symbol, exchange_str = row["symbol"], row["exchange"]
+
+            tick: TickData = TickData(
+                symbol=symbol,
+                exchange=Exchange(exchange_str),
+                datetime=datetime.fromisoformat(row["datetime"]),
+                name=row.get("name", ""),
+                gateway_name=gateway_name
+            )
+
+            for field in fields:
+                value: str = row[field]
+                if value:
+                    setattr(tick, field, float(value))
+
+            yield tick
+
+
+def load_contract_file(gateway: SimGateway, path: str) -> None:
+    """读取合约信息文件（CSV：vt_symbol,name,size,pricetick,min_volume）"""
+    with open(path, mode="r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            gateway.add_contract(
+                row["vt_symbol"],
+                row.get("name", ""),
+                float(row.get("size", 1) or 1),
+                float(row.get("pricetick", 1) or 1),
+                float(row.get("min_volume", 1) or 1),
+            )
+
+
+class SimReplay:
+    """
+    离线回放
+
+    按虚拟时间逐笔推送行情，每跨过一个整秒推送一次定时事件，行情间隔超过max_gap秒时
+    （如午休、隔夜）直接跳到下一笔行情，不逐秒推送。预热warmup秒让各合约都有行情后
+    启动全部算法，统计每个算法相对启动时中间价的滑点、完成用时，以及各类事件的处理耗时。
+    """
+
+    def __init__(
+        self,
+        tick_paths: list[str],
+        basket_path: str,
+        contract_path: str = None,
+        setting: dict = None,
+        warmup: float = 1,
+        max_gap: float = 60,
+        stop_when_done: bool = True
+    ) -> None:
+        """构造函数"""
+        # 主引擎会切换工作目录，先转换为绝对路径
+        self.tick_paths: list[str] = [str(Path(path).resolve()) for path in tick_paths]
+        self.basket_path: str = str(Path(basket_path).resolve())
+        self.contract_path: str = str(Path(contract_path).resolve()) if contract_path else None
+
+        self.setting: dict = setting or SimGateway.default_setting
+        self.warmup: float = warmup
+        self.max_gap: float = max_gap
+        self.stop_when_done: bool = stop_when_done
+
+        self.clock: SimClock = SimClock()
+        self.event_engine: SimEventEngine = SimEventEngine()
+        self.main_engine: MainEngine = None
+        self.gateway: SimGateway = None
+        self.engine: SimRebalanceEngine = None
+
+        # 统计数据
+        self.start_time: float = None
+        self.end_time: float = 0
+        self.tick_count: int = 0
+        self.timer_count: int = 0
+        self.arrival_prices: dict[str, float] = {}          # algoid: 启动时中间价
+        self.fill_volumes: dict[str, float] = defaultdict(float)
+        self.fill_turnovers: dict[str, float] = defaultdict(float)
+        self.finish_times: dict[str, float] = {}            # algoid: 完成时间
+
+    def init(self) -> None:
+        """创建引擎、加载合约和篮子"""
+        self.main_engine = MainEngine(self.event_engine)
+
+        self.gateway = self.main_engine.add_gateway(SimGateway)
+        self.gateway.clock = self.clock
+        if self.contract_path:
+            load_contract_file(self.gateway, self.contract_path)
+
+        self.engine = SimRebalanceEngine(self.main_engine, self.event_engine)
+        self.engine.clock = self.clock
+        self.engine.init()
+
+        self.event_engine.register(EVENT_TRADE, self.process_trade_event)
+
+    def run(self) -> dict:
+        """执行回放，返回统计结果"""
+        ticks: Iterator[TickData] = load_ticks(self.tick_paths)
+
+        first_tick: TickData = next(ticks, None)
+        if not first_tick:
+            return {}
+
+        self.clock.now = first_tick.datetime.timestamp()
+
+        # 篮子和行情文件中有、合约文件中没有的合约使用默认合约信息
+        self.add_basket_contracts()
+        self.add_tick_contract(first_tick)
+        pending: list[TickData] = [first_tick]
+
+        self.gateway.connect(self.setting)
+        self.event_engine.process()
+
+        summary: dict = self.engine.add_algos_bulk(self.basket_path)
+        self.event_engine.process()
+        if summary.get("errors", None):
+            raise ValueError("\n".join(summary["errors"]))
+
+        ready_time: float = self.clock.now + self.warmup
+        next_timer: int = floor(self.clock.now) + 1
+        cpu_start: float = thread_time()
+
+        for tick in self.iter_ticks(pending, ticks):
+            now: float = tick.datetime.timestamp()
+
+            # 长时间无行情时跳过空闲的定时事件
+            if now - next_timer > self.max_gap:
+                next_timer = floor(now)
+
+            while next_timer <= now:
+                self.step_timer(next_timer, ready_time)
+                next_timer += 1
+
+            if self.stop_when_done and self.is_done():
+                break
+
+            self.advance(now)
+            self.gateway.update_tick(tick)
+            self.event_engine.process()
+            self.tick_count += 1
+
+        self.end_time = self.clock.now
+        cpu_cost: float = thread_time() - cpu_start
+
+        return self.get_result(cpu_cost)
+
+    def iter_ticks(self, pending: list[TickData], ticks: Iterator[TickData]) -> Iterator[TickData]:
+        """逐笔返回行情，遇到新合约时补充默认合约信息"""
+        yield from pending
+
+        for tick in ticks:
+            if tick.vt_symbol not in self.gateway.contracts:
+                self.add_tick_contract(tick)
+                self.gateway.on_contract(self.gateway.contracts[tick.vt_symbol])
+            yield tick
+
+    def add_basket_contracts(self) -> None:
+        """按默认参数添加篮子中的合约（代码格式错误的留给篮子校验报错）"""
+        for vt_symbol in load_basket(self.basket_path)["vt_symbol"].astype(str).str.strip():
+            if vt_symbol in self.gateway.contracts:
+                continue
+
+            try:
+                self.gateway.add_contract(vt_symbol)
+            except ValueError:
+                continue
+
+    def add_tick_contract(self, tick: TickData) -> None:
+        """按默认参数添加行情中出现的合约"""
+        if tick.vt_symbol not in self.gateway.contracts:
+            self.gateway.add_contract(tick.vt_symbol, tick.name)
+
+    def advance(self, now: float) -> None:
+        """推进虚拟时间，按到达顺序执行期间的委托和撤单动作"""
+        while True:
+            next_time: float = self.gateway.get_next_time()
+            if next_time is None or next_time > now:
+                break
+
+            self.clock.now = next_time
+            self.gateway.run_next()
+            self.event_engine.process()
+
+        self.clock.now = now
+
+    def step_timer(self, timestamp: float, ready_time: float) -> None:
+        """推进到指定整秒并推送定时事件"""
+        self.advance(timestamp)
+
+        if self.start_time is None and timestamp >= ready_time:
+            self.start_algos()
+
+        self.event_engine.put(Event(EVENT_TIMER))
+        self.event_engine.process()
+        self.timer_count += 1
+
+    def start_algos(self) -> None:
+        """启动全部算法，记录启动时的中间价"""
+        self.start_time = self.clock.now
+
+        for algo in self.engine.algos.values():
+            tick: TickData = self.gateway.ticks.get(algo.vt_symbol, None)
+            if not tick:
+                continue
+
+            if tick.bid_price_1 and tick.ask_price_1:
+                price: float = (tick.bid_price_1 + tick.ask_price_1) / 2
+            else:
+                price: float = tick.last_price
+            self.arrival_prices[algo.algoid] = price
+
+        self.engine.start_algos()
+        self.event_engine.process()
+
+    def process_trade_event(self, event: Event) -> None:
+        """统计算法成交（在引擎处理之后执行）"""
+        trade: TradeData = event.data
+
+        algo: DfTwapAlgo = self.engine.orderid_algo_map.get(trade.vt_orderid, None)
+        if not algo:
+            return
+
+        self.fill_volumes[algo.algoid] += trade.volume
+        self.fill_turnovers[algo.algoid] += trade.volume * trade.price
+
+        if algo.current_pos == algo.total_volume and algo.algoid not in self.finish_times:
+            self.finish_times[algo.algoid] = self.clock.now
+
+    def is_done(self) -> bool:
+        """全部算法是否已完成"""
+        if self.start_time is None:
+            return False
+
+        for algo in self.engine.algos.values():
+            if algo.status == AlgoStatus.RUNNING and algo.current_pos != algo.total_volume:
+                return False
+        return True
+
+    def get_result(self, cpu_cost: float) -> dict:
+        """汇总回放结果"""
+        algos: list[dict] = []
+
+        for algo in self.engine.algos.values():
+            volume: float = self.fill_volumes.get(algo.algoid, 0)
+            arrival_price: float = self.arrival_prices.get(algo.algoid, 0)
+
+            if volume and arrival_price:
+                avg_price: float = self.fill_turnovers[algo.algoid] / volume
+
+                # 滑点为正表示成交价差于启动时中间价
+                if algo.direction == Direction.LONG:
+                    slippage: float = (avg_price - arrival_price) / arrival_price * 10_000
+                else:
+                    slippage: float = (arrival_price - avg_price) / arrival_price * 10_000
+            else:
+                avg_price: float = 0
+                slippage: float = 0
+
+            finish_time: float = self.finish_times.get(algo.algoid, None)
+            if finish_time is not None:
+                duration: float = finish_time - self.start_time
+            else:
+                duration: float = None
+
+            algos.append({
+                "algoid": algo.algoid,
+                "vt_symbol": algo.vt_symbol,
+                "target": algo.total_volume,
+                "filled": algo.current_pos,
+                "arrival_price": arrival_price,
+                "avg_price": avg_price,
+                "slippage_bps": slippage,
+                "duration": duration,
+            })
+
+        if self.start_time is not None:
+            virtual_time: float = self.end_time - self.start_time
+        else:
+            virtual_time: float = 0
+
+        return {
+            "algos": algos,
+            "events": self.event_engine.get_stats(),
+            "tick_count": self.tick_count,
+            "timer_count": self.timer_count,
+            "order_count": self.gateway.order_count,
+            "trade_count": self.gateway.trade_count,
+            "virtual_time": virtual_time,
+            "cpu_time": cpu_cost,
+        }
+
+    def close(self) -> None:
+        """关闭引擎"""
+        if self.engine:
+            self.engine.close()
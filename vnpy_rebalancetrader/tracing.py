@@ -0,0 +1,216 @@
+import csv
+from collections import deque
+from datetime import datetime
+from time import perf_counter, time
+
+from vnpy.trader.constant import Direction
+
+
+# 链路各阶段：行情到达、生成委托、开平转换、发出委托、委托回报、首次成交
+TRACE_STAGES: list[str] = [
+    "tick_time",
+    "decided_time",
+    "converted_time",
+    "sent_time",
+    "ack_time",
+    "fill_time",
+]
+
+# 汇总的阶段间隔（起始字段，结束字段，显示名）
+TRACE_SPANS: list[tuple[str, str, str]] = [
+    ("tick_time", "decided_time", "行情->生成委托"),
+    ("decided_time", "converted_time", "开平转换"),
+    ("converted_time", "sent_time", "接口下单"),
+    ("sent_time", "ack_time", "下单->回报"),
+    ("ack_time", "fill_time", "回报->首次成交"),
+    ("tick_time", "sent_time", "行情->发出委托"),
+    ("tick_time", "ack_time", "行情->委托回报"),
+]
+
+
+class SliceTrace:
+    """单轮下单（切片）的链路时间戳，均为perf_counter秒数"""
+
+    __slots__ = (
+        "algoid",
+        "vt_symbol",
+        "direction",
+        "price",
+        "volume",
+        "datetime",
+        "vt_orderids",
+        "tick_time",
+        "decided_time",
+        "converted_time",
+        "sent_time",
+        "ack_time",
+        "fill_time",
+    )
+
+    def __init__(
+        self,
+        algoid: str,
+        vt_symbol: str,
+        direction: Direction,
+        price: float,
+        volume: float,
+        tick_time: float,
+        decided_time: float
+    ) -> None:
+        """构造函数"""
+        self.algoid: str = algoid
+        self.vt_symbol: str = vt_symbol
+        self.direction: Direction = direction
+        self.price: float = price
+        self.volume: float = volume
+        self.datetime: float = time()           # 生成委托时的系统时间，用于和日志对照
+        self.vt_orderids: list[str] = []
+
+        self.tick_time: float = tick_time
+        self.decided_time: float = decided_time
+        self.converted_time: float = None
+        self.sent_time: float = None
+        self.ack_time: float = None
+        self.fill_time: float = None
+
+
+class SliceTracer:
+    """
+    委托链路追踪
+
+    记录每轮下单从行情到达、生成委托、开平转换、发出委托到首次委托回报、首次成交的时间戳，
+    保存在固定容量的环形缓冲区中，超出容量时淘汰最早的记录，内存占用固定。
+    """
+
+    def __init__(self, capacity: int, enabled: bool = True) -> None:
+        """构造函数"""
+        self.enabled: bool = enabled
+
+        self.traces: deque[SliceTrace] = deque(maxlen=capacity)
+        self.order_traces: dict[str, SliceTrace] = {}      # vt_orderid: SliceTrace
+        self.tick_times: dict[str, float] = {}              # vt_symbol: 最新行情到达时间
+
+    def on_tick(self, vt_symbol: str, arrival_time: float = None) -> None:
+        """记录行情到达事件引擎的本地时间（未提供时取当前时间）"""
+        if self.enabled:
+            if arrival_time is None:
+                arrival_time = perf_counter()
+            self.tick_times[vt_symbol] = arrival_time
+
+    def start_slice(
+        self,
+        algoid: str,
+        vt_symbol: str,
+        direction: Direction,
+        price: float,
+        volume: float
+    ) -> SliceTrace:
+        """开始记录一轮下单，未启用时返回None"""
+        if not self.enabled:
+            return None
+
+        trace: SliceTrace = SliceTrace(
+            algoid,
+            vt_symbol,
+            direction,
+            price,
+            volume,
+            self.tick_times.get(vt_symbol, None),
+            perf_counter()
+        )
+
+        # 缓冲区已满时，被淘汰的记录不再接收回报
+        if len(self.traces) == self.traces.maxlen:
+            for vt_orderid in self.traces[0].vt_orderids:
+                self.order_traces.pop(vt_orderid, None)
+
+        self.traces.append(trace)
+        return trace
+
+    def add_order(self, trace: SliceTrace, vt_orderid: str) -> None:
+        """委托发出"""
+        if trace.sent_time is None:
+            trace.sent_time = perf_counter()
+
+        trace.vt_orderids.append(vt_orderid)
+        self.order_traces[vt_orderid] = trace
+
+    def on_ack(self, vt_orderid: str) -> None:
+        """收到委托回报（提交中状态之后的第一次推送）"""
+        trace: SliceTrace = self.order_traces.get(vt_orderid, None)
+        if trace and trace.ack_time is None:
+            trace.ack_time = perf_counter()
+
+    def on_fill(self, vt_orderid: str) -> None:
+        """收到成交"""
+        trace: SliceTrace = self.order_traces.get(vt_orderid, None)
+        if trace and trace.fill_time is None:
+            trace.fill_time = perf_counter()
+
+    def clear(self) -> None:
+        """清空记录"""
+        self.traces.clear()
+        self.order_traces.clear()
+
+    def get_summary(self) -> dict[str, dict]:
+        """统计缓冲区内各阶段间隔的分位数（微秒）"""
+        traces: list[SliceTrace] = list(self.traces)
+        summary: dict[str, dict] = {}
+
+        for start_field, end_field, name in TRACE_SPANS:
+            values: list[float] = []
+
+            for trace in traces:
+                start: float = getattr(trace, start_field)
+                end: float = getattr(trace, end_field)
+                if start is not None and end is not None:
+                    values.append((end - start) * 1_000_000)
+
+            if not values:
+                continue
+
+            values.sort()
+            n: int = len(values)
+
+            summary[name] = {
+                "count": n,
+                "mean": sum(values) / n,
+                "p50": values[n // 2],
+                "p90": values[min(int(n * 0.9), n - 1)],
+                "p99": values[min(int(n * 0.99), n - 1)],
+                "max": values[-1],
+            }
+
+        return summary
+
+    def export(self, path: str) -> int:
+        """导出缓冲区内的记录（CSV），时间为相对行情到达的微秒数，返回记录数"""
+        traces: list[SliceTrace] = list(self.traces)
+
+        with open(path, mode="w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ["algoid", "vt_symbol", "direction", "price", "volume", "vt_orderids", "datetime"]
+                + TRACE_STAGES[1:]
+            )
+
+            for trace in traces:
+                # 没有行情到达时间时以生成委托时间为基准
+                base: float = trace.tick_time if trace.tick_time is not None else trace.decided_time
+
+                offsets: list = []
+                for field in TRACE_STAGES[1:]:
+                    value: float = getattr(trace, field)
+                    offsets.append("" if value is None else round((value - base) * 1_000_000, 1))
+
+                writer.writerow([
+                    trace.algoid,
+                    trace.vt_symbol,
+                    trace.direction.value,
+                    trace.price,
+                    trace.volume,
+                    " ".join(trace.vt_orderids),
+                    datetime.fromtimestamp(trace.datetime).isoformat(timespec="microseconds"),
+                ] + offsets)
+
+        return len(traces)
@@ -1,7 +1,6 @@
 from multiprocessing.connection import wait
-import traceback
-from csv import DictReader
-from functools import partial
+from enum import Enum
+from typing import Any
 
 from vnpy.event import EventEngine, Event
 from vnpy.trader.object import LogData
@@ -9,23 +8,28 @@ from vnpy.trader.engine import MainEngine
 from vnpy.trader.constant import Direction
 from vnpy.trader.ui import QtWidgets, QtCore, qt
 from vnpy.trader.ui.widget import (
-    BaseMonitor,
     TradeMonitor,
     OrderMonitor,
-    BaseCell,
-    EnumCell,
-    DirectionCell,
-    PnlCell
 )
 
-from ..engine import APP_NAME, EVENT_TICK, EVENT_REBALANCE_ALGO, EVENT_REBALANCE_EXPOSURE, EVENT_REBALANCE_HOLDING, EVENT_REBALANCE_LOG
+from ..engine import (
+    APP_NAME,
+    EVENT_REBALANCE_ALGO,
+    EVENT_REBALANCE_EXPOSURE,
+    EVENT_REBALANCE_HOLDING,
+    EVENT_REBALANCE_LOG,
+    EVENT_REBALANCE_PORTFOLIO,
+    EVENT_REBALANCE_METRICS
+)
 from ..engine import DfRebalanceEngine
-from ..algo import DfTwapAlgo
+from ..algo import AlgoSnapshot, AlgoStatus
 
 COLOR_LONG = qt.QtGui.QColor("red")
 COLOR_SHORT = qt.QtGui.QColor("green")
 COLOR_WHITE = qt.QtGui.QColor("white")
 
+SORT_ROLE = QtCore.Qt.UserRole         # 排序使用原始数值，而非显示文本
+
 
 class RebalanceWidget(QtWidgets.QWidget):
     """篮子交易监控组件"""
@@ -33,7 +37,7 @@ class RebalanceWidget(QtWidgets.QWidget):
     signal_log = QtCore.pyqtSignal(Event)
     signal_algo = QtCore.pyqtSignal(Event)
     signal_exposure = QtCore.pyqtSignal(Event)
-    signal_tick = QtCore.pyqtSignal(Event)
+    signal_portfolio = QtCore.pyqtSignal(Event)
 
     def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
         """"""
@@ -44,9 +48,6 @@ class RebalanceWidget(QtWidgets.QWidget):
 
         self.engine: DfRebalanceEngine = main_engine.get_engine(APP_NAME)
 
-        # 修改框中数字后, 将待该仓位缓存于该字典中, 确认后进行修改
-        self.target_pos_waiting_to_change: dict = {}
-
         self.show = self.showMaximized
 
         self.init_ui()
@@ -56,8 +57,10 @@ class RebalanceWidget(QtWidgets.QWidget):
         """初始化界面"""
         self.setWindowTitle("组合调仓")
 
-        self.long_monitor: AlgoMonitor = AlgoMonitor(self.main_engine, self.event_engine)
-        self.short_monitor: AlgoMonitor = AlgoMonitor(self.main_engine, self.event_engine)
+        # 多空两个表格共用同一个数据模型，通过代理按方向过滤
+        self.algo_model: AlgoTableModel = AlgoTableModel(self.engine)
+        self.long_monitor: AlgoMonitor = AlgoMonitor(self.algo_model, Direction.LONG)
+        self.short_monitor: AlgoMonitor = AlgoMonitor(self.algo_model, Direction.SHORT)
 
         self.order_monitor: RebalanceOrderMonitor = RebalanceOrderMonitor(self.main_engine, self.event_engine)
         self.trade_monitor: RebalanceTradeMonitor = RebalanceTradeMonitor(self.main_engine, self.event_engine)
@@ -66,8 +69,9 @@ class RebalanceWidget(QtWidgets.QWidget):
         self.log_monitor: QtWidgets.QTextEdit = QtWidgets.QTextEdit()
         self.log_monitor.setReadOnly(True)
 
-        self.control_monitor: QtWidgets.QGridLayout = QtWidgets.QGridLayout()
-        self.control_monitor.setRowStretch(10, 6)
+        self.filter_line: QtWidgets.QLineEdit = QtWidgets.QLineEdit()
+        self.filter_line.setPlaceholderText("筛选合约")
+        self.filter_line.textChanged.connect(self.filter_symbol)
 
         self.init_button = QtWidgets.QPushButton("初始化")
         self.init_button.clicked.connect(self.init_engine)
@@ -88,16 +92,28 @@ class RebalanceWidget(QtWidgets.QWidget):
         self.close_pos_button.clicked.connect(self.close_all_pos)
         self.close_pos_button.setEnabled(False)
 
+        self.rebalance_button = QtWidgets.QPushButton("调仓到文件")
+        self.rebalance_button.clicked.connect(self.rebalance_to_file)
+        self.rebalance_button.setEnabled(False)
+
         self.clear_button = QtWidgets.QPushButton("清空算法")
         self.clear_button.clicked.connect(self.clear_algos)
         self.clear_button.setEnabled(False)
 
+        self.metrics_monitor: RebalanceMetricsMonitor = RebalanceMetricsMonitor(self.engine, self.event_engine)
+
+        self.metrics_button = QtWidgets.QPushButton("运行指标")
+        self.metrics_button.clicked.connect(self.metrics_monitor.show)
+
         self.long_value_label = QtWidgets.QLabel()
         self.short_value_label = QtWidgets.QLabel()
         self.net_value_label = QtWidgets.QLabel()
         self.deviate_label = QtWidgets.QLabel()
+        self.residual_value_label = QtWidgets.QLabel()
         self.long_pause_label = QtWidgets.QLabel()
         self.short_pause_label = QtWidgets.QLabel()
+        self.holding_value_label = QtWidgets.QLabel()
+        self.holding_pnl_label = QtWidgets.QLabel()
 
         self.limit_spin = QtWidgets.QSpinBox()
         self.limit_spin.setRange(0, 1_000_000_000)
@@ -111,13 +127,16 @@ class RebalanceWidget(QtWidgets.QWidget):
         hbox1.addWidget(self.start_button)
         hbox1.addWidget(self.stop_button)
         hbox1.addWidget(self.close_pos_button)
+        hbox1.addWidget(self.rebalance_button)
         hbox1.addStretch()
         hbox1.addWidget(QtWidgets.QLabel("敞口上限"))
         hbox1.addWidget(self.limit_spin)
         hbox1.addStretch()
+        hbox1.addWidget(self.metrics_button)
         hbox1.addWidget(self.clear_button)
 
         vbox1 = QtWidgets.QVBoxLayout()
+        vbox1.addWidget(self.filter_line)
         vbox1.addWidget(self.long_monitor)
         vbox1.addWidget(self.short_monitor)
 
@@ -126,14 +145,10 @@ class RebalanceWidget(QtWidgets.QWidget):
         vbox2.addWidget(self.trade_monitor)
         vbox2.addWidget(self.holding_monitor)
 
-        vbox3 = QtWidgets.QVBoxLayout()
-        vbox3.addLayout(self.control_monitor)
-        vbox3.addWidget(self.log_monitor)
-
         hbox2 = QtWidgets.QHBoxLayout()
         hbox2.addLayout(vbox1)
         hbox2.addLayout(vbox2)
-        hbox2.addLayout(vbox3)
+        hbox2.addWidget(self.log_monitor)
 
         hbox3 = QtWidgets.QHBoxLayout()
         hbox3.addWidget(self.long_value_label)
@@ -144,9 +159,15 @@ class RebalanceWidget(QtWidgets.QWidget):
         hbox3.addStretch()
         hbox3.addWidget(self.deviate_label)
         hbox3.addStretch()
+        hbox3.addWidget(self.residual_value_label)
+        hbox3.addStretch()
         hbox3.addWidget(self.long_pause_label)
         hbox3.addStretch()
         hbox3.addWidget(self.short_pause_label)
+        hbox3.addStretch()
+        hbox3.addWidget(self.holding_value_label)
+        hbox3.addStretch()
+        hbox3.addWidget(self.holding_pnl_label)
 
         vbox = QtWidgets.QVBoxLayout()
         vbox.addLayout(hbox1)
@@ -155,76 +176,33 @@ class RebalanceWidget(QtWidgets.QWidget):
 
         self.setLayout(vbox)
 
-    def init_control_monitor(self) -> None:
-        '''初始化控制组件'''
-        self.qlabel = {}        # 各品种的label
-        for i, (symbol, algo) in enumerate(self.engine.algos.items()):
-            
-            self.qlabel[symbol] = QtWidgets.QLabel(symbol)
-            self.control_monitor.addWidget(self.qlabel[symbol], i, 0)
-
-            waiting_botton = QtWidgets.QPushButton("暂停")
-            reset_waiting_status = partial(self.reset_status, symbol=symbol, status='paused')
-            waiting_botton.clicked.connect(reset_waiting_status)
-            self.control_monitor.addWidget(waiting_botton, i, 1)
-
-            running_botton = QtWidgets.QPushButton("运行")
-            reset_running_status = partial(self.reset_status, symbol=symbol, status='running')
-            running_botton.clicked.connect(reset_running_status)
-            self.control_monitor.addWidget(running_botton, i, 2)
-
-            self.control_monitor.addWidget(QtWidgets.QLabel('   更改目标仓位:'), i, 3)
-            
-            # 框内数字进行缓存
-            target_pos_cell = QtWidgets.QSpinBox()
-            if algo.direction == Direction.LONG:
-                target_pos_cell.setRange(0, 10_000)
-            elif algo.direction == Direction.SHORT:
-                target_pos_cell.setRange(-10_000, 0)
-            target_pos_cell.setSingleStep(1)
-            target_pos_cell.setValue(algo.total_volume)
-            wait_change_target_pos = partial(self.change_target_pos, symbol=symbol, waiting=True)
-            target_pos_cell.valueChanged.connect(wait_change_target_pos)
-            self.control_monitor.addWidget(target_pos_cell, i, 4)
-            
-            # 对所调仓位进行确认
-            ensure_change_target_pos = partial(self.change_target_pos, pos=None, symbol=symbol, waiting=False)
-            ensure_botton = QtWidgets.QPushButton("确认")
-            ensure_botton.clicked.connect(ensure_change_target_pos)
-            self.control_monitor.addWidget(ensure_botton, i, 5)
-
     def register_event(self) -> None:
         """注册事件监听"""
-        self.signal_tick.connect(self.process_tick_event)
         self.signal_log.connect(self.process_log_event)
         self.signal_algo.connect(self.process_algo_event)
         self.signal_exposure.connect(self.process_exposure_event)
+        self.signal_portfolio.connect(self.process_portfolio_event)
 
         self.event_engine.register(EVENT_REBALANCE_LOG, self.signal_log.emit)
         self.event_engine.register(EVENT_REBALANCE_ALGO, self.signal_algo.emit)
         self.event_engine.register(EVENT_REBALANCE_EXPOSURE, self.signal_exposure.emit)
-        self.event_engine.register(EVENT_TICK, self.signal_tick.emit)
+        self.event_engine.register(EVENT_REBALANCE_PORTFOLIO, self.signal_portfolio.emit)
 
     def process_algo_event(self, event: Event) -> None:
-        """处理算法事件"""
-        algo: DfTwapAlgo = event.data
-
-        if algo.direction == Direction.LONG:
-            self.long_monitor.process_event(event)
-        else:
-            self.short_monitor.process_event(event)
+        """处理算法事件（批量）"""
+        algos: list[AlgoSnapshot] = event.data
+        self.algo_model.update_datas(algos)
 
     def process_log_event(self, event: Event) -> None:
         """处理日志事件"""
         log: LogData = event.data
         self.log_monitor.append(f"{log.time}: {log.msg}")
-    
-    def process_tick_event(self, event: Event) -> None:
-        """处理tick事件"""
-        for symbol in self.engine.algos.keys():
-            color = self.engine.update_color(symbol)
-            if color:
-                self.qlabel[symbol].setStyleSheet(f"color:{color}")
+
+    def filter_symbol(self, text: str) -> None:
+        """按合约代码筛选"""
+        self.long_monitor.set_filter(text)
+        self.short_monitor.set_filter(text)
+        self.holding_monitor.set_filter(text)
 
     def process_exposure_event(self, event: Event) -> None:
         """处理敞口事件"""
@@ -234,6 +212,7 @@ class RebalanceWidget(QtWidgets.QWidget):
         short_value: float = data["short_value"]
         net_value: float = data["net_value"]
         deviate: float = data["deviate"]
+        residual_value: float = data["residual_value"]
         long_pause: bool = data["long_pause"]
         short_pause: bool = data["short_pause"]
 
@@ -241,17 +220,32 @@ class RebalanceWidget(QtWidgets.QWidget):
         self.short_value_label.setText(f"卖出成交 {short_value}")
         self.net_value_label.setText(f"当前敞口 {net_value}")
         self.deviate_label.setText(f"偏离度 {deviate}")
+        self.residual_value_label.setText(f"剩余市值 {residual_value:.0f}")
+
+        long_factor: float = data["long_factor"]
+        short_factor: float = data["short_factor"]
 
         if long_pause:
             self.long_pause_label.setText("买入暂停")
+        elif long_factor < 1:
+            self.long_pause_label.setText(f"买入限速 {long_factor:.0%}")
         else:
             self.long_pause_label.setText("买入正常")
 
         if short_pause:
             self.short_pause_label.setText("卖出暂停")
+        elif short_factor < 1:
+            self.short_pause_label.setText(f"卖出限速 {short_factor:.0%}")
         else:
             self.short_pause_label.setText("卖出正常")
 
+    def process_portfolio_event(self, event: Event) -> None:
+        """处理组合持仓合计事件"""
+        data: dict = event.data
+
+        self.holding_value_label.setText(f"持仓净市值 {data['net_value']:.0f}")
+        self.holding_pnl_label.setText(f"持仓盈亏 {data['pnl']:.0f}")
+
     def init_engine(self) -> None:
         """初始化引擎"""
         n: bool = self.engine.init()
@@ -263,135 +257,431 @@ class RebalanceWidget(QtWidgets.QWidget):
             self.start_button.setEnabled(True)
             self.stop_button.setEnabled(True)
             self.clear_button.setEnabled(True)
-            self.init_control_monitor()
+            self.rebalance_button.setEnabled(True)
 
     def load_csv(self) -> None:
-        """加载CSV文件"""
+        """加载篮子文件"""
         path, _ = QtWidgets.QFileDialog.getOpenFileName(
             self,
             u"导入委托篮子",
             "",
-            "CSV(*.csv)"
+            "篮子文件(*.csv *.parquet *.feather)"
         )
 
         if not path:
             return
 
-        # 遍历CSV文件加载
-        try:
-            with open(path, "r", encoding="utf8") as f:
-                # 创建读取器
-                reader = DictReader(f)
-
-                # 逐行遍历
-                for row in reader:
-                    self.engine.add_algo(
-                        str(row["vt_symbol"]),
-                        Direction(row["direction"]),
-                        int(row["total_volume"]),
-                        int(row["time_interval"]),
-                        float(row["vol_percent"]),
-                    )
-        except Exception:
-            self.engine.write_log(f"委托篮子数据导入失败：{path}")
-            self.engine.write_log(f"报错信息：{traceback.format_exc()}")
-            return
+        summary: dict = self.engine.call(self.engine.add_algos_bulk, path)
 
-        self.engine.write_log(f"委托篮子数据导入成功：{path}")
+        errors: list[str] = summary["errors"]
+        if errors:
+            QtWidgets.QMessageBox.warning(
+                self,
+                "导入失败",
+                f"共{len(errors)}处错误，未导入任何算法：\n" + "\n".join(errors[:50])
+            )
+            return
 
         self.csv_button.setEnabled(False)
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(True)
         self.clear_button.setEnabled(True)
+        self.rebalance_button.setEnabled(True)
 
-        # 初始化控制组件
-        self.init_control_monitor()
+    def rebalance_to_file(self) -> None:
+        """按新篮子文件增量调仓（先预览，确认后执行）"""
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self,
+            u"调仓到新篮子",
+            "",
+            "篮子文件(*.csv *.parquet *.feather)"
+        )
+
+        if not path:
+            return
+
+        report: dict = self.engine.call(self.engine.preview_basket, path)
+
+        if report["errors"]:
+            self.show_rebalance_errors(report["errors"])
+            return
+
+        text: str = "\n".join(report["text"].splitlines()[:50])
+        reply = QtWidgets.QMessageBox.question(
+            self,
+            "调仓预览",
+            f"{text}\n\n确认执行调仓？",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+            QtWidgets.QMessageBox.No
+        )
+        if reply != QtWidgets.QMessageBox.Yes:
+            return
+
+        # 执行时重新对比，预览后算法有变化则不调整
+        report = self.engine.call(self.engine.rebalance_to_file, path, report["text"])
+        if report["errors"]:
+            self.show_rebalance_errors(report["errors"])
+
+    def show_rebalance_errors(self, errors: list[str]) -> None:
+        """显示调仓错误"""
+        QtWidgets.QMessageBox.warning(
+            self,
+            "调仓失败",
+            f"共{len(errors)}处错误，未做任何调整：\n" + "\n".join(errors[:50])
+        )
 
     def clear_algos(self) -> None:
         """清空所有算法"""
-        n = self.engine.clear_algos()
+        n = self.engine.call(self.engine.clear_algos)
         if not n:
             return
 
-        for monitor in [self.long_monitor, self.short_monitor]:
-            monitor.setRowCount(0)
-            monitor.cells.clear()
-        
-        if self.control_monitor.count():
-            for i in range(self.control_monitor.count()):
-                self.control_monitor.itemAt(i).widget().deleteLater()
+        self.algo_model.clear()
 
         self.csv_button.setEnabled(True)
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(False)
         self.clear_button.setEnabled(False)
         self.close_pos_button.setEnabled(False)
+        self.rebalance_button.setEnabled(False)
 
     def start_algos(self) -> None:
         """启动所有算法"""
-        self.engine.start_algos()
+        self.engine.submit(self.engine.start_algos)
         self.start_button.setEnabled(False)
 
     def stop_algos(self) -> None:
         """停止所有算法"""
-        self.engine.stop_algos()
-        self.engine.close()
+        self.engine.submit(self.engine.stop_algos)
+        self.engine.submit(self.engine.save)
         self.close_pos_button.setEnabled(True)
 
     def update_exposure_limit(self, limit: int) -> None:
         """更新敞口限制"""
-        self.engine.exposure_limit = limit
+        self.engine.submit(self.engine.set_exposure_limit, limit)
 
     def close_all_pos(self) -> None:
         '''一键平仓'''
-        self.engine.close_all_pos()
+        self.engine.submit(self.engine.close_all_pos)
         self.close_pos_button.setEnabled(False)
-        self.init_control_monitor()
-    
-    def change_target_pos(self, pos: int, symbol: str, waiting: bool) -> None:
-        '''改变目标仓位'''
-        if waiting:
-            self.target_pos_waiting_to_change[symbol] = pos
-        else:
-            pos = self.target_pos_waiting_to_change[symbol]
-            self.engine.change_target_pos(pos, symbol)
-    
-    def reset_status(self, symbol: str, status: str):
-        '''重置运行状态'''
-        self.engine.reset_status(symbol, status)
-                    
 
 
-class AlgoMonitor(BaseMonitor):
-    """算法监控组件"""
 
-    event_type = EVENT_REBALANCE_ALGO
-    data_key = "vt_symbol"
+class DataTableModel(QtCore.QAbstractTableModel):
+    """
+    表格数据模型
+
+    只保存数据对象的引用，单元格内容在视图绘制可见行时才生成，
+    界面开销与可见行数相关，而与篮子规模无关。
+    """
+
+    data_key: str = ""
+    headers: dict = {}
+
+    def __init__(self) -> None:
+        """构造函数"""
+        super().__init__()
+
+        self.fields: list[str] = list(self.headers.keys())
+
+        self.rows: list = []
+        self.row_map: dict[str, int] = {}
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """行数"""
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        """列数"""
+        if parent.isValid():
+            return 0
+        return len(self.fields)
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.DisplayRole) -> Any:
+        """表头"""
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.headers[self.fields[section]]["display"]
+        return None
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> Any:
+        """单元格数据"""
+        if not index.isValid():
+            return None
+
+        obj: Any = self.rows[index.row()]
+        field: str = self.fields[index.column()]
+
+        if role == QtCore.Qt.DisplayRole:
+            value: Any = getattr(obj, field)
+            if isinstance(value, Enum):
+                return value.value
+            elif value is None:
+                return ""
+            return str(value)
+        elif role == SORT_ROLE:
+            value: Any = getattr(obj, field)
+            if isinstance(value, Enum):
+                return value.value
+            elif value is None:
+                return ""
+            return value
+        elif role == QtCore.Qt.ForegroundRole:
+            return self.get_foreground(obj, field)
+
+        return None
+
+    def get_foreground(self, obj: Any, field: str) -> qt.QtGui.QColor:
+        """单元格字体颜色"""
+        if field == "direction":
+            if obj.direction == Direction.LONG:
+                return COLOR_LONG
+            elif obj.direction == Direction.SHORT:
+                return COLOR_SHORT
+        return None
+
+    def update_datas(self, datas: list) -> None:
+        """批量更新，新数据整批插入，已有数据只发出一次变化通知"""
+        new_datas: dict[str, Any] = {}
+        changed_rows: list[int] = []
+
+        for data in datas:
+            key: str = getattr(data, self.data_key)
+            row: int = self.row_map.get(key, None)
+
+            if row is None:
+                new_datas[key] = data
+            else:
+                self.rows[row] = data
+                changed_rows.append(row)
+
+        if new_datas:
+            first: int = len(self.rows)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(new_datas) - 1)
+
+            for key, data in new_datas.items():
+                self.row_map[key] = len(self.rows)
+                self.rows.append(data)
+
+            self.endInsertRows()
+
+        if changed_rows:
+            top_left: QtCore.QModelIndex = self.index(min(changed_rows), 0)
+            bottom_right: QtCore.QModelIndex = self.index(max(changed_rows), len(self.fields) - 1)
+            self.dataChanged.emit(top_left, bottom_right)
+
+    def clear(self) -> None:
+        """清空数据"""
+        self.beginResetModel()
+        self.rows.clear()
+        self.row_map.clear()
+        self.endResetModel()
+
+
+class AlgoTableModel(DataTableModel):
+    """算法数据模型"""
+
+    data_key = "algoid"
 
     headers = {
-        "vt_symbol": {"display": "算法标的", "cell": BaseCell, "update": False},
-        "direction": {"display": "组合方向", "cell": DirectionCell, "update": False},
-        "total_volume": {"display": "目标仓位", "cell": BaseCell, "update": True},
-        "current_pos": {"display": "当前仓位", "cell": BaseCell, "update": True},
-        "offset": {"display": "交易方向", "cell": BaseCell, "update": True},
-        "status": {"display": "状态", "cell": EnumCell, "update": True},
-        "timer_count": {"display": "本轮读秒", "cell": BaseCell, "update": True},
-        "time_interval": {"display": "每轮间隔", "cell": BaseCell, "update": False},
-        "vol_percent": {"display": "盘口百分比", "cell": BaseCell, "update": False},
+        "algoid": {"display": "算法编号", "editable": False},
+        "vt_symbol": {"display": "算法标的", "editable": False},
+        "direction": {"display": "组合方向", "editable": False},
+        "total_volume": {"display": "目标仓位", "editable": True},
+        "current_pos": {"display": "当前仓位", "editable": False},
+        "offset": {"display": "交易方向", "editable": False},
+        "status": {"display": "状态", "editable": True},
+        "timer_count": {"display": "本轮读秒", "editable": False},
+        "time_interval": {"display": "每轮间隔", "editable": False},
+        "vol_percent": {"display": "盘口百分比", "editable": False},
     }
 
-    def register_event(self) -> None:
-        """重载移除"""
-        pass
+    def __init__(self, engine: DfRebalanceEngine) -> None:
+        """构造函数"""
+        super().__init__()
 
-    def save_setting(self) -> None:
-        """"""
-        pass
+        self.engine: DfRebalanceEngine = engine
 
-    def load_stting(self) -> None:
-        """"""
-        pass
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:
+        """目标仓位和状态可直接编辑"""
+        flags: QtCore.Qt.ItemFlags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+        field: str = self.fields[index.column()]
+        if self.headers[field]["editable"]:
+            flags |= QtCore.Qt.ItemIsEditable
+
+        return flags
+
+    def get_foreground(self, algo: AlgoSnapshot, field: str) -> qt.QtGui.QColor:
+        """运行中的算法标的按方向着色，其余为白色"""
+        if field == "vt_symbol":
+            if algo.status != AlgoStatus.RUNNING:
+                return COLOR_WHITE
+            elif algo.direction == Direction.LONG:
+                return COLOR_LONG
+            elif algo.direction == Direction.SHORT:
+                return COLOR_SHORT
+
+        return super().get_foreground(algo, field)
+
+    def setData(self, index: QtCore.QModelIndex, value: Any, role: int = QtCore.Qt.EditRole) -> bool:
+        """编辑完成后交给引擎修改目标仓位或状态"""
+        if not index.isValid() or role != QtCore.Qt.EditRole:
+            return False
+
+        algo: AlgoSnapshot = self.rows[index.row()]
+        field: str = self.fields[index.column()]
+
+        if field == "total_volume":
+            volume: int = int(value)
+            if volume == algo.total_volume:
+                return False
+            self.engine.submit(self.engine.change_target_pos, volume, algo.algoid)
+        elif field == "status":
+            self.engine.submit(self.engine.reset_status, algo.algoid, value)
+        else:
+            return False
+
+        self.dataChanged.emit(self.index(index.row(), 0), self.index(index.row(), len(self.fields) - 1))
+        return True
+
+
+class AlgoItemDelegate(QtWidgets.QStyledItemDelegate):
+    """算法编辑代理（目标仓位使用数字框，状态使用下拉框）"""
+
+    def __init__(self, model: AlgoTableModel, parent: QtWidgets.QWidget = None) -> None:
+        """构造函数"""
+        super().__init__(parent)
+
+        self.model: AlgoTableModel = model
+
+    def get_algo(self, index: QtCore.QModelIndex) -> AlgoSnapshot:
+        """通过代理索引获取算法"""
+        source_index: QtCore.QModelIndex = index.model().mapToSource(index)
+        return self.model.rows[source_index.row()]
+
+    def createEditor(
+        self,
+        parent: QtWidgets.QWidget,
+        option: QtWidgets.QStyleOptionViewItem,
+        index: QtCore.QModelIndex
+    ) -> QtWidgets.QWidget:
+        """创建编辑器"""
+        field: str = self.model.fields[index.column()]
+
+        if field == "total_volume":
+            algo: AlgoSnapshot = self.get_algo(index)
+
+            editor: QtWidgets.QSpinBox = QtWidgets.QSpinBox(parent)
+            if algo.direction == Direction.LONG:
+                editor.setRange(0, 10_000)
+            elif algo.direction == Direction.SHORT:
+                editor.setRange(-10_000, 0)
+            editor.setSingleStep(1)
+            return editor
+        elif field == "status":
+            editor: QtWidgets.QComboBox = QtWidgets.QComboBox(parent)
+            editor.addItem("运行", "running")
+            editor.addItem("暂停", "paused")
+            return editor
+
+        return super().createEditor(parent, option, index)
+
+    def setEditorData(self, editor: QtWidgets.QWidget, index: QtCore.QModelIndex) -> None:
+        """载入当前数据"""
+        field: str = self.model.fields[index.column()]
+        algo: AlgoSnapshot = self.get_algo(index)
+
+        if field == "total_volume":
+            editor.setValue(algo.total_volume)
+        elif field == "status":
+            if algo.status == AlgoStatus.RUNNING:
+                editor.setCurrentIndex(0)
+            else:
+                editor.setCurrentIndex(1)
+        else:
+            super().setEditorData(editor, index)
+
+    def setModelData(
+        self,
+        editor: QtWidgets.QWidget,
+        model: QtCore.QAbstractItemModel,
+        index: QtCore.QModelIndex
+    ) -> None:
+        """确认修改"""
+        field: str = self.model.fields[index.column()]
+
+        if field == "total_volume":
+            editor.interpretText()
+            model.setData(index, editor.value(), QtCore.Qt.EditRole)
+        elif field == "status":
+            model.setData(index, editor.currentData(), QtCore.Qt.EditRole)
+        else:
+            super().setModelData(editor, model, index)
+
+
+class AlgoFilterProxy(QtCore.QSortFilterProxyModel):
+    """算法过滤代理（按方向和合约代码筛选）"""
+
+    def __init__(self, direction: Direction) -> None:
+        """构造函数"""
+        super().__init__()
+
+        self.direction: Direction = direction
+        self.text: str = ""
+
+        self.setSortRole(SORT_ROLE)
+
+    def set_text(self, text: str) -> None:
+        """设置筛选文本"""
+        self.text = text
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QtCore.QModelIndex) -> bool:
+        """过滤"""
+        algo: AlgoSnapshot = self.sourceModel().rows[source_row]
 
+        if algo.direction != self.direction:
+            return False
+
+        if self.text and self.text not in algo.vt_symbol and self.text not in algo.algoid:
+            return False
+
+        return True
+
+
+def init_table_view(view: QtWidgets.QTableView) -> None:
+    """表格视图通用设置（固定行高，避免按内容计算每一行）"""
+    view.verticalHeader().setVisible(False)
+    view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+    view.setAlternatingRowColors(True)
+    view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+
+    # 开启排序后默认保持插入顺序
+    view.setSortingEnabled(True)
+    view.sortByColumn(-1, QtCore.Qt.AscendingOrder)
+
+
+class AlgoMonitor(QtWidgets.QTableView):
+    """算法监控组件"""
+
+    def __init__(self, model: AlgoTableModel, direction: Direction) -> None:
+        """构造函数"""
+        super().__init__()
+
+        self.proxy: AlgoFilterProxy = AlgoFilterProxy(direction)
+        self.proxy.setSourceModel(model)
+        self.setModel(self.proxy)
+
+        self.delegate: AlgoItemDelegate = AlgoItemDelegate(model, self)
+        self.setItemDelegate(self.delegate)
+
+        init_table_view(self)
+
+    def set_filter(self, text: str) -> None:
+        """按合约代码筛选"""
+        self.proxy.set_text(text)
 
 class RebalanceTradeMonitor(TradeMonitor):
 
@@ -405,22 +695,206 @@ class RebalanceOrderMonitor(OrderMonitor):
         pass
 
 
-class RebalanceHoldingMonitor(BaseMonitor):
+class HoldingTableModel(DataTableModel):
+    """持仓数据模型"""
 
-    event_type = EVENT_REBALANCE_HOLDING
     data_key = "vt_positionid"
-    sorting = True
 
     headers = {
-        "symbol": {"display": "持仓代码", "cell": BaseCell, "update": False},
-        "direction": {"display": "方向", "cell": DirectionCell, "update": False},
-        "volume": {"display": "数量", "cell": BaseCell, "update": True},
-        "pnl": {"display": "盈亏", "cell": PnlCell, "update": True},
-        "value": {"display": "市值", "cell": BaseCell, "update": True},
-        "exchange": {"display": "交易所", "cell": EnumCell, "update": False},
-        "name": {"display": "名称", "cell": BaseCell, "update": False},
-        "price": {"display": "均价", "cell": BaseCell, "update": True},
+        "symbol": {"display": "持仓代码"},
+        "direction": {"display": "方向"},
+        "volume": {"display": "数量"},
+        "pnl": {"display": "盈亏"},
+        "value": {"display": "市值"},
+        "exchange": {"display": "交易所"},
+        "name": {"display": "名称"},
+        "price": {"display": "均价"},
     }
 
-    def save_setting(self) -> None:
-        pass
+    def get_foreground(self, holding: Any, field: str) -> qt.QtGui.QColor:
+        """盈亏按正负着色"""
+        if field == "pnl":
+            if holding.pnl < 0:
+                return COLOR_SHORT
+            return COLOR_LONG
+
+        return super().get_foreground(holding, field)
+
+
+class RebalanceHoldingMonitor(QtWidgets.QTableView):
+    """持仓监控组件"""
+
+    signal_holding = QtCore.pyqtSignal(Event)
+
+    def __init__(self, main_engine: MainEngine, event_engine: EventEngine) -> None:
+        """构造函数"""
+        super().__init__()
+
+        self.main_engine: MainEngine = main_engine
+        self.event_engine: EventEngine = event_engine
+
+        self.holding_model: HoldingTableModel = HoldingTableModel()
+
+        self.proxy: QtCore.QSortFilterProxyModel = QtCore.QSortFilterProxyModel()
+        self.proxy.setSourceModel(self.holding_model)
+        self.proxy.setSortRole(SORT_ROLE)
+        self.proxy.setFilterKeyColumn(0)
+        self.setModel(self.proxy)
+
+        init_table_view(self)
+
+        self.register_event()
+
+    def register_event(self) -> None:
+        """注册事件监听"""
+        self.signal_holding.connect(self.process_holding_event)
+        self.event_engine.register(EVENT_REBALANCE_HOLDING, self.signal_holding.emit)
+
+    def process_holding_event(self, event: Event) -> None:
+        """处理持仓事件（批量）"""
+        self.holding_model.update_datas(event.data)
+
+    def set_filter(self, text: str) -> None:
+        """按合约代码筛选"""
+        self.proxy.setFilterFixedString(text)
+
+
+class RebalanceMetricsMonitor(QtWidgets.QWidget):
+    """运行指标监控组件"""
+
+    signal_metrics = QtCore.pyqtSignal(Event)
+
+    headers: list[str] = ["路径", "次数", "平均(us)", "p50(us)", "p90(us)", "p99(us)", "最大(us)", "合计(ms)"]
+    fields: list[str] = ["count", "mean", "p50", "p90", "p99", "max", "total_ms"]
+
+    trace_headers: list[str] = ["链路阶段", "次数", "平均(us)", "p50(us)", "p90(us)", "p99(us)", "最大(us)"]
+    trace_fields: list[str] = ["count", "mean", "p50", "p90", "p99", "max"]
+
+    def __init__(self, engine: DfRebalanceEngine, event_engine: EventEngine) -> None:
+        """构造函数"""
+        super().__init__()
+
+        self.engine: DfRebalanceEngine = engine
+        self.event_engine: EventEngine = event_engine
+
+        self.init_ui()
+        self.register_event()
+
+    def init_ui(self) -> None:
+        """初始化界面"""
+        self.setWindowTitle("运行指标")
+        self.resize(900, 600)
+
+        self.enabled_check: QtWidgets.QCheckBox = QtWidgets.QCheckBox("启用统计")
+        self.enabled_check.setChecked(self.engine.metrics.enabled)
+        self.enabled_check.toggled.connect(self.set_metrics_enabled)
+
+        self.trace_check: QtWidgets.QCheckBox = QtWidgets.QCheckBox("记录委托链路")
+        self.trace_check.setChecked(self.engine.tracer.enabled)
+        self.trace_check.toggled.connect(self.set_trace_enabled)
+
+        reset_button: QtWidgets.QPushButton = QtWidgets.QPushButton("清空")
+        reset_button.clicked.connect(self.reset_metrics)
+
+        export_button: QtWidgets.QPushButton = QtWidgets.QPushButton("导出链路")
+        export_button.clicked.connect(self.export_traces)
+
+        self.summary_label: QtWidgets.QLabel = QtWidgets.QLabel()
+
+        self.table: QtWidgets.QTableWidget = create_stats_table(self.headers)
+        self.trace_table: QtWidgets.QTableWidget = create_stats_table(self.trace_headers)
+
+        tab: QtWidgets.QTabWidget = QtWidgets.QTabWidget()
+        tab.addTab(self.table, "耗时分布")
+        tab.addTab(self.trace_table, "委托链路")
+
+        hbox: QtWidgets.QHBoxLayout = QtWidgets.QHBoxLayout()
+        hbox.addWidget(self.enabled_check)
+        hbox.addWidget(self.trace_check)
+        hbox.addWidget(reset_button)
+        hbox.addWidget(export_button)
+        hbox.addStretch()
+        hbox.addWidget(self.summary_label)
+
+        vbox: QtWidgets.QVBoxLayout = QtWidgets.QVBoxLayout()
+        vbox.addLayout(hbox)
+        vbox.addWidget(tab)
+        self.setLayout(vbox)
+
+    def register_event(self) -> None:
+        """注册事件监听"""
+        self.signal_metrics.connect(self.process_metrics_event)
+        self.event_engine.register(EVENT_REBALANCE_METRICS, self.signal_metrics.emit)
+
+    def process_metrics_event(self, event: Event) -> None:
+        """处理运行指标事件"""
+        data: dict = event.data
+
+        self.enabled_check.blockSignals(True)
+        self.enabled_check.setChecked(data["enabled"])
+        self.enabled_check.blockSignals(False)
+
+        self.trace_check.blockSignals(True)
+        self.trace_check.setChecked(data["trace_enabled"])
+        self.trace_check.blockSignals(False)
+
+        self.summary_label.setText(
+            f"队列深度 {data['queue_depth']}（最大 {data['max_queue_depth']}）  "
+            f"执行收件箱 {data['inbox_depth']}（最大 {data['max_inbox_depth']}）  "
+            f"委托 {data['order_rate']:.1f}/秒（最大 {data['max_order_rate']:.1f}）  "
+            f"撤单 {data['cancel_rate']:.1f}/秒  "
+            f"更新时间 {data['time']}"
+        )
+
+        update_stats_table(self.table, data["latency"], self.fields)
+        update_stats_table(self.trace_table, data["trace"], self.trace_fields)
+
+    def export_traces(self) -> None:
+        """导出委托链路记录"""
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "导出委托链路", "", "CSV(*.csv)")
+        if not path:
+            return
+
+        self.engine.submit(self.engine.export_traces, path)
+
+    def set_metrics_enabled(self, enabled: bool) -> None:
+        """开关运行指标统计"""
+        self.engine.submit(self.engine.set_metrics_enabled, enabled)
+
+    def set_trace_enabled(self, enabled: bool) -> None:
+        """开关委托链路记录"""
+        self.engine.submit(self.engine.set_trace_enabled, enabled)
+
+    def reset_metrics(self) -> None:
+        """清空运行指标"""
+        self.engine.submit(self.engine.reset_metrics)
+
+
+def create_stats_table(headers: list[str]) -> QtWidgets.QTableWidget:
+    """创建统计表格"""
+    table: QtWidgets.QTableWidget = QtWidgets.QTableWidget()
+    table.setColumnCount(len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.verticalHeader().setVisible(False)
+    table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+    table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+    return table
+
+
+def update_stats_table(table: QtWidgets.QTableWidget, data: dict[str, dict], fields: list[str]) -> None:
+    """按名称逐行显示统计数据"""
+    table.setRowCount(len(data))
+
+    for row, (name, stats) in enumerate(data.items()):
+        table.setItem(row, 0, QtWidgets.QTableWidgetItem(name))
+
+        for column, field in enumerate(fields, start=1):
+            value: float = stats[field]
+            if field == "count":
+                text: str = str(value)
+            else:
+                text: str = f"{value:.1f}"
+
+            item: QtWidgets.QTableWidgetItem = QtWidgets.QTableWidgetItem(text)
+            item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+            table.setItem(row, column, item)
@@ -0,0 +1,142 @@
+import traceback
+from concurrent.futures import Future
+from queue import SimpleQueue
+from threading import Thread, get_ident
+from time import perf_counter
+from typing import Any, Callable
+
+from vnpy.event import Event
+
+
+class ExecutionWorker:
+    """
+    执行线程
+
+    算法相关的行情、委托、成交、定时事件由事件引擎线程转发到收件箱（SimpleQueue，
+    入队出队只需极短的锁），在本线程中按到达顺序处理。算法状态只由本线程修改，
+    其他线程（界面）的操作通过submit/call提交到同一个收件箱排队执行。
+    调用accept后事件先在收件箱中等待，start后按到达顺序处理；
+    两者都未调用时所有调用直接在当前线程执行，便于回放和测试。
+    """
+
+    def __init__(self, on_error: Callable[[str], None] = None, name: str = "RebalanceExecution") -> None:
+        """构造函数"""
+        self.name: str = name
+        self.on_error: Callable[[str], None] = on_error
+
+        self.inbox: SimpleQueue = SimpleQueue()
+        self.accepting: bool = False        # 事件放入收件箱（可早于处理线程启动）
+        self.active: bool = False
+        self.thread: Thread = None
+        self.thread_id: int = None
+
+        self.event_time: float = 0          # 当前处理事件到达事件引擎线程的时间（perf_counter），不在处理中为0
+
+    def accept(self) -> None:
+        """开始接收事件（只放入收件箱，启动后再处理）"""
+        self.accepting = True
+
+    def start(self) -> None:
+        """启动执行线程，先处理启动前收件箱中积压的事件"""
+        if self.active:
+            return
+
+        self.accepting = True
+        self.active = True
+        self.thread = Thread(target=self.run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """处理完收件箱中已有的任务后停止"""
+        if not self.active:
+            return
+
+        self.inbox.put(None)
+        self.thread.join()
+
+        self.accepting = False
+        self.active = False
+        self.thread = None
+        self.thread_id = None
+
+    def run(self) -> None:
+        """执行线程主循环"""
+        self.thread_id = get_ident()
+
+        while True:
+            item: tuple = self.inbox.get()
+            if item is None:
+                break
+
+            func, args = item
+            try:
+                func(*args)
+            except Exception:
+                msg: str = f"执行线程处理异常：\n{traceback.format_exc()}"
+                if self.on_error:
+                    self.on_error(msg)
+                else:
+                    print(msg)
+
+    def forward(self, handler: Callable[[Event], None], stamp: bool = False) -> Callable[[Event], None]:
+        """
+        生成转发函数：事件引擎线程只负责放入收件箱
+
+        stamp为True时在事件到达时记录本地时间，只在处理期间可通过event_time读取，
+        用于统计包含收件箱排队在内的延迟。
+        """
+        put: Callable = self.inbox.put
+
+        if stamp:
+            def forwarder(event: Event) -> None:
+                if self.accepting:
+                    put((self.process_stamped, (handler, event, perf_counter())))
+                else:
+                    self.process_stamped(handler, event, perf_counter())
+        else:
+            def forwarder(event: Event) -> None:
+                if self.accepting:
+                    put((handler, (event,)))
+                else:
+                    handler(event)
+
+        return forwarder
+
+    def process_stamped(self, handler: Callable[[Event], None], event: Event, event_time: float) -> None:
+        """设置事件到达时间后处理事件，处理完成后清除（其他调用读取到0）"""
+        self.event_time = event_time
+        try:
+            handler(event)
+        finally:
+            self.event_time = 0
+
+    def submit(self, func: Callable, *args) -> Future:
+        """提交任务到执行线程，返回结果的Future"""
+        future: Future = Future()
+
+        if self.active and not self.in_worker():
+            self.inbox.put((run_future, (future, func, args)))
+        else:
+            run_future(future, func, args)
+
+        return future
+
+    def call(self, func: Callable, *args) -> Any:
+        """在执行线程中执行并等待结果"""
+        return self.submit(func, *args).result()
+
+    def in_worker(self) -> bool:
+        """当前是否为执行线程"""
+        return get_ident() == self.thread_id
+
+    def get_depth(self) -> int:
+        """收件箱中等待处理的任务数量"""
+        return self.inbox.qsize()
+
+
+def run_future(future: Future, func: Callable, args: tuple) -> None:
+    """执行任务并设置Future结果"""
+    try:
+        future.set_result(func(*args))
+    except Exception as ex:
+        future.set_exception(ex)